@@ -0,0 +1,78 @@
+"""Benchmark for dispatching large OSC bundles.
+
+Dispatches a bundle with many messages for a few nodes with the python-osc `Dispatcher` and with
+`OSCQueryDispatcher`, which validates and dispatches the messages per node. Runs single-threaded, so the results are
+messages per second per core.
+
+Usage:
+    python benchmarks/benchmark_bundles.py
+"""
+
+import timeit
+
+from pythonosc import osc_bundle_builder, osc_message_builder
+from pythonosc.dispatcher import Dispatcher
+
+from pythonoscquery.pythonosc_callback_wrapper import (
+    OSCQueryDispatcher,
+    map_address_space,
+)
+from pythonoscquery.shared.osc_access import OSCAccess
+from pythonoscquery.shared.osc_address_space import OSCAddressSpace
+from pythonoscquery.shared.osc_path_node import OSCPathNode
+
+NODES = 8
+MESSAGES = 512
+NUMBER = 50
+REPEAT = 5
+
+
+def build_bundle() -> bytes:
+    bundle_builder = osc_bundle_builder.OscBundleBuilder(osc_bundle_builder.IMMEDIATELY)
+    for i in range(MESSAGES):
+        message_builder = osc_message_builder.OscMessageBuilder(f"/level/{i % NODES}")
+        message_builder.add_arg(float(i))
+        bundle_builder.add_content(message_builder.build())
+    return bundle_builder.build().dgram
+
+
+def callback(address, *args):
+    pass
+
+
+def messages_per_second(dispatcher: Dispatcher, data: bytes) -> float:
+    best = min(
+        timeit.repeat(
+            lambda: dispatcher.call_handlers_for_packet(data, ("127.0.0.1", 9000)),
+            number=NUMBER,
+            repeat=REPEAT,
+        )
+    )
+    return NUMBER * MESSAGES / best
+
+
+def main():
+    address_space = OSCAddressSpace()
+    for i in range(NODES):
+        address_space.add_node(
+            OSCPathNode(f"/level/{i}", value=1.0, access=OSCAccess.READWRITE_VALUE)
+        )
+    data = build_bundle()
+
+    cases = {}
+    for name, dispatcher, batch in (
+        ("Dispatcher", Dispatcher(), False),
+        ("OSCQueryDispatcher", OSCQueryDispatcher(address_space), False),
+        ("OSCQueryDispatcher, batch", OSCQueryDispatcher(address_space), True),
+    ):
+        map_address_space(address_space, dispatcher, {"/": callback}, batch=batch)
+        cases[name] = messages_per_second(dispatcher, data)
+
+    print(f"{NODES} nodes, {MESSAGES} messages per bundle")
+    print(f"{'dispatcher':<28}{'msg/s':>16}")
+    for name, result in cases.items():
+        print(f"{name:<28}{result:>16,.0f}")
+
+
+if __name__ == "__main__":
+    main()
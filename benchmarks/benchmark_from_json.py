@@ -0,0 +1,81 @@
+"""Benchmark for OSCPathNode.from_json() with a big address space.
+
+Parses the JSON data of a synthetic address space with about one million nodes (three levels of 100 containers, with
+method nodes of a few different type signatures), with the previous recursive construction (reproduced below), the
+iterative construction and the trusted mode.
+
+Usage:
+    python benchmarks/benchmark_from_json.py
+"""
+
+import time
+
+from pythonoscquery.shared.osc_path_node import OSCPathNode
+from pythonoscquery.shared.oscquery_spec import OSCQueryAttribute
+
+BRANCHING = 100
+METHOD_TYPES = (
+    ([1], "i"),
+    ([0.5], "f"),
+    ([True, "text"], "Ts"),
+    ([1, 2, 3], "iii"),
+)
+
+
+def build_json() -> dict:
+    root = {"FULL_PATH": "/", "ACCESS": 0, "CONTENTS": {}}
+    for i in range(BRANCHING):
+        level_1 = {"FULL_PATH": f"/c{i}", "ACCESS": 0, "CONTENTS": {}}
+        root["CONTENTS"][f"c{i}"] = level_1
+        for j in range(BRANCHING):
+            level_2 = {"FULL_PATH": f"/c{i}/c{j}", "ACCESS": 0, "CONTENTS": {}}
+            level_1["CONTENTS"][f"c{j}"] = level_2
+            for k in range(BRANCHING):
+                value, osc_type = METHOD_TYPES[k % len(METHOD_TYPES)]
+                level_2["CONTENTS"][f"m{k}"] = {
+                    "FULL_PATH": f"/c{i}/c{j}/m{k}",
+                    "ACCESS": 3,
+                    "VALUE": list(value),
+                    "TYPE": osc_type,
+                    "DESCRIPTION": "synthetic",
+                }
+    return root
+
+
+def recursive_from_json(json_data: dict) -> OSCPathNode:
+    """The recursive construction that was used before from_json() built the tree iteratively."""
+    contents = None
+    if "CONTENTS" in json_data:
+        contents = [
+            recursive_from_json(sub_node) for sub_node in json_data["CONTENTS"].values()
+        ]
+    node = OSCPathNode._from_json_attributes(json_data)
+    node.attributes[OSCQueryAttribute.CONTENTS] = contents
+    return node
+
+
+def measure(parse, json_data: dict) -> float:
+    start = time.perf_counter()
+    parse(json_data)
+    return time.perf_counter() - start
+
+
+def main():
+    json_data = build_json()
+    number_of_nodes = 1 + BRANCHING + BRANCHING**2 + BRANCHING**3
+
+    cases = {
+        "recursive": recursive_from_json,
+        "from_json": OSCPathNode.from_json,
+        "from_json, trusted": lambda data: OSCPathNode.from_json(data, trusted=True),
+    }
+
+    print(f"{number_of_nodes:,} nodes")
+    print(f"{'construction':<24}{'seconds':>10}{'nodes/s':>14}")
+    for name, parse in cases.items():
+        duration = measure(parse, json_data)
+        print(f"{name:<24}{duration:>10.2f}{number_of_nodes / duration:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
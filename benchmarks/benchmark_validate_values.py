@@ -0,0 +1,78 @@
+"""Microbenchmark for OSCPathNode.validate_values().
+
+Compares the compiled per-node validators with the previous generic validation loop, which is reproduced below.
+Runs single-threaded, so the results are messages per second per core.
+
+Usage:
+    python benchmarks/benchmark_validate_values.py
+"""
+
+import builtins
+import timeit
+
+from pythonoscquery.shared.osc_access import OSCAccess
+from pythonoscquery.shared.osc_path_node import OSCPathNode
+
+NUMBER = 200_000
+REPEAT = 5
+
+
+def generic_validate_values(node: OSCPathNode, values: list) -> list:
+    """The validation loop that was used before validators were compiled per node."""
+    if not node.type and values:
+        raise TypeError(f"Expected no value(s), got {len(values)}")
+
+    if not node.type:
+        return values
+
+    if len(values) != len(node.type):
+        raise TypeError(f"Expected {len(node.type)} value(s), got {len(values)}")
+
+    for i, expected_type in enumerate(node.type):
+        received_type = type(values[i])
+        if received_type is not expected_type:
+            if (
+                expected_type is builtins.bool
+                and received_type is builtins.int
+                and values[i] in (0, 1)
+            ):
+                values[i] = bool(values[i])
+                continue
+
+            raise TypeError(
+                f"Expected {expected_type} for value {i}, got {type(values[i])}"
+            )
+    return values
+
+
+CASES = {
+    "1 float": ([0.5], [0.25]),
+    "4 mixed": ([1, "hello", 0.5, True], [2, "hi", 0.25, False]),
+    "4 mixed, bool as int": ([1, "hello", 0.5, True], [2, "hi", 0.25, 0]),
+    "16 floats": ([0.5] * 16, [0.25] * 16),
+}
+
+
+def messages_per_second(statement) -> float:
+    best = min(timeit.repeat(statement, number=NUMBER, repeat=REPEAT))
+    return NUMBER / best
+
+
+def main():
+    print(f"{'case':<24}{'generic msg/s':>16}{'compiled msg/s':>16}{'speedup':>10}")
+    for name, (node_value, message_values) in CASES.items():
+        node = OSCPathNode("/bench", value=node_value, access=OSCAccess.READWRITE_VALUE)
+
+        before = messages_per_second(
+            lambda node=node, values=message_values: generic_validate_values(
+                node, list(values)
+            )
+        )
+        after = messages_per_second(
+            lambda node=node, values=message_values: node.validate_values(list(values))
+        )
+        print(f"{name:<24}{before:>16,.0f}{after:>16,.0f}{after / before:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
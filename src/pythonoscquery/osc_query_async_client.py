@@ -0,0 +1,259 @@
+import asyncio
+import json
+import logging
+
+from zeroconf import ServiceInfo
+
+from .osc_query_cache import OSCQueryCache
+from .shared.osc_host_info import OSCHostInfo
+from .shared.osc_path_node import OSCPathNode
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncOSCQueryClient:
+    """asyncio HTTP client for an OSCQuery service, with the same queries as OSCQueryClient.
+
+    Queries of many clients can run concurrently, e.g. to query all discovered services at once:
+
+        clients = [AsyncOSCQueryClient(info, limit=limit) for info in browser.get_discovered_oscquery()]
+        host_infos = await asyncio.gather(*(client.get_host_info() for client in clients))
+
+    Connections are kept open and reused for subsequent queries. Call close() (or use the client as an async context
+    manager) to close them.
+    """
+
+    def __init__(
+        self,
+        service_info,
+        timeout: float = 10.0,
+        max_connections: int = 4,
+        limit: asyncio.Semaphore | None = None,
+        cache: OSCQueryCache | None = None,
+    ) -> None:
+        """
+        Args:
+            service_info: zeroconf ServiceInfo of the OSCQuery service, e.g. from OSCQueryBrowser
+            timeout: Deadline in seconds for a query, including connecting and reading the whole response
+            max_connections: Maximum number of concurrent queries (and open connections) to the service
+            limit: A semaphore that limits the number of concurrent queries, e.g. shared between several clients
+            cache: Cache for the queried nodes, can be shared with other (also synchronous) clients
+        """
+        if not isinstance(service_info, ServiceInfo):
+            raise Exception("service_info isn't a ServiceInfo class!")
+
+        if service_info.type != "_oscjson._tcp.local.":
+            raise Exception("service_info does not represent an OSCQuery service!")
+
+        self.service_info = service_info
+        self.last_json = None
+        self.timeout = timeout
+        self._limit = limit
+        self.cache = cache
+        self._connection_slots = asyncio.Semaphore(max_connections)
+        self._idle_connections: list[
+            tuple[asyncio.StreamReader, asyncio.StreamWriter]
+        ] = []
+
+    async def close(self):
+        """Close all open connections to the service."""
+        connections, self._idle_connections = self._idle_connections, []
+        for _, writer in connections:
+            writer.close()
+        for _, writer in connections:
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    async def __aenter__(self) -> "AsyncOSCQueryClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def _get_query_root(self) -> str:
+        return f"http://{self._get_ip_str()}:{self.service_info.port}"
+
+    def _get_ip_str(self) -> str:
+        ip_str = ".".join([str(int(num)) for num in self.service_info.addresses[0]])
+        return ip_str
+
+    async def query_node(
+        self, node: str = "/", timeout: float | None = None
+    ) -> OSCPathNode | None:
+        """Query a node of the address space of the service.
+
+        Args:
+            node: Address of the node
+            timeout: Deadline in seconds for this query, instead of the default of the client
+        Returns:
+            The node, or None if it doesn't exist or the service didn't respond in time
+        """
+        query_root = self._get_query_root()
+        entry = None
+        headers = None
+        if self.cache is not None:
+            entry = self.cache.get(query_root, node)
+            if entry is not None:
+                if self.cache.is_fresh(entry):
+                    self.last_json = entry.json
+                    return entry.node
+                if entry.etag is not None:
+                    headers = {"If-None-Match": entry.etag}
+
+        response = await self._get(node, timeout, headers)
+        if response is None:
+            return None
+
+        status, response_headers, body = response
+        if status == 304 and entry is not None:
+            self.cache.refresh(entry)
+            self.last_json = entry.json
+            return entry.node
+
+        if status == 404:
+            if self.cache is not None:
+                self.cache.invalidate(query_root, node)
+            return None
+
+        if status != 200:
+            raise Exception("Node query error: (HTTP", status, ") ", body)
+
+        self.last_json = json.loads(body)
+
+        path_node = OSCPathNode.from_json(self.last_json)
+        if self.cache is not None:
+            self.cache.put(
+                query_root,
+                node,
+                path_node,
+                self.last_json,
+                response_headers.get("etag"),
+            )
+        return path_node
+
+    async def get_host_info(self, timeout: float | None = None) -> OSCHostInfo | None:
+        """Query the host info of the service.
+
+        Args:
+            timeout: Deadline in seconds for this query, instead of the default of the client
+        Returns:
+            The host info, or None if the service didn't respond in time
+        """
+        response = await self._get("/?HOST_INFO", timeout)
+        if response is None:
+            return None
+
+        status, _, body = response
+        if status != 200:
+            raise Exception("Node query error: (HTTP", status, ") ", body)
+
+        return OSCHostInfo.from_json(
+            json.loads(body), self._get_ip_str(), self.service_info.port
+        )
+
+    async def _get(
+        self, path: str, timeout: float | None, headers: dict[str, str] | None = None
+    ) -> tuple[int, dict[str, str], bytes] | None:
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            if self._limit is None:
+                return await asyncio.wait_for(self._request(path, headers), timeout)
+            async with self._limit:
+                return await asyncio.wait_for(self._request(path, headers), timeout)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as ex:
+            logger.error("Error querying %s%s: %r", self._get_ip_str(), path, ex)
+            return None
+
+    async def _request(
+        self, path: str, headers: dict[str, str] | None
+    ) -> tuple[int, dict[str, str], bytes]:
+        async with self._connection_slots:
+            while self._idle_connections:
+                reader, writer = self._idle_connections.pop()
+                try:
+                    return await self._exchange(reader, writer, path, headers)
+                except (OSError, asyncio.IncompleteReadError):
+                    # The service closed the idle connection, try the next one
+                    writer.close()
+                except BaseException:
+                    writer.close()
+                    raise
+
+            reader, writer = await asyncio.open_connection(
+                self._get_ip_str(), self.service_info.port
+            )
+            try:
+                return await self._exchange(reader, writer, path, headers)
+            except BaseException:
+                writer.close()
+                raise
+
+    async def _exchange(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        path: str,
+        request_headers: dict[str, str] | None,
+    ) -> tuple[int, dict[str, str], bytes]:
+        """Send a GET request and read the response. Keeps the connection for reuse, if the service allows it."""
+        request = (
+            f"GET {path} HTTP/1.1\r\n"
+            f"Host: {self._get_ip_str()}:{self.service_info.port}\r\n"
+            "Accept: application/json\r\n"
+            + "".join(
+                f"{name}: {value}\r\n"
+                for name, value in (request_headers or {}).items()
+            )
+            + "\r\n"
+        )
+        writer.write(request.encode("latin-1"))
+        await writer.drain()
+
+        status_line = await reader.readuntil(b"\r\n")
+        version, status, *_ = status_line.decode("latin-1").split(" ", 2)
+        status = int(status)
+
+        headers = {}
+        while True:
+            line = await reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        keep_alive = (
+            version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+        )
+
+        if status in (204, 304) or 100 <= status < 200:
+            body = b""
+        elif headers.get("transfer-encoding", "").lower() == "chunked":
+            body = await _read_chunked(reader)
+        elif "content-length" in headers:
+            body = await reader.readexactly(int(headers["content-length"]))
+        else:
+            body = await reader.read()
+            keep_alive = False
+
+        if keep_alive:
+            self._idle_connections.append((reader, writer))
+        else:
+            writer.close()
+
+        return status, headers, body
+
+
+async def _read_chunked(reader: asyncio.StreamReader) -> bytes:
+    chunks = []
+    while True:
+        size_line = await reader.readuntil(b"\r\n")
+        size = int(size_line.split(b";", 1)[0], 16)
+        if size == 0:
+            # Skip the trailer
+            while await reader.readuntil(b"\r\n") != b"\r\n":
+                pass
+            return b"".join(chunks)
+        chunks.append(await reader.readexactly(size))
+        await reader.readexactly(2)
@@ -1,18 +1,50 @@
+import asyncio
+import logging
+import threading
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+
 from zeroconf import ServiceBrowser, ServiceInfo, ServiceListener, Zeroconf
+from zeroconf.asyncio import AsyncServiceInfo
 
 from .osc_query_client import OSCQueryClient
+from .osc_query_path_index import OSCQueryPathIndex
 from .shared.osc_host_info import OSCHostInfo
 from .shared.osc_path_node import OSCPathNode
 
+logger = logging.getLogger(__name__)
+
+_OSC_TYPE = "_osc._udp.local."
+_OSCJSON_TYPE = "_oscjson._tcp.local."
+# Same as the default timeout of Zeroconf.get_service_info()
+_RESOLVE_TIMEOUT_MS = 3000
+
 
 class OSCQueryBrowser:
-    def __init__(self) -> None:
+    def __init__(self, path_index: bool = False, index_interval: float = 30.0) -> None:
+        """
+        Args:
+            path_index: Keep an index of the addresses of all discovered OSCQuery services, see OSCQueryPathIndex.
+                Node lookups then only query the services that have the node
+            index_interval: Seconds between the periodic checks of the indexed services
+        """
         self.listener = OSCQueryListener()
+        self.path_index: OSCQueryPathIndex | None = None
+        if path_index:
+            self.path_index = OSCQueryPathIndex(self.listener, index_interval)
+            self.path_index.start()
         self.zc = Zeroconf()
         self.browser = ServiceBrowser(
-            self.zc, ["_oscjson._tcp.local.", "_osc._udp.local."], self.listener
+            self.zc, [_OSCJSON_TYPE, _OSC_TYPE], self.listener
         )
 
+    def close(self):
+        """Stop discovering services and maintaining the path index."""
+        if self.path_index is not None:
+            self.path_index.stop()
+        self.zc.close()
+
     def get_discovered_osc(self):
         return [oscsvc[1] for oscsvc in self.listener.osc_services.items()]
 
@@ -21,50 +53,283 @@ class OSCQueryBrowser:
 
     def find_service_by_name(self, name: str):
         for svc in self.get_discovered_oscquery():
-            client = OSCQueryClient(svc)
-            if name in client.get_host_info().name:
+            host_info = self.listener.get_host_info(svc.name)
+            if host_info is not None and name in host_info.name:
                 return svc
 
         return None
 
     def find_nodes_by_endpoint_address(
-        self, address: str
+        self, address: str, timeout: float = 5.0, max_workers: int = 16
     ) -> list[tuple[ServiceInfo, OSCHostInfo, OSCPathNode]]:
-        svcs = []
-        for svc in self.get_discovered_oscquery():
-            client = OSCQueryClient(svc)
-            hi = client.get_host_info()
-            if hi is None:
-                continue
-            node = client.query_node(address)
-            if node is not None:
-                svcs.append((svc, hi, node))
+        """Query a node from all discovered OSCQuery services, see iter_nodes_by_endpoint_address().
+
+        Returns:
+            The service info, host info and node of every service that has the node, in the order of their responses
+        """
+        return list(self.iter_nodes_by_endpoint_address(address, timeout, max_workers))
 
-        return svcs
+    def iter_nodes_by_endpoint_address(
+        self, address: str, timeout: float = 5.0, max_workers: int = 16
+    ) -> Iterator[tuple[ServiceInfo, OSCHostInfo, OSCPathNode]]:
+        """Query a node from all discovered OSCQuery services in parallel, yielding the results as they arrive.
+
+        The services are queried on a bounded thread pool, so the lookup takes about as long as the slowest service
+        (instead of all services together). Services that didn't respond when the timeout is over are left out. The
+        clients and host infos of the services are cached by the listener. With a path index, services that are indexed
+        without the address are not queried.
+
+        Args:
+            address: Address of the node, e.g. "/avatar/parameters/foo"
+            timeout: Seconds until the lookup ends, for all services together
+            max_workers: Maximum number of services that are queried at the same time
+        Yields:
+            The service info, host info and node of every service that has the node
+        """
+        services = self.get_discovered_oscquery()
+        if self.path_index is not None:
+            indexed = {svc.name for svc in self.path_index.find_services(address)}
+            services = [
+                svc
+                for svc in services
+                if svc.name in indexed or not self.path_index.is_indexed(svc.name)
+            ]
+        if not services:
+            return
+
+        executor = ThreadPoolExecutor(
+            max_workers=min(max_workers, len(services)),
+            thread_name_prefix="OSCQueryBrowser",
+        )
+        futures = {
+            executor.submit(self._query_service_node, svc, address): svc
+            for svc in services
+        }
+        pending = len(futures)
+        try:
+            for future in as_completed(futures, timeout=timeout):
+                pending -= 1
+                try:
+                    result = future.result()
+                except Exception:
+                    logger.exception("Querying %s failed", futures[future].name)
+                    continue
+                if result is not None:
+                    yield result
+        except FuturesTimeoutError:
+            logger.warning(
+                "%d of %d services didn't respond within %s seconds",
+                pending,
+                len(futures),
+                timeout,
+            )
+        finally:
+            # Queries that are still running are abandoned, their clients time out on their own
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _query_service_node(
+        self, svc: ServiceInfo, address: str
+    ) -> tuple[ServiceInfo, OSCHostInfo, OSCPathNode] | None:
+        hi = self.listener.get_host_info(svc.name)
+        client = self.listener.get_client(svc.name)
+        if hi is None or client is None:
+            return None
+        node = client.query_node(address)
+        if node is None:
+            return None
+        return svc, hi, node
 
 
 class OSCQueryListener(ServiceListener):
+    """Keeps track of the discovered OSC and OSCQuery services.
+
+    Announced services are resolved asynchronously on the event loop of zeroconf, so that the zeroconf thread is not
+    blocked and many services are resolved at the same time. They show up in osc_services and oscjson_services once
+    they are resolved, see wait_until_resolved().
+
+    For every OSCQuery service, a client and the host info are cached once they are first needed, until zeroconf
+    reports that the service was updated or removed.
+    """
+
     def __init__(self) -> None:
         self.osc_services = {}
         self.oscjson_services = {}
+        self._clients: dict[str, OSCQueryClient] = {}
+        self._host_infos: dict[str, OSCHostInfo] = {}
+        self._lock = threading.Lock()
+        # Signalled whenever a service has been resolved
+        self._resolved = threading.Condition(self._lock)
+        self._pending: dict[tuple[str, str], Future] = {}
+        self._observers: list[Callable[[str], None]] = []
 
         super().__init__()
 
+    def add_observer(self, observer: Callable[[str], None]):
+        """Register a callback that is called with the name of an OSCQuery service whenever the service was resolved,
+        updated or removed. Called from the threads of zeroconf, so it should return quickly."""
+        self._observers.append(observer)
+
+    def _notify(self, name: str):
+        for observer in list(self._observers):
+            try:
+                observer(name)
+            except Exception:
+                logger.exception("Service observer failed for %s", name)
+
+    def get_client(self, name: str) -> OSCQueryClient | None:
+        """The client of the discovered OSCQuery service with the given name, None if it isn't known."""
+        with self._lock:
+            client = self._clients.get(name)
+            if client is None:
+                svc = self.oscjson_services.get(name)
+                if svc is None:
+                    return None
+                client = self._clients[name] = OSCQueryClient(svc)
+            return client
+
+    def get_host_info(self, name: str) -> OSCHostInfo | None:
+        """The host info of the discovered OSCQuery service with the given name.
+
+        Only queried from the service the first time, or after the service was updated.
+
+        Returns:
+            The host info, or None if the service isn't known or didn't respond
+        """
+        host_info = self._host_infos.get(name)
+        if host_info is not None:
+            return host_info
+
+        client = self.get_client(name)
+        if client is None:
+            return None
+        host_info = client.get_host_info()
+        if host_info is not None:
+            with self._lock:
+                # Not cached if the service was updated or removed in the meantime
+                if self._clients.get(name) is client:
+                    self._host_infos[name] = host_info
+        return host_info
+
+    def _forget(self, name: str) -> OSCQueryClient | None:
+        """Forget the cached client and host info of a service, with the lock held. Returns the client to close."""
+        self._host_infos.pop(name, None)
+        return self._clients.pop(name, None)
+
+    def wait_until_resolved(self, timeout: float | None = None) -> bool:
+        """Wait until all services that were announced so far are resolved (or failed to resolve).
+
+        Args:
+            timeout: Maximum number of seconds to wait, None to wait without limit
+        Returns:
+            False if services were still being resolved when the timeout was over
+        """
+        with self._resolved:
+            return self._resolved.wait_for(lambda: not self._pending, timeout)
+
     def remove_service(self, zc: "Zeroconf", type_: str, name: str) -> None:
-        if name in self.osc_services:
-            del self.osc_services[name]
+        client = None
+        with self._lock:
+            cancelled = [
+                self._pending.pop(key)
+                for key in ((_OSC_TYPE, name), (_OSCJSON_TYPE, name))
+                if key in self._pending
+            ]
+            # Under the same lock as _add_resolved(), so a resolution that is just finishing can't re-add the service
+            self.osc_services.pop(name, None)
+            removed = self.oscjson_services.pop(name, None) is not None
+            if removed:
+                client = self._forget(name)
+            self._resolved.notify_all()
+        # Outside the lock, since cancel() runs the done callbacks at once
+        for future in cancelled:
+            future.cancel()
 
-        if name in self.oscjson_services:
-            del self.oscjson_services[name]
+        if client is not None:
+            client.close()
+        if removed:
+            self._notify(name)
 
     def add_service(self, zc: "Zeroconf", type_: str, name: str) -> None:
-        if type_ == "_osc._udp.local.":
-            self.osc_services[name] = zc.get_service_info(type_, name)
-        elif type_ == "_oscjson._tcp.local.":
-            self.oscjson_services[name] = zc.get_service_info(type_, name)
+        self._resolve(zc, type_, name, updated=False)
 
     def update_service(self, zc: "Zeroconf", type_: str, name: str) -> None:
-        if type_ == "_osc._udp.local.":
-            self.osc_services[name] = zc.get_service_info(type_, name)
-        elif type_ == "_oscjson._tcp.local.":
-            self.oscjson_services[name] = zc.get_service_info(type_, name)
+        self._resolve(zc, type_, name, updated=True)
+
+    def _resolve(self, zc: "Zeroconf", type_: str, name: str, updated: bool):
+        """Resolve the service info of an announced service, without blocking the calling zeroconf thread.
+
+        Services whose records are already cached are resolved at once. Otherwise, the service is queried on the event
+        loop of zeroconf, concurrently with all other services that are being resolved.
+        """
+        if type_ not in (_OSC_TYPE, _OSCJSON_TYPE):
+            return
+
+        info = AsyncServiceInfo(type_, name)
+        if info.load_from_cache(zc):
+            future = None
+        else:
+            future = asyncio.run_coroutine_threadsafe(
+                info.async_request(zc, _RESOLVE_TIMEOUT_MS), zc.loop
+            )
+
+        client = None
+        with self._lock:
+            previous = self._pending.pop((type_, name), None)
+            if future is not None:
+                self._pending[(type_, name)] = future
+            else:
+                client = self._add_resolved(type_, name, info, updated)
+        # Outside the lock, since cancel() and add_done_callback() might run the callbacks at once
+        if previous is not None:
+            previous.cancel()
+        if future is None:
+            if client is not None:
+                client.close()
+            if type_ == _OSCJSON_TYPE:
+                self._notify(name)
+            return
+        future.add_done_callback(
+            lambda done: self._on_resolved(type_, name, info, updated, done)
+        )
+
+    def _on_resolved(
+        self,
+        type_: str,
+        name: str,
+        info: AsyncServiceInfo,
+        updated: bool,
+        future: Future,
+    ):
+        client = None
+        with self._lock:
+            # Superseded by a newer announcement, or the service was removed meanwhile
+            if self._pending.get((type_, name)) is not future:
+                return
+            del self._pending[(type_, name)]
+            resolved = (
+                not future.cancelled()
+                and future.exception() is None
+                and future.result()
+            )
+            if resolved:
+                client = self._add_resolved(type_, name, info, updated)
+            self._resolved.notify_all()
+
+        if not resolved:
+            logger.warning("Could not resolve service %s", name)
+        if client is not None:
+            client.close()
+        if resolved and type_ == _OSCJSON_TYPE:
+            self._notify(name)
+
+    def _add_resolved(
+        self, type_: str, name: str, info: ServiceInfo, updated: bool
+    ) -> OSCQueryClient | None:
+        """Store a resolved service, with the lock held. Returns the replaced client, which has to be closed."""
+        if type_ == _OSC_TYPE:
+            self.osc_services[name] = info
+            return None
+        self.oscjson_services[name] = info
+        if not updated:
+            return None
+        return self._forget(name)
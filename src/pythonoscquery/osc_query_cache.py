@@ -0,0 +1,108 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+from .shared.osc_path_node import OSCPathNode
+
+
+class OSCQueryCacheEntry:
+    """A cached query result: the parsed node, its JSON data and the ETag the service sent for it."""
+
+    __slots__ = ("etag", "expires", "json", "node")
+
+    def __init__(
+        self, node: OSCPathNode, json_data: Any, etag: str | None, expires: float
+    ):
+        self.node = node
+        self.json = json_data
+        self.etag = etag
+        self.expires = expires
+
+
+class OSCQueryCache:
+    """Cache for the nodes queried by OSCQueryClient and AsyncOSCQueryClient, keyed by service and node address.
+
+    Within the TTL, queries are answered from the cache without contacting the service. Afterwards, the cached node
+    is revalidated with a conditional request (If-None-Match). If the node didn't change, the service answers with
+    "304 Not Modified" and the already parsed node is reused. The least recently used entries are evicted when the
+    cache is full.
+
+    A cache can be shared between several clients and threads. The cached nodes are shared as well, so they must
+    not be modified.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            max_entries: Maximum number of cached nodes
+            ttl: Seconds during which a cached node is used without revalidating it
+            clock: Time source, in seconds
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: OrderedDict[tuple[str, str], OSCQueryCacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, query_root: str, path: str) -> OSCQueryCacheEntry | None:
+        """The cached entry for a node of a service, fresh or not."""
+        key = (query_root, path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def is_fresh(self, entry: OSCQueryCacheEntry) -> bool:
+        """Whether the entry can be used without revalidating it."""
+        return self._clock() < entry.expires
+
+    def put(
+        self,
+        query_root: str,
+        path: str,
+        node: OSCPathNode,
+        json_data: Any,
+        etag: str | None,
+    ) -> OSCQueryCacheEntry:
+        """Cache a queried node."""
+        entry = OSCQueryCacheEntry(node, json_data, etag, self._clock() + self.ttl)
+        key = (query_root, path)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def refresh(self, entry: OSCQueryCacheEntry):
+        """Mark an entry as fresh again, after the service confirmed that it is still valid."""
+        entry.expires = self._clock() + self.ttl
+
+    def invalidate(self, query_root: str, path: str | None = None):
+        """Remove the cached node with the given address of a service, or all cached nodes of the service."""
+        with self._lock:
+            if path is not None:
+                self._entries.pop((query_root, path), None)
+                return
+            for key in [key for key in self._entries if key[0] == query_root]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({len(self)}/{self.max_entries} entries, ttl={self.ttl})"
@@ -1,12 +1,48 @@
+import logging
+from collections.abc import Callable
+from typing import Any
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 from zeroconf import ServiceInfo
 
+from .osc_query_cache import OSCQueryCache
+from .shared.osc_digest import OSCNodeChange, diff_digests, digest_summary
 from .shared.osc_host_info import OSCHostInfo
+from .shared.osc_lazy_path_node import LazyOSCPathNode
+from .shared.osc_node_stream import OSCNodeStreamDecoder
 from .shared.osc_path_node import OSCPathNode
 
+logger = logging.getLogger(__name__)
+
 
 class OSCQueryClient(object):
-    def __init__(self, service_info) -> None:
+    """HTTP client for an OSCQuery service.
+
+    Every client keeps its connections to the service open and reuses them for subsequent queries (e.g. when
+    crawling the address space node by node). Call close() (or use the client as a context manager) to close them.
+    """
+
+    def __init__(
+        self,
+        service_info,
+        timeout: float | tuple[float, float] = (3.05, 10.0),
+        retries: int = 2,
+        backoff_factor: float = 0.1,
+        pool_maxsize: int = 4,
+        cache: OSCQueryCache | None = None,
+    ) -> None:
+        """
+        Args:
+            service_info: zeroconf ServiceInfo of the OSCQuery service, e.g. from OSCQueryBrowser
+            timeout: Seconds to wait for a connection and for a response. Either one value for both, or a
+                (connect timeout, read timeout) tuple
+            retries: How often a failed query is retried, on connection errors, timeouts and HTTP 502/503/504
+            backoff_factor: The n-th retry waits backoff_factor * 2 ** (n - 1) seconds
+            pool_maxsize: Maximum number of connections that are kept open, for queries from several threads
+            cache: Cache for the queried nodes, e.g. shared between the clients of all discovered services
+        """
         if not isinstance(service_info, ServiceInfo):
             raise Exception("service_info isn't a ServiceInfo class!")
 
@@ -15,6 +51,34 @@ class OSCQueryClient(object):
 
         self.service_info = service_info
         self.last_json = None
+        self.timeout = timeout
+        self.cache = cache
+        self._extensions: dict[str, Any] | None = None
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({"GET"}),
+            raise_on_status=False,
+        )
+        self._session = requests.Session()
+        self._session.mount(
+            "http://",
+            HTTPAdapter(
+                max_retries=retry, pool_connections=1, pool_maxsize=pool_maxsize
+            ),
+        )
+
+    def close(self):
+        """Close all open connections to the service."""
+        self._session.close()
+
+    def __enter__(self) -> "OSCQueryClient":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
 
     def _get_query_root(self) -> str:
         return f"http://{self._get_ip_str()}:{self.service_info.port}"
@@ -23,17 +87,40 @@ class OSCQueryClient(object):
         ip_str = ".".join([str(int(num)) for num in self.service_info.addresses[0]])
         return ip_str
 
-    def query_node(self, node: str = "/") -> OSCPathNode | None:
-        url = self._get_query_root() + node
-        r = None
+    def _get(
+        self, url: str, headers: dict[str, str] | None = None
+    ) -> requests.Response | None:
         try:
-            r = requests.get(url)
-        except Exception as ex:
-            print("Error querying node...", ex)
+            return self._session.get(url, timeout=self.timeout, headers=headers)
+        except requests.RequestException as ex:
+            logger.error("Error querying %s: %s", url, ex)
+            return None
+
+    def query_node(self, node: str = "/") -> OSCPathNode | None:
+        query_root = self._get_query_root()
+        entry = None
+        headers = None
+        if self.cache is not None:
+            entry = self.cache.get(query_root, node)
+            if entry is not None:
+                if self.cache.is_fresh(entry):
+                    self.last_json = entry.json
+                    return entry.node
+                if entry.etag is not None:
+                    headers = {"If-None-Match": entry.etag}
+
+        r = self._get(query_root + node, headers)
         if r is None:
             return None
 
+        if r.status_code == 304 and entry is not None:
+            self.cache.refresh(entry)
+            self.last_json = entry.json
+            return entry.node
+
         if r.status_code == 404:
+            if self.cache is not None:
+                self.cache.invalidate(query_root, node)
             return None
 
         if r.status_code != 200:
@@ -41,37 +128,172 @@ class OSCQueryClient(object):
 
         self.last_json = r.json()
 
-        return OSCPathNode.from_json(self.last_json)
+        path_node = OSCPathNode.from_json(self.last_json)
+        if self.cache is not None:
+            self.cache.put(
+                query_root, node, path_node, self.last_json, r.headers.get("ETag")
+            )
+        return path_node
 
-    def get_host_info(self) -> OSCHostInfo | None:
-        url = self._get_query_root() + "/?HOST_INFO"
-        r = None
+    def query_node_streaming(
+        self,
+        node: str = "/",
+        path_filter: str | None = None,
+        on_node: Callable[[OSCPathNode], None] | None = None,
+        trusted: bool = False,
+        chunk_size: int = 65536,
+    ) -> OSCPathNode | None:
+        """Query a node, decoding the response while it is received.
+
+        Unlike query_node(), neither the whole response nor its JSON data are held in memory, only the created nodes.
+        The cache and last_json are not used.
+
+        Args:
+            node: Address of the node
+            path_filter: Only create this node (and its child nodes) from the response, e.g. "/foo/bar" when querying
+                "/foo". The rest of the response isn't read once this node is complete
+            on_node: Called with every created node as soon as it is complete, child nodes before their parents
+            trusted: Create the nodes like OSCPathNode.from_json(json_data, trusted=True)
+            chunk_size: Number of bytes that are read at once
+        Returns:
+            The node (or the node matching path_filter), or None if it doesn't exist or the service didn't respond
+        """
+        url = self._get_query_root() + node
         try:
-            r = requests.get(url)
-        except Exception:
-            # print("Error querying HOST_INFO...", ex)
-            pass
-        if r is None:
+            with self._session.get(url, timeout=self.timeout, stream=True) as r:
+                if r.status_code == 404:
+                    return None
+
+                if r.status_code != 200:
+                    raise Exception(
+                        "Node query error: (HTTP", r.status_code, ") ", r.content
+                    )
+
+                decoder = OSCNodeStreamDecoder(node, path_filter, trusted)
+                for chunk in r.iter_content(chunk_size):
+                    completed = decoder.feed(chunk)
+                    if on_node is not None:
+                        for completed_node in completed:
+                            on_node(completed_node)
+                    if decoder.done:
+                        break
+                return decoder.close()
+        except requests.RequestException as ex:
+            logger.error("Error querying %s: %s", url, ex)
+            return None
+
+    def query_lazy_node(self, node: str = "/") -> LazyOSCPathNode | None:
+        """Query a node, without querying its whole subtree.
+
+        The child nodes of containers are only queried when they are first accessed. If the service supports the
+        DEPTH extension, only one level of child nodes is queried at a time.
+
+        Args:
+            node: Address of the node
+        Returns:
+            The node, or None if it doesn't exist or the service didn't respond
+        """
+        depth = 1 if self.supports_extension("DEPTH") else None
+        json_data = self._query_json(node, depth)
+        if json_data is None:
+            return None
+
+        return LazyOSCPathNode.from_remote_json(
+            json_data, lambda path: self._query_json(path, depth), depth
+        )
+
+    def supports_extension(self, extension: str) -> bool:
+        """Whether the service advertises the given extension in its host info, e.g. "DEPTH". The host info is
+        only queried once."""
+        if self._extensions is None:
+            host_info = self.get_host_info()
+            if host_info is None:
+                return False
+            self._extensions = host_info.extensions or {}
+        return bool(self._extensions.get(extension))
+
+    def query_digests(self, node: str = "/") -> dict[str, Any] | None:
+        """Query the digests of a node and of its child nodes, via the DIGEST extension.
+
+        Args:
+            node: Address of the node
+        Returns:
+            The digests, see digest_summary(), or None if the node doesn't exist or the service didn't respond
+        """
+        try:
+            return self._get_json(node + "?DIGEST")
+        except requests.RequestException as ex:
+            logger.error("Error querying the digests of %s: %s", node, ex)
+            return None
+
+    def diff(self, local_node: OSCPathNode) -> list[tuple[OSCNodeChange, str]] | None:
+        """Find the differences between a local tree and the same subtree of the service.
+
+        If the service supports the DIGEST extension, only the digests of the subtrees that differ are queried (see
+        diff_digests()), so comparing mostly identical trees needs few, small queries. Otherwise, the whole subtree is
+        queried and compared locally.
+
+        Args:
+            local_node: Root of the local tree, e.g. the root node of a local copy of the address space
+        Returns:
+            The kind of change and the address of every differing node, or None if the service didn't respond
+        """
+        try:
+            if self.supports_extension("DIGEST"):
+                return diff_digests(
+                    local_node, lambda path: self._get_json(path + "?DIGEST")
+                )
+
+            json_data = self._get_json(local_node.full_path)
+            remote_nodes = {}
+            if json_data is not None:
+                remote_nodes = {
+                    node.full_path: node for node in OSCPathNode.from_json(json_data)
+                }
+            return diff_digests(
+                local_node,
+                lambda path: (
+                    digest_summary(remote_nodes[path]) if path in remote_nodes else None
+                ),
+            )
+        except requests.RequestException as ex:
+            logger.error("Error comparing %s: %s", local_node.full_path, ex)
+            return None
+
+    def _get_json(self, path: str) -> Any | None:
+        """Query the service, without catching connection errors. Returns None if the node doesn't exist."""
+        r = self._session.get(self._get_query_root() + path, timeout=self.timeout)
+        if r.status_code == 404:
             return None
 
         if r.status_code != 200:
             raise Exception("Node query error: (HTTP", r.status_code, ") ", r.content)
 
-        json = r.json()
-        hi = OSCHostInfo(json["NAME"], json["EXTENSIONS"])
-        if "OSC_IP" in json:
-            hi.osc_ip = json["OSC_IP"]
-        else:
-            hi.osc_ip = self._get_ip_str()
+        return r.json()
 
-        if "OSC_PORT" in json:
-            hi.osc_port = json["OSC_PORT"]
-        else:
-            hi.osc_port = self.service_info.port
+    def _query_json(self, node: str, depth: int | None) -> Any | None:
+        url = self._get_query_root() + node
+        if depth is not None:
+            url += f"?DEPTH={depth}"
+        r = self._get(url)
+        if r is None or r.status_code == 404:
+            return None
+
+        if r.status_code != 200:
+            raise Exception("Node query error: (HTTP", r.status_code, ") ", r.content)
+
+        self.last_json = r.json()
+        return self.last_json
 
-        if "OSC_TRANSPORT" in json:
-            hi.osc_transport = json["OSC_TRANSPORT"]
-        else:
-            hi.osc_transport = "UDP"
+    def get_host_info(self) -> OSCHostInfo | None:
+        url = self._get_query_root() + "/?HOST_INFO"
+        r = self._get(url)
+        if r is None:
+            return None
+
+        if r.status_code != 200:
+            raise Exception("Node query error: (HTTP", r.status_code, ") ", r.content)
 
-        return hi
+        return OSCHostInfo.from_json(
+            r.json(), self._get_ip_str(), self.service_info.port
+        )
@@ -0,0 +1,280 @@
+import enum
+import logging
+import threading
+import time
+from collections.abc import Callable
+from enum import Enum
+
+from .osc_query_cache import OSCQueryCache
+from .osc_query_client import OSCQueryClient
+from .shared.osc_address_space import OSCAddressSpace
+from .shared.osc_digest import OSCNodeChange
+from .shared.osc_path_node import OSCPathNode
+
+logger = logging.getLogger(__name__)
+
+
+class OSCMirrorChange(Enum):
+    def _generate_next_value_(name, start, count, last_values):
+        return name
+
+    ADDED = enum.auto()
+    """A node was added to the address space"""
+    REMOVED = enum.auto()
+    """A node was removed from the address space, including its child nodes"""
+    VALUE = enum.auto()
+    """The value of a node changed"""
+
+
+class OSCQueryMirror:
+    """Keeps a local copy of the address space of a remote OSCQuery service up to date.
+
+    The first refresh() copies the whole remote address space into a local OSCAddressSpace. Subsequent refreshes only
+    apply the differences: nodes are added and removed, and values of existing nodes are updated in place, so
+    references to the local nodes stay valid. If the service supports the DIGEST extension, the local copy is compared
+    by digest (see OSCQueryClient.diff()) and only the changed subtrees are queried, so a refresh costs about
+    (number of changes) * (depth of the tree) queries. Otherwise the whole address space is queried again; if the
+    service sends ETags, an unchanged address space then costs a single "304 Not Modified" response.
+
+    Refreshes run periodically in a background thread after start(). Lookups via find_node() are served from the local
+    copy; its maximum age can be bounded, in which case a refresh is done first if the copy is older.
+    """
+
+    def __init__(
+        self,
+        service_info,
+        address_space: OSCAddressSpace | None = None,
+        interval: float = 1.0,
+        timeout: float | tuple[float, float] = (3.05, 10.0),
+    ):
+        """
+        Args:
+            service_info: zeroconf ServiceInfo of the OSCQuery service, e.g. from OSCQueryBrowser
+            address_space: The local address space to keep up to date. Should not be changed by anything else
+            interval: Seconds between refreshes in the background thread
+            timeout: Timeout of the queries, see OSCQueryClient
+        """
+        self.address_space = (
+            address_space if address_space is not None else OSCAddressSpace()
+        )
+        self.interval = interval
+        # Without TTL, every query revalidates the previous response
+        self._client = OSCQueryClient(
+            service_info, timeout=timeout, cache=OSCQueryCache(max_entries=1, ttl=0.0)
+        )
+        self._listeners: list[Callable[[OSCMirrorChange, OSCPathNode], None]] = []
+        self._remote_root: OSCPathNode | None = None
+        self._last_sync: float | None = None
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def add_listener(self, listener: Callable[[OSCMirrorChange, OSCPathNode], None]):
+        """Register a callback that is called for every change applied to the local address space.
+
+        Args:
+            listener: Called with the kind of change and the local node. Called from the refreshing thread
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[OSCMirrorChange, OSCPathNode], None]):
+        self._listeners.remove(listener)
+
+    @property
+    def staleness(self) -> float:
+        """Seconds since the local copy was last confirmed to match the remote address space."""
+        if self._last_sync is None:
+            return float("inf")
+        return time.monotonic() - self._last_sync
+
+    def find_node(
+        self, address: str, max_staleness: float | None = None
+    ) -> OSCPathNode | None:
+        """Find a node in the local copy of the address space.
+
+        Args:
+            address: The address of the node to find. Example: "/foo/bar/baz/my_node"
+            max_staleness: If given and the local copy is older than this many seconds, it is refreshed first
+        Returns:
+            The node if it exists, otherwise None
+        """
+        if max_staleness is not None and self.staleness > max_staleness:
+            self.refresh()
+        return self.address_space.find_node(address)
+
+    def refresh(self) -> bool:
+        """Query the remote address space and apply the changes to the local copy.
+
+        Returns:
+            False if the service didn't respond, True otherwise
+        """
+        with self._refresh_lock:
+            if self._remote_root is not None and self._client.supports_extension(
+                "DIGEST"
+            ):
+                changes = self._apply_diff()
+                if changes is None:
+                    return False
+            else:
+                remote_root = self._client.query_node("/")
+                if remote_root is None:
+                    return False
+
+                # The client returns the previous tree if the service answered "304 Not Modified"
+                if remote_root is not self._remote_root:
+                    changes = self._apply(remote_root)
+                    self._remote_root = remote_root
+                else:
+                    changes = []
+            self._last_sync = time.monotonic()
+
+        for change, node in changes:
+            for listener in list(self._listeners):
+                try:
+                    listener(change, node)
+                except Exception:
+                    logger.exception(
+                        "Mirror listener failed for %s of %s",
+                        change.name,
+                        node.full_path,
+                    )
+        return True
+
+    def _apply(
+        self, remote_root: OSCPathNode
+    ) -> list[tuple[OSCMirrorChange, OSCPathNode]]:
+        changes = []
+        remote_paths = set()
+        self._apply_subtree(remote_root, changes, remote_paths)
+
+        for local_node in list(self.address_space.root_node):
+            path = local_node.full_path
+            if path in remote_paths or self.address_space.find_node(path) is None:
+                continue
+            self.address_space.remove_node(path)
+            changes.append((OSCMirrorChange.REMOVED, local_node))
+
+        return changes
+
+    def _apply_diff(self) -> list[tuple[OSCMirrorChange, OSCPathNode]] | None:
+        """Apply the differences that the digests of the local copy and the remote address space show.
+
+        The local copy has the same digests as the remote address space while they match, since its nodes have the
+        same attributes. Returns None if the service didn't respond.
+        """
+        differences = self._client.diff(self.address_space.root_node)
+        if differences is None:
+            return None
+
+        changes = []
+        # Subtrees that have been queried completely, their descendants are up to date
+        applied: list[str] = []
+        # Parents are reported before their child nodes
+        for difference, path in differences:
+            if path == "/" or any(path.startswith(prefix) for prefix in applied):
+                continue
+
+            if difference is OSCNodeChange.REMOVED:
+                local_node = self.address_space.find_node(path)
+                if local_node is not None:
+                    self.address_space.remove_node(path)
+                    changes.append((OSCMirrorChange.REMOVED, local_node))
+                continue
+
+            # Added nodes need their whole subtree. Changed containers only differ in their definition, which replaces
+            # the subtree as well, and changed methods have no child nodes
+            remote_node = self._client.query_node(path)
+            if remote_node is None:
+                # Removed meanwhile, or the service didn't respond: the digests still differ at the next refresh
+                continue
+            self._apply_subtree(remote_node, changes, set())
+            applied.append(path + "/")
+
+        return changes
+
+    def _apply_subtree(
+        self,
+        remote_root: OSCPathNode,
+        changes: list[tuple[OSCMirrorChange, OSCPathNode]],
+        remote_paths: set[str],
+    ):
+        """Add the remote node and its child nodes to the local copy, or update the local nodes."""
+        # Parents are visited before their child nodes, so missing containers are added first
+        for remote_node in remote_root:
+            path = remote_node.full_path
+            remote_paths.add(path)
+            if path == "/":
+                continue
+
+            local_node = self.address_space.find_node(path)
+            if local_node is not None and not _same_definition(local_node, remote_node):
+                self.address_space.remove_node(path)
+                changes.append((OSCMirrorChange.REMOVED, local_node))
+                local_node = None
+
+            if local_node is None:
+                local_node = _copy_node(remote_node)
+                self.address_space.add_node(local_node)
+                changes.append((OSCMirrorChange.ADDED, local_node))
+            elif local_node.value != remote_node.value:
+                local_node.set_value(remote_node.value, validate=False)
+                changes.append((OSCMirrorChange.VALUE, local_node))
+
+    def start(self):
+        """Start refreshing the local copy periodically, in a daemon thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the periodic refreshes."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def close(self):
+        """Stop the periodic refreshes and close the connections to the service."""
+        self.stop()
+        self._client.close()
+
+    def __enter__(self) -> "OSCQueryMirror":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _run(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Refreshing the mirrored address space failed")
+            if self._stop.wait(self.interval):
+                return
+
+
+def _same_definition(local_node: OSCPathNode, remote_node: OSCPathNode) -> bool:
+    """Whether the nodes only differ in their values (if at all)."""
+    return (
+        local_node.type == remote_node.type
+        and local_node.access == remote_node.access
+        and local_node.description == remote_node.description
+        and local_node.value_range == remote_node.value_range
+        and local_node.clipmode == remote_node.clipmode
+    )
+
+
+def _copy_node(remote_node: OSCPathNode) -> OSCPathNode:
+    """A copy of the remote node, without its child nodes."""
+    return OSCPathNode(
+        remote_node.full_path,
+        access=remote_node.access,
+        value=list(remote_node.value) if remote_node.value else None,
+        description=remote_node.description,
+        value_range=remote_node.value_range,
+        clipmode=remote_node.clipmode,
+    )
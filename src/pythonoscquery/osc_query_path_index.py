@@ -0,0 +1,176 @@
+import logging
+import threading
+from typing import TYPE_CHECKING
+
+from zeroconf import ServiceInfo
+
+if TYPE_CHECKING:
+    from .osc_query_browser import OSCQueryListener
+
+logger = logging.getLogger(__name__)
+
+
+class OSCQueryPathIndex:
+    """Index from node addresses to the discovered OSCQuery services that have a node with this address.
+
+    The index is maintained by a background thread: the address space of a service is (re)indexed when zeroconf
+    reports the service as added or updated, and all services are checked periodically. Services that support the
+    DIGEST extension are only queried completely if their address space changed.
+
+    Example:
+        index = OSCQueryPathIndex(browser.listener)
+        index.start()
+        services = index.find_services("/avatar/parameters/foo")
+    """
+
+    def __init__(self, listener: "OSCQueryListener", interval: float = 30.0):
+        """
+        Args:
+            listener: The listener of the browser, which provides the discovered services and their clients
+            interval: Seconds between the periodic checks of all services
+        """
+        self.interval = interval
+        self._listener = listener
+        # Address -> names of the services that have it, and service name -> addresses of its nodes
+        self._paths: dict[str, set[str]] = {}
+        self._service_paths: dict[str, frozenset[str]] = {}
+        self._digests: dict[str, str] = {}
+        # Insertion ordered set of the services to (re)index
+        self._scheduled: dict[str, None] = {}
+        self._busy = False
+        self._stopping = False
+        self._lock = threading.Lock()
+        self._condition = threading.Condition(self._lock)
+        self._thread: threading.Thread | None = None
+
+        listener.add_observer(self.schedule)
+
+    def find_services(self, address: str) -> list[ServiceInfo]:
+        """The indexed services that have a node with the given address.
+
+        Args:
+            address: Address of the node, e.g. "/avatar/parameters/foo"
+        """
+        services = self._listener.oscjson_services
+        with self._lock:
+            names = list(self._paths.get(address, ()))
+        return [services[name] for name in names if name in services]
+
+    def is_indexed(self, name: str) -> bool:
+        """Whether the address space of the service with the given name has been indexed."""
+        return name in self._service_paths
+
+    def schedule(self, name: str | None = None):
+        """Let the background thread (re)index a service, or all discovered services.
+
+        Args:
+            name: Name of the service, None for all services
+        """
+        names = [name] if name is not None else list(self._listener.oscjson_services)
+        with self._condition:
+            self._scheduled.update(dict.fromkeys(names))
+            self._condition.notify_all()
+
+    def refresh(self, name: str) -> bool:
+        """(Re)index the address space of a service now.
+
+        Args:
+            name: Name of the service. If it is no longer discovered, it is removed from the index
+        Returns:
+            False if the service didn't respond, True otherwise
+        """
+        client = self._listener.get_client(name)
+        if client is None:
+            self._set_paths(name, frozenset(), None)
+            return True
+
+        digest = None
+        if client.supports_extension("DIGEST"):
+            summary = client.query_digests("/")
+            if summary is not None:
+                digest = summary["DIGEST"]
+                if digest == self._digests.get(name):
+                    return True
+
+        root = client.query_node("/")
+        if root is None:
+            return False
+        self._set_paths(name, frozenset(node.full_path for node in root), digest)
+        return True
+
+    def _set_paths(self, name: str, paths: frozenset[str], digest: str | None):
+        with self._lock:
+            previous = self._service_paths.get(name, frozenset())
+            for path in previous - paths:
+                names = self._paths[path]
+                names.discard(name)
+                if not names:
+                    del self._paths[path]
+            for path in paths - previous:
+                self._paths.setdefault(path, set()).add(name)
+
+            if paths:
+                self._service_paths[name] = paths
+            else:
+                self._service_paths.pop(name, None)
+            if digest is not None:
+                self._digests[name] = digest
+            else:
+                self._digests.pop(name, None)
+
+    def wait_until_indexed(self, timeout: float | None = None) -> bool:
+        """Wait until all scheduled services have been indexed.
+
+        Returns:
+            False if services were still being indexed when the timeout was over
+        """
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: not self._scheduled and not self._busy, timeout
+            )
+
+    def start(self):
+        """Index all discovered services, and keep the index up to date in a daemon thread."""
+        if self._thread is not None:
+            return
+        self._stopping = False
+        self.schedule()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop maintaining the index. The index is kept as it is."""
+        if self._thread is None:
+            return
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._busy = False
+                self._condition.notify_all()
+                if (
+                    not self._scheduled
+                    and not self._stopping
+                    and not self._condition.wait(self.interval)
+                ):
+                    # Periodic check, the address spaces might have changed without zeroconf events
+                    self._scheduled.update(
+                        dict.fromkeys(self._listener.oscjson_services)
+                    )
+                if self._stopping:
+                    return
+                names = list(self._scheduled)
+                self._scheduled.clear()
+                self._busy = True
+
+            for name in names:
+                try:
+                    if not self.refresh(name):
+                        logger.warning("Could not index service %s", name)
+                except Exception:
+                    logger.exception("Indexing service %s failed", name)
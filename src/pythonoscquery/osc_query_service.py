@@ -1,5 +1,7 @@
 import atexit
+import hashlib
 import ipaddress
+import json
 import logging
 import threading
 import urllib
@@ -10,7 +12,9 @@ from zeroconf import ServiceInfo, Zeroconf
 
 from pythonoscquery.shared.osc_access import OSCAccess
 from pythonoscquery.shared.osc_address_space import OSCAddressSpace
+from pythonoscquery.shared.osc_digest import digest_summary
 from pythonoscquery.shared.osc_host_info import OSCHostInfo
+from pythonoscquery.shared.osc_metrics import OSCMetrics
 from pythonoscquery.shared.osc_path_node import OSCPathNode
 from pythonoscquery.shared.oscquery_spec import OSCQueryAttribute
 
@@ -29,44 +33,58 @@ class OSCQueryService:
         http_port: int,
         osc_port: int,
         osc_ip: IPv4Address | IPv6Address | str = "127.0.0.1",
+        metrics: OSCMetrics | None = None,
     ) -> None:
         """
         Args:
             address_space: OSC address space to serve
             server_name: Name of your OSC Service
-            http_port: TCP port number for the oscquery HTTP server
+            http_port: TCP port number for the oscquery HTTP server, 0 for any free port (the chosen port is then
+                advertised and available as http_port)
             osc_port: TCP/UDP port number that is announced for the osc server
             osc_ip: IP address of the oscquery server. This is also announced as the ip for the osc server
+            metrics: When given, the node metrics are served via the METRICS query extension (e.g. "/foo?METRICS")
         """
         self._address_space = address_space
         self.server_name = server_name
         self.http_port = http_port
         self.osc_port = osc_port
         self.osc_ip = ipaddress.ip_address(osc_ip)
+        self.metrics = metrics
+
+        extensions = {
+            "ACCESS": True,
+            "CLIPMODE": True,
+            "DEPTH": True,
+            "DIGEST": True,
+            "RANGE": True,
+            "TYPE": True,
+            "VALUE": True,
+        }
+        if metrics is not None:
+            extensions["METRICS"] = True
 
         self.host_info = OSCHostInfo(
             server_name,
-            {
-                "ACCESS": True,
-                "CLIPMODE": False,
-                "RANGE": False,
-                "TYPE": True,
-                "VALUE": True,
-            },
+            extensions,
             str(self.osc_ip),
             self.osc_port,
             "UDP",
         )
 
-        zeroconf = Zeroconf(interfaces=[str(self.osc_ip)])
-        self._advertise_osc_query_service(zeroconf)
-        self._advertise_osc_service(zeroconf)
         http_server = OSCQueryHTTPServer(
             self._address_space,
             self.host_info,
             ("", self.http_port),
             OSCQueryHTTPHandler,
+            metrics=self.metrics,
         )
+        # The actual port, if any free port was requested
+        self.http_port = http_server.server_address[1]
+
+        zeroconf = Zeroconf(interfaces=[str(self.osc_ip)])
+        self._advertise_osc_query_service(zeroconf)
+        self._advertise_osc_service(zeroconf)
         http_thread = threading.Thread(target=http_server.serve_forever, daemon=True)
         http_thread.start()
         logger.info(
@@ -128,18 +146,33 @@ class OSCQueryHTTPServer(ThreadingHTTPServer):
         server_address: tuple[str, int],
         request_handler_class,
         bind_and_activate: bool = ...,
+        metrics: OSCMetrics | None = None,
     ) -> None:
         super().__init__(server_address, request_handler_class, bind_and_activate)
         self.address_space = address_space
         self.host_info = host_info
+        self.metrics = metrics
 
 
 class OSCQueryHTTPHandler(SimpleHTTPRequestHandler):
-    def _respond(self, code, data=None):
+    # Keep connections open, so that clients can send several queries over the same connection
+    protocol_version = "HTTP/1.1"
+    # Seconds until idle connections are closed, so that clients that are gone don't keep a server thread busy
+    timeout = 5.0
+
+    def _respond(self, code, data=None, headers: dict[str, str] | None = None):
         self.send_response(code)
         self.send_header("Content-type", "text/json")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if code in (204, 304):
+            # Responses without content must not have a body, or the next response on the connection is garbled
+            self.end_headers()
+            return
+        body = bytes(data, "utf-8")
+        self.send_header("Content-Length", str(len(body)))
         self.end_headers()
-        self.wfile.write(bytes(data, "utf-8"))
+        self.wfile.write(body)
 
     def do_GET(self) -> None:
         logger.debug(f"GET {self.path} (from {self.client_address})")
@@ -157,8 +190,11 @@ class OSCQueryHTTPHandler(SimpleHTTPRequestHandler):
                 "VALUE",
                 "ACCESS",
                 "RANGE",
+                "CLIPMODE",
                 "DESCRIPTION",
-            ):
+                "DEPTH",
+                "DIGEST",
+            ) and not (query == "METRICS" and self.server.metrics is not None):
                 logger.error(f"Attribute {query} not understood by server")
                 self._respond(400, f"Attribute {query} not understood by server")
                 return
@@ -167,12 +203,38 @@ class OSCQueryHTTPHandler(SimpleHTTPRequestHandler):
             self._respond(200, str(self.server.host_info.to_json()))
             return
 
+        if "METRICS" in query_params:
+            if self.server.address_space.find_node(parsed_url.path) is None:
+                self._respond(404, "OSC Path not found")
+                return
+            self._respond(
+                200,
+                json.dumps({"METRICS": self.server.metrics.snapshot(parsed_url.path)}),
+            )
+            return
+
+        # DEPTH limits the levels of child nodes in the response, so clients can fetch big address spaces step by step
+        depth = None
+        if "DEPTH" in query_params:
+            try:
+                depth = int(query_params.pop("DEPTH")[0])
+                if depth < 0:
+                    raise ValueError(depth)
+            except ValueError:
+                self._respond(400, "DEPTH must be a non-negative integer")
+                return
+
         with self.server.address_space.lock:
             node: OSCPathNode = self.server.address_space.find_node(parsed_url.path)
             if node is None:
                 self._respond(404, "OSC Path not found")
                 return
 
+            # DIGEST serves the digests of the node and its child nodes, so clients can find changed subtrees
+            if "DIGEST" in query_params:
+                self._respond(200, json.dumps(digest_summary(node)))
+                return
+
             attribute = None
             if query_params:
                 query = list(query_params)[0]
@@ -194,6 +256,21 @@ class OSCQueryHTTPHandler(SimpleHTTPRequestHandler):
                     )
                     return
 
-            json = str(node.to_json(attribute))
+            node_json = str(node.to_json(attribute, depth))
+
+        # Lets clients revalidate cached nodes with If-None-Match. The ETag is a hash of the response rather than the
+        # digest of the node, since values that are changed in place (e.g. via OSCValueStore.array) keep the digest
+        etag = f'"{hashlib.blake2b(node_json.encode(), digest_size=16).hexdigest()}"'
+        if self._is_not_modified(etag):
+            self._respond(304, headers={"ETag": etag})
+            return
 
-            self._respond(200, json)
+        self._respond(200, node_json, headers={"ETag": etag})
+
+    def _is_not_modified(self, etag: str) -> bool:
+        """Whether the client already has the response with the given ETag (If-None-Match)."""
+        if_none_match = self.headers.get("If-None-Match")
+        return if_none_match is not None and (
+            if_none_match.strip() == "*"
+            or etag in (tag.strip() for tag in if_none_match.split(","))
+        )
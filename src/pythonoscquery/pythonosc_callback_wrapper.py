@@ -1,64 +1,568 @@
+import asyncio
+import inspect
 import logging
+import re
+import threading
+import time
+from collections import deque
+from collections.abc import Coroutine, Generator, Iterable, Mapping, Sequence
+from concurrent.futures import Executor
+from functools import lru_cache
+from itertools import groupby
 from typing import Any, Callable
 
 import pythonosc
+from pythonosc import osc_packet
 from pythonosc.dispatcher import Dispatcher, Handler
+from pythonosc.osc_message import OscMessage
 
 from pythonoscquery.shared.osc_address_space import OSCAddressSpace
+from pythonoscquery.shared.osc_metrics import OSCMetrics, OSCNodeMetrics
 from pythonoscquery.shared.osc_path_node import OSCPathNode
 
 logger = logging.getLogger(__name__)
 
 
 class OSCCallbackWrapper:
-    """Wrapper class to type-check python-osc callbacks."""
+    """Wrapper class to type-check python-osc callbacks.
 
-    def __init__(self, node: OSCPathNode, callback: Callable):
+    Coroutine functions (`async def`) can be used as callbacks. The values are still validated when the wrapper is
+    called, but the coroutine is scheduled as a task on the event loop, so that it does not block the reception
+    of further messages. Tasks are started in the order the messages arrived. Coroutine callbacks can't return a
+    reply message to python-osc.
+
+    Alternatively, callbacks can be run on an executor (e.g. a ThreadPoolExecutor). Messages for the same wrapper
+    (and thus the same address) are still processed one after the other in arrival order, while callbacks for
+    different addresses run in parallel. Callbacks run on an executor can't return a reply message to python-osc.
+
+    In batch mode, the callback receives a list with the values of each message instead of the values of a single
+    message: `callback(address, [values_1, values_2, ...])` (preceded by the client address and followed by the fixed
+    arguments, as usual). When used with OSCQueryDispatcher, the callback is called once for all messages of an OSC
+    bundle that are for the same node and have the same time tag.
+
+    With write-through, the values of every accepted message are stored as the new value of the node (see
+    OSCPathNode.set_value()), so that the OSCQuery server serves the last received values.
+    """
+
+    def __init__(
+        self,
+        node: OSCPathNode,
+        callback: Callable,
+        max_in_flight: int = 16,
+        loop: asyncio.AbstractEventLoop | None = None,
+        executor: Executor | None = None,
+        metrics: OSCMetrics | None = None,
+        batch: bool = False,
+        write_through: bool = False,
+    ):
+        """
+        Args:
+            node: OSCPathNode to use for type checking
+            callback: The callback function. Can be a coroutine function.
+            max_in_flight: Only for coroutine callbacks: The maximum number of callback tasks that run at the same
+                time. Further messages are queued until a task finishes.
+            loop: Only for coroutine callbacks: The event loop to run the callbacks on, if the wrapper is not called
+                from within a running event loop (e.g. from a threaded python-osc server)
+            executor: When given, the callback is run on this executor instead of the thread that receives the
+                messages
+            metrics: When given, accepted and rejected messages and the callback run times are recorded for the node
+            batch: Whether to call the callback with a list of the values of the messages, see above
+            write_through: Whether to store the values of accepted messages as the value of the node
+        """
         self.node = node
         self.callback = callback
+        self.batch = batch
+        self.write_through = write_through
         self.handler: pythonosc.dispatcher.Handler | None = None
+        self._validate_values = node.validate_values
+        self._validate_batch = node.validate_batch
+        self._prefix_length = 0
+        self._metrics: OSCNodeMetrics | None = (
+            metrics.for_node(node.full_path) if metrics is not None else None
+        )
+
+        self._coroutine_scheduler = _CoroutineScheduler(max_in_flight, loop)
+
+        if executor is not None:
+            self._dispatch = _OrderedSubmitter(executor, self._invoke)
+        else:
+            self._dispatch = self._invoke
 
     def register_handler(self, handler: pythonosc.dispatcher.Handler):
         self.handler = handler
 
+        # The arguments in front of the OSC values are passed through unchecked:
+        # - the osc client address, when required by the callback
+        # - the osc message address, always
+        # - the fixed parameters, when required by the callback
+        self._prefix_length = 1 + bool(handler.needs_reply_address) + bool(handler.args)
+
     def __call__(self, *args, **kwargs):
-        logger.debug(f"{self} called with args={args} kwargs={kwargs}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("%s called with args=%s kwargs=%s", self, args, kwargs)
 
         if not self.handler:
             raise TypeError(
                 f"{self.__class__.__name__} for {self.node.full_path} has no handler"
             )
 
-        values = list(args)
-        rebuild_args = []
-
-        if self.handler.needs_reply_address:
-            # the osc client address, when required by the callback, is always the first argument. We don't need to check it.
-            rebuild_args.append(values.pop(0))
-
-        # the osc message address is always the next argument. We don't need to check it.
-        rebuild_args.append(values.pop(0))
-
-        if self.handler.args:
-            # fixed parameters, when required by the callback, are always the next argument. We don't need to check them.
-            rebuild_args.append(values.pop(0))
+        prefix_length = self._prefix_length
+        values = args[prefix_length:]
 
         try:
-            values = self.node.validate_values(values)
-        except TypeError:
+            validated_values = self._validate_values(values)
+            if self.write_through:
+                # Raises ValueError if the values don't fit the OSCValueStore of the node
+                self.node.set_value(validated_values, validate=False)
+        except (TypeError, ValueError):
+            if self._metrics is not None:
+                self._metrics.record_rejected()
             logger.error("Type check failed")
             return None
 
+        if self._metrics is not None:
+            self._metrics.record_accepted()
+
+        if self.batch:
+            return self._dispatch(
+                *args[:prefix_length], [list(validated_values)], **kwargs
+            )
+
+        if validated_values is values:
+            return self._dispatch(*args, **kwargs)
+
         # Re-create the original args, but with sanitized values
-        rebuild_args.extend(values)
-        rebuild_args = tuple(rebuild_args)
+        return self._dispatch(*args[:prefix_length], *validated_values, **kwargs)
+
+    def invoke_batch(
+        self, client_address: tuple[str, int], messages: Sequence[OscMessage]
+    ) -> list:
+        """Validate and dispatch several messages for the node of this wrapper at once.
+
+        Used by OSCQueryDispatcher for the messages of an OSC bundle. Invalid messages are dropped, the others are
+        dispatched in the given order. In batch mode, the callback is called once with the address of the node.
+
+        Args:
+            client_address: Address of the client the messages originated from
+            messages: The messages to dispatch
+        Returns:
+            The results of the callback that are not None
+        """
+        handler = self.handler
+        if not handler:
+            raise TypeError(
+                f"{self.__class__.__name__} for {self.node.full_path} has no handler"
+            )
+
+        validated = self._validate_batch([message.params for message in messages])
+        accepted = [
+            (message, values)
+            for message, values in zip(messages, validated)
+            if values is not None
+        ]
+
+        rejected = len(messages) - len(accepted)
+        if rejected:
+            logger.error(
+                "Type check failed for %d of %d messages", rejected, len(messages)
+            )
+        if self._metrics is not None:
+            if accepted:
+                self._metrics.record_accepted(len(accepted))
+            if rejected:
+                self._metrics.record_rejected(rejected)
+
+        if not accepted:
+            return []
+
+        if self.write_through:
+            # Only the last values of the batch remain visible
+            try:
+                self.node.set_value(accepted[-1][1], validate=False)
+            except ValueError:
+                # The values don't fit the OSCValueStore of the node
+                logger.error("Could not store the values of %s", self.node.full_path)
+
+        prefix = (client_address,) if handler.needs_reply_address else ()
+        fixed_args = (handler.args,) if handler.args else ()
+
+        if self.batch:
+            result = self._dispatch(
+                *prefix,
+                self.node.full_path,
+                *fixed_args,
+                [values for _, values in accepted],
+            )
+            return [] if result is None else [result]
+
+        results = []
+        for message, values in accepted:
+            result = self._dispatch(*prefix, message.address, *fixed_args, *values)
+            if result is not None:
+                results.append(result)
+        return results
+
+    def _invoke(self, *args, **kwargs):
+        metrics = self._metrics
+        start = time.perf_counter() if metrics is not None else 0.0
+
+        result = self.callback(*args, **kwargs)
+
+        if inspect.iscoroutine(result):
+            # Coroutine callbacks only create the coroutine object here, it is run as a task
+            if metrics is not None:
+                result = _timed(result, metrics)
+            return self._coroutine_scheduler(result)
 
-        return self.callback(*rebuild_args, **kwargs)
+        if metrics is not None:
+            metrics.record_latency(time.perf_counter() - start)
+        return result
 
     def __repr__(self):
         return f"{self.__class__.__name__}(address: {self.node.full_path} callback={repr(self.callback)})"
 
 
+async def _timed(coroutine: Coroutine, metrics: OSCNodeMetrics):
+    start = time.perf_counter()
+    try:
+        return await coroutine
+    finally:
+        metrics.record_latency(time.perf_counter() - start)
+
+
+class _OrderedSubmitter:
+    """Runs calls of a function on an executor, one after the other in submission order."""
+
+    batch_size = 32
+    """Maximum number of calls that are run in one executor job, so that busy addresses don't starve others."""
+
+    def __init__(self, executor: Executor, function: Callable):
+        self._executor = executor
+        self._function = function
+        self._pending: deque[tuple[tuple, dict]] = deque()
+        self._lock = threading.Lock()
+        self._scheduled = False
+
+    def __call__(self, *args, **kwargs) -> None:
+        with self._lock:
+            self._pending.append((args, kwargs))
+            if self._scheduled:
+                return
+            self._scheduled = True
+        self._submit()
+
+    def _submit(self):
+        try:
+            self._executor.submit(self._run)
+        except RuntimeError:
+            # E.g. the executor was shut down. The pending calls are dropped, so that later calls submit again
+            with self._lock:
+                dropped = len(self._pending)
+                self._pending.clear()
+                self._scheduled = False
+            logger.exception("Could not submit callback, %d call(s) dropped", dropped)
+
+    def _run(self):
+        for _ in range(self.batch_size):
+            with self._lock:
+                if not self._pending:
+                    self._scheduled = False
+                    return
+                args, kwargs = self._pending.popleft()
+            try:
+                self._function(*args, **kwargs)
+            except Exception:
+                logger.exception("Callback raised")
+
+        with self._lock:
+            if not self._pending:
+                self._scheduled = False
+                return
+        self._submit()
+
+
+class _CoroutineScheduler:
+    """Runs coroutines as tasks on an event loop, in call order and with a bounded number of running tasks."""
+
+    def __init__(self, max_in_flight: int, loop: asyncio.AbstractEventLoop | None):
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        self._max_in_flight = max_in_flight
+        self._loop = loop
+        self._pending: deque[Coroutine] = deque()
+        self._in_flight = 0
+
+    def __call__(self, coroutine: Coroutine) -> None:
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            if self._loop is None:
+                logger.error(
+                    "Coroutine callback %s needs a running event loop, message dropped",
+                    coroutine.__qualname__,
+                )
+                coroutine.close()
+                return
+            self._loop.call_soon_threadsafe(self._enqueue, coroutine)
+            return
+
+        self._enqueue(coroutine)
+
+    def _enqueue(self, coroutine: Coroutine):
+        self._pending.append(coroutine)
+        self._start_tasks()
+
+    def _start_tasks(self):
+        while self._pending and self._in_flight < self._max_in_flight:
+            self._in_flight += 1
+            task = asyncio.ensure_future(self._pending.popleft())
+            task.add_done_callback(self._task_done)
+
+    def _task_done(self, task: asyncio.Task):
+        self._in_flight -= 1
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Coroutine callback raised", exc_info=task.exception())
+        self._start_tasks()
+
+
+class OSCQueryDispatcher(Dispatcher):
+    """python-osc dispatcher that routes messages using an OSC address space instead of matching every mapped address.
+
+    Literal addresses are looked up directly. Address patterns (containing *, ?, [...] or {...}) are resolved by
+    walking the address space tree, matching one address segment per tree level.
+
+    Handlers that are mapped on addresses that are not part of the address space (including addresses containing
+    wildcards) are matched like python-osc does it.
+
+    Consecutive messages of an OSC bundle that have the same time tag and are handled by the same wrapped callback
+    (see OSCCallbackWrapper) are validated and dispatched together. All messages are still delivered in the order in
+    which they appear in the bundle, like python-osc does it.
+
+    Can be used with all python-osc servers instead of `Dispatcher`.
+    """
+
+    def __init__(self, address_space: OSCAddressSpace, strict_timing: bool = True):
+        """
+        Args:
+            address_space: The address space used for routing. Usually the one that is also served via OSCQuery.
+            strict_timing: See `pythonosc.dispatcher.Dispatcher`
+        """
+        super().__init__(strict_timing=strict_timing)
+        self._address_space = address_space
+        self._mapping_version = 0
+        self._unindexed_cache_key = None
+        self._unindexed_addresses: list[str] = []
+        self._wildcard_addresses: dict[str, re.Pattern] = {}
+
+    @property
+    def address_space(self) -> OSCAddressSpace:
+        return self._address_space
+
+    def map(self, address: str, handler: Callable, *args, **kwargs) -> Handler:
+        self._mapping_version += 1
+        return super().map(address, handler, *args, **kwargs)
+
+    def unmap(self, address, handler, *args, **kwargs):
+        self._mapping_version += 1
+        return super().unmap(address, handler, *args, **kwargs)
+
+    def handlers_for_address(
+        self, address_pattern: str
+    ) -> Generator[Handler, None, None]:
+        """Yields handlers matching an address
+
+        Args:
+            address_pattern: Address to match
+
+        Returns:
+            Generator yielding Handlers matching address_pattern
+        """
+        self._update_unindexed_addresses()
+        matched = False
+
+        if not _has_pattern_characters(address_pattern):
+            handlers = self._map.get(address_pattern)
+            if handlers:
+                matched = True
+                yield from handlers
+            for address, pattern in self._wildcard_addresses.items():
+                if pattern.match(address_pattern):
+                    handlers = self._map.get(address)
+                    if handlers:
+                        matched = True
+                        yield from handlers
+        else:
+            segments = _compile_address_pattern(address_pattern)
+            if segments is None:
+                # Invalid patterns don't match anything
+                return
+
+            for node in self._walk(segments):
+                handlers = self._map.get(node.full_path)
+                if handlers:
+                    matched = True
+                    yield from handlers
+
+            if self._unindexed_addresses:
+                pattern = _compile_full_address_pattern(address_pattern)
+                for address in self._unindexed_addresses:
+                    wildcard_pattern = self._wildcard_addresses.get(address)
+                    if pattern.match(address) or (
+                        wildcard_pattern is not None
+                        and wildcard_pattern.match(address_pattern)
+                    ):
+                        handlers = self._map.get(address)
+                        if handlers:
+                            matched = True
+                            yield from handlers
+
+        if not matched and self._default_handler:
+            logger.debug("No handler matched but default handler present, added it.")
+            yield self._default_handler
+
+    def call_handlers_for_packet(
+        self, data: bytes, client_address: tuple[str, int]
+    ) -> list:
+        """Invoke handlers for all messages in an OSC packet.
+
+        Args:
+            data: Data of packet
+            client_address: Address of client this packet originated from
+        Returns:
+            A list of strings or tuples to be converted to OSC messages and returned to the client
+        """
+        results = []
+        try:
+            packet = osc_packet.OscPacket(data)
+        except osc_packet.ParseError:
+            return results
+
+        for timetag, groups in self._group_messages(packet.messages):
+            now = time.time()
+            if self._strict_timing and timetag > now:
+                time.sleep(timetag - now)
+            for handler, messages in groups:
+                if len(messages) > 1 and isinstance(
+                    handler.callback, OSCCallbackWrapper
+                ):
+                    results.extend(
+                        handler.callback.invoke_batch(client_address, messages)
+                    )
+                    continue
+                for message in messages:
+                    result = handler.invoke(client_address, message)
+                    if result is not None:
+                        results.append(result)
+        return results
+
+    async def async_call_handlers_for_packet(
+        self, data: bytes, client_address: tuple[str, int]
+    ) -> list:
+        """Invoke handlers for all messages in an OSC packet, from within an event loop.
+
+        Args:
+            data: Data of packet
+            client_address: Address of client this packet originated from
+        Returns:
+            A list of strings or tuples to be converted to OSC messages and returned to the client
+        """
+        results = []
+        try:
+            packet = osc_packet.OscPacket(data)
+        except osc_packet.ParseError:
+            return results
+
+        for timetag, groups in self._group_messages(packet.messages):
+            now = time.time()
+            if self._strict_timing and timetag > now:
+                await asyncio.sleep(timetag - now)
+            for handler, messages in groups:
+                if len(messages) > 1 and isinstance(
+                    handler.callback, OSCCallbackWrapper
+                ):
+                    results.extend(
+                        handler.callback.invoke_batch(client_address, messages)
+                    )
+                    continue
+                for message in messages:
+                    result = await handler.async_invoke(client_address, message)
+                    if result is not None:
+                        results.append(result)
+        return results
+
+    def _group_messages(
+        self, timed_messages: Iterable[osc_packet.TimedMessage]
+    ) -> Generator[tuple[float, list[tuple[Handler, list[OscMessage]]]], None, None]:
+        """Group the (time sorted) messages of a packet by time tag, and then into runs of consecutive messages for
+        the same wrapped callback. The groups are in the order in which the messages are delivered.
+        Messages without handler are dropped, time tags without any handled message are skipped."""
+        handlers_by_address: dict[str, list[Handler]] = {}
+        for timetag, same_time_messages in groupby(
+            timed_messages, key=lambda timed_message: timed_message.time
+        ):
+            groups: list[tuple[Handler, list[OscMessage]]] = []
+            for timed_message in same_time_messages:
+                message = timed_message.message
+                handlers = handlers_by_address.get(message.address)
+                if handlers is None:
+                    handlers = list(self.handlers_for_address(message.address))
+                    handlers_by_address[message.address] = handlers
+                for handler in handlers:
+                    # Appending to the last group keeps the delivery order
+                    if (
+                        groups
+                        and groups[-1][0] is handler
+                        and isinstance(handler.callback, OSCCallbackWrapper)
+                    ):
+                        groups[-1][1].append(message)
+                    else:
+                        groups.append((handler, [message]))
+            if groups:
+                yield timetag, groups
+
+    def _walk(self, segments: tuple[str | re.Pattern, ...]) -> list[OSCPathNode]:
+        """Find all nodes that match the given (compiled) address segments."""
+        find_node = self._address_space.find_node
+        nodes = [self._address_space.root_node]
+        for segment in segments:
+            matches = []
+            for node in nodes:
+                if not node.contents:
+                    continue
+                if isinstance(segment, str):
+                    prefix = "" if node.full_path == "/" else node.full_path
+                    child = find_node(f"{prefix}/{segment}")
+                    if child is not None:
+                        matches.append(child)
+                else:
+                    for child in node.contents:
+                        if segment.fullmatch(child.full_path.rsplit("/", 1)[1]):
+                            matches.append(child)
+            if not matches:
+                return matches
+            nodes = matches
+        return nodes
+
+    def _update_unindexed_addresses(self):
+        """Keep track of the mapped addresses that can't be routed via the address space."""
+        cache_key = (self._mapping_version, self._address_space.version)
+        if cache_key == self._unindexed_cache_key:
+            return
+        self._unindexed_cache_key = cache_key
+
+        find_node = self._address_space.find_node
+        self._unindexed_addresses = [
+            address
+            for address, handlers in self._map.items()
+            if handlers and find_node(address) is None
+        ]
+        self._wildcard_addresses = {
+            address: re.compile(re.escape(address).replace(r"\*", ".*?") + "$")
+            for address in self._unindexed_addresses
+            if "*" in address
+        }
+
+
 def map_node(
     node: OSCPathNode,
     dispatcher: Dispatcher,
@@ -66,6 +570,12 @@ def map_node(
     address_space: OSCAddressSpace | None = None,
     *args: Any | list[Any],
     needs_reply_address: bool = False,
+    max_in_flight: int = 16,
+    loop: asyncio.AbstractEventLoop | None = None,
+    executor: Executor | None = None,
+    metrics: OSCMetrics | None = None,
+    batch: bool = False,
+    write_through: bool = False,
 ) -> Handler:
     """Map the given callback on the given dispatcher.
     Wraps the callback so that the values can be checked if they match the values from the given node.
@@ -73,22 +583,220 @@ def map_node(
     Args:
         node: OSCPathNode to use for type checking
         dispatcher: python-osc dispatcher
-        callback: the callback function that is called when the python-osc server receives a matching message
+        callback: the callback function that is called when the python-osc server receives a matching message.
+            Can be a coroutine function (`async def`), see OSCCallbackWrapper
         address_space: When given, adds the node to this address space for us in the OSCQuery server
         *args: Fixed arguments that will be passed to the callback function
         needs_reply_address: Whether the IP address from which the message originated from shall be passed as
             an argument to the handler callback
+        max_in_flight: Only for coroutine callbacks: The maximum number of concurrently running callback tasks
+        loop: Only for coroutine callbacks: The event loop to use when not called from within a running loop
+        executor: When given, the callback is run on this executor. Messages for the node are still processed in
+            arrival order, see OSCCallbackWrapper
+        metrics: When given, message counts and callback run times are recorded for the node
+        batch: Whether the callback receives a list with the values of each message (e.g. all messages for the node
+            in an OSC bundle), see OSCCallbackWrapper
+        write_through: Whether the values of accepted messages are stored as the value of the node, so that they
+            are served via OSCQuery
 
     Returns:
         The python-osc handler object that will be invoked should the given address match
     """
-    wrapper = OSCCallbackWrapper(node, callback)
-    handler = dispatcher.map(
-        node.full_path, wrapper, *args, needs_reply_address=needs_reply_address
+    handler = _map_wrapped_callback(
+        node,
+        dispatcher,
+        callback,
+        *args,
+        needs_reply_address=needs_reply_address,
+        max_in_flight=max_in_flight,
+        loop=loop,
+        executor=executor,
+        metrics=metrics,
+        batch=batch,
+        write_through=write_through,
     )
-    wrapper.register_handler(handler)
 
     if address_space:
         address_space.add_node(node)
 
     return handler
+
+
+def map_address_space(
+    address_space: OSCAddressSpace,
+    dispatcher: Dispatcher,
+    callbacks: Callable[[OSCPathNode], Callable | None] | Mapping[str, Callable],
+    *args: Any | list[Any],
+    needs_reply_address: bool = False,
+    max_in_flight: int = 16,
+    loop: asyncio.AbstractEventLoop | None = None,
+    executor: Executor | None = None,
+    metrics: OSCMetrics | None = None,
+    batch: bool = False,
+    write_through: bool = False,
+) -> dict[str, Handler]:
+    """Map all method nodes of the given address space on the given dispatcher in one pass.
+    Like map_node(), every callback is wrapped so that the values are checked against its node.
+
+    Args:
+        address_space: The address space whose method nodes will be mapped. Container nodes are never mapped.
+        dispatcher: python-osc dispatcher
+        callbacks: Either a function that returns the callback for a given node (or None, to not map that node), or
+            a mapping from address prefixes to callbacks. With a mapping, the callback with the longest matching
+            prefix is used, e.g. {"/": default_callback, "/mixer": mixer_callback}
+        *args: Fixed arguments that will be passed to the callback functions
+        needs_reply_address: Whether the IP address from which the message originated from shall be passed as
+            an argument to the handler callbacks
+        max_in_flight: Only for coroutine callbacks: The maximum number of concurrently running tasks per callback
+        loop: Only for coroutine callbacks: The event loop to use when not called from within a running loop
+        executor: When given, the callbacks are run on this executor. Messages for the same node are still processed
+            in arrival order, messages for different nodes in parallel
+        metrics: When given, message counts and callback run times are recorded for all mapped nodes
+        batch: Whether the callbacks receive a list with the values of each message, see OSCCallbackWrapper
+        write_through: Whether the values of accepted messages are stored as the values of the nodes
+
+    Returns:
+        The python-osc handler objects, by address
+    """
+    if isinstance(callbacks, Mapping):
+        route = _prefix_router(callbacks)
+    else:
+        route = callbacks
+
+    handlers = {}
+    for node in address_space.root_node:
+        if node.is_container:
+            continue
+
+        callback = route(node)
+        if callback is None:
+            continue
+
+        handlers[node.full_path] = _map_wrapped_callback(
+            node,
+            dispatcher,
+            callback,
+            *args,
+            needs_reply_address=needs_reply_address,
+            max_in_flight=max_in_flight,
+            loop=loop,
+            executor=executor,
+            metrics=metrics,
+            batch=batch,
+            write_through=write_through,
+        )
+
+    return handlers
+
+
+def _map_wrapped_callback(
+    node: OSCPathNode,
+    dispatcher: Dispatcher,
+    callback: Callable,
+    *args: Any | list[Any],
+    needs_reply_address: bool = False,
+    **wrapper_kwargs,
+) -> Handler:
+    wrapper = OSCCallbackWrapper(node, callback, **wrapper_kwargs)
+    handler = dispatcher.map(
+        node.full_path, wrapper, *args, needs_reply_address=needs_reply_address
+    )
+    wrapper.register_handler(handler)
+    return handler
+
+
+def _prefix_router(
+    callbacks: Mapping[str, Callable],
+) -> Callable[[OSCPathNode], Callable | None]:
+    """Build a routing function that returns the callback with the longest address prefix matching a node."""
+
+    def route(node: OSCPathNode) -> Callable | None:
+        path = node.full_path
+        while True:
+            callback = callbacks.get(path)
+            if callback is not None:
+                return callback
+            if path == "/":
+                return None
+            path = path.rsplit("/", 1)[0] or "/"
+
+    return route
+
+
+_pattern_characters = frozenset("*?[]{}")
+
+
+def _has_pattern_characters(address: str) -> bool:
+    return not _pattern_characters.isdisjoint(address)
+
+
+def _translate_pattern(pattern: str) -> str:
+    """Convert an OSC address pattern (or a segment of it) to a python regular expression.
+    Follows the conversion python-osc does in `Dispatcher.handlers_for_address`."""
+    regex = ""
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "*":
+            regex += "[^/]*"
+        elif c == "?":
+            regex += "[^/]"
+        elif c == "[":
+            regex += "["
+            i += 1
+            if i < len(pattern) and pattern[i] == "!":
+                regex += "^"
+                i += 1
+            while i < len(pattern) and pattern[i] != "]":
+                if pattern[i] in r"\^$.|()+*?":
+                    regex += "\\"
+                regex += pattern[i]
+                i += 1
+            regex += "]"
+        elif c == "{":
+            regex += "("
+            i += 1
+            while i < len(pattern) and pattern[i] != "}":
+                char = pattern[i]
+                if char == ",":
+                    regex += "|"
+                elif char in r"\^$.|()[]+*?":
+                    regex += "\\" + char
+                else:
+                    regex += char
+                i += 1
+            regex += ")"
+        elif c in r"\^$.|()[]+?":
+            regex += "\\" + c
+        else:
+            regex += c
+        i += 1
+    return regex
+
+
+@lru_cache(maxsize=1024)
+def _compile_address_pattern(
+    address_pattern: str,
+) -> tuple[str | re.Pattern, ...] | None:
+    """Split an address pattern into segments. Literal segments stay strings, the others are compiled to regular
+    expressions. Returns None if the pattern is invalid."""
+    if not address_pattern.startswith("/"):
+        return None
+    segments = []
+    for segment in address_pattern[1:].split("/"):
+        if not _has_pattern_characters(segment):
+            segments.append(segment)
+            continue
+        try:
+            segments.append(re.compile(_translate_pattern(segment)))
+        except re.error:
+            return None
+    return tuple(segments)
+
+
+@lru_cache(maxsize=1024)
+def _compile_full_address_pattern(address_pattern: str) -> re.Pattern:
+    try:
+        return re.compile("^" + _translate_pattern(address_pattern) + "$")
+    except re.error:
+        return re.compile("(?!)")
@@ -1,8 +1,9 @@
 import logging
 import threading
-from functools import lru_cache
+from collections.abc import Iterator
 
 from .osc_path_node import OSCPathNode
+from .oscquery_spec import OSCQueryAttribute
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +19,9 @@ class OSCAddressSpace:
     def __init__(self):
         self._root = OSCPathNode("/", description="root node")
         self._lock = threading.Lock()
+        # Index of all nodes in the tree by their full path
+        self._nodes: dict[str, OSCPathNode] = {self._root.full_path: self._root}
+        self._version = 0
 
     @property
     def lock(self) -> threading.Lock:
@@ -29,13 +33,14 @@ class OSCAddressSpace:
         return self._root
 
     @property
-    @lru_cache()
     def number_of_nodes(self) -> int:
         """The number of nodes in the address space. Includes the root node."""
-        number_of_nodes = 0
-        for _ in self._root:
-            number_of_nodes += 1
-        return number_of_nodes
+        return len(self._nodes)
+
+    @property
+    def version(self) -> int:
+        """Incremented whenever nodes are added to or removed from the address space."""
+        return self._version
 
     def add_node(self, node: OSCPathNode):
         """Add a node to the address space.
@@ -48,40 +53,85 @@ class OSCAddressSpace:
             path of "/foo/bar/baz/new_node", the container node "baz" will be added as a child of "/foo/bar/", and then
              the method node "new_node" will be added as a child of "/foo/bar/baz".
 
+        The node and the child nodes it has at this time are indexed for find_node(). Child nodes that are attached
+        later with OSCPathNode.add_child() (or fetched later by a LazyOSCPathNode) are not indexed; add them with
+        add_node() instead.
+
         Args:
             node: OSC path node that will be added to the address space
+        Raises:
+            ValueError if an existing node on the path is not a container. The address space is left unchanged
         """
-        if self.find_node(node.full_path) is not None:
-            logger.warning(
-                "Node (%s) already exists, not added again to address space",
-                node.full_path,
-            )
-            return
-
-        path = node.full_path.split("/")
-
-        child_path = ""
-        current_node = self._root
-
-        for path_segment in path:
-            if path_segment == "":
-                continue
-            child_path += "/" + path_segment
-
-            if child_path == node.full_path:
-                # All nodes up to the destination have been created, the last node is the actual node that is to be added
-                child = node
-            else:
-                child = self.find_node(child_path)
-            if not child:
-                child = OSCPathNode(child_path)
-
-            with self.lock:
+        with self.lock:
+            if node.full_path in self._nodes:
+                logger.warning(
+                    "Node (%s) already exists, not added again to address space",
+                    node.full_path,
+                )
+                return
+
+            # Find the deepest existing node on the path first, so that nothing is added if it can't take child nodes
+            segments = node.full_path.split("/")[1:]
+            parent = self._root
+            missing = len(segments)
+            for i in range(1, len(segments)):
+                existing = self._nodes.get("/".join(["", *segments[:i]]))
+                if existing is None:
+                    break
+                parent = existing
+                missing = len(segments) - i
+            if not parent.is_container:
+                raise ValueError(
+                    f"Can only add child nodes to an OSC container. Node '{parent.full_path}' is not a container"
+                )
+
+            current_node = parent
+            for i in range(len(segments) - missing + 1, len(segments) + 1):
+                child_path = "/".join(["", *segments[:i]])
+                if child_path == node.full_path:
+                    # All nodes up to the destination exist, the last node is the actual node that is to be added
+                    child = node
+                else:
+                    child = OSCPathNode(child_path)
                 current_node.add_child(child)
+                self._index(child)
+                current_node = child
+
+            self._version += 1
 
-            current_node = child
+    def remove_node(self, address: str) -> OSCPathNode | None:
+        """Remove a node, including all of its child nodes, from the address space.
+        The parent container is kept, even if it has no child nodes left.
 
-        self.__class__.number_of_nodes.fget.cache_clear()
+        Args:
+            address: The address of the node to remove. Example: "/foo/bar/baz/my_node"
+        Returns:
+            The removed node, or None if the address space doesn't contain it
+        Raises:
+            ValueError if the address is the one of the root node
+        """
+        if address == self._root.full_path:
+            raise ValueError("The root node can't be removed from the address space")
+
+        with self.lock:
+            node = self._nodes.get(address)
+            if node is None:
+                return None
+
+            parent = self._nodes[address.rsplit("/", 1)[0] or "/"]
+            parent.contents.remove(node)
+            node._parent = None
+            parent._invalidate_digests()
+            for sub_node in _loaded_nodes(node):
+                self._nodes.pop(sub_node.full_path, None)
+
+            self._version += 1
+            return node
+
+    def _index(self, node: OSCPathNode):
+        """Add a node that was just linked into the tree, including its child nodes, to the path index."""
+        for sub_node in _loaded_nodes(node):
+            self._nodes[sub_node.full_path] = sub_node
 
     def find_node(self, address: str) -> OSCPathNode | None:
         """Find a node in the address space.
@@ -90,7 +140,16 @@ class OSCAddressSpace:
         Returns:
             The node if it exists, otherwise None
         """
-        return self.root_node.find_subnode(address)
+        return self._nodes.get(address)
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}({self.number_of_nodes} nodes)"
+
+
+def _loaded_nodes(node: OSCPathNode) -> Iterator[OSCPathNode]:
+    """The node and its child nodes, without fetching the child nodes of a LazyOSCPathNode that aren't loaded yet."""
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        yield current
+        stack.extend(current.attributes.get(OSCQueryAttribute.CONTENTS) or ())
@@ -0,0 +1,90 @@
+import enum
+from collections.abc import Callable
+from enum import Enum
+from typing import Any
+
+from .osc_path_node import OSCPathNode
+from .oscquery_spec import OSCQueryAttribute
+
+
+class OSCNodeChange(Enum):
+    def _generate_next_value_(name, start, count, last_values):
+        return name
+
+    ADDED = enum.auto()
+    """The node only exists in the remote tree"""
+    REMOVED = enum.auto()
+    """The node only exists in the local tree"""
+    CHANGED = enum.auto()
+    """The attributes (e.g. the value) of the node differ"""
+
+
+def digest_summary(node: OSCPathNode) -> dict[str, Any]:
+    """The digests of a node and of its child nodes, as served via the DIGEST query extension.
+
+    Example:
+        {"DIGEST": "...", "ATTRIBUTES_DIGEST": "...", "CONTENTS": {"foo": "...", "bar": "..."}}
+    """
+    summary = {"DIGEST": node.digest, "ATTRIBUTES_DIGEST": node.attributes_digest}
+    contents = node.attributes.get(OSCQueryAttribute.CONTENTS)
+    if contents:
+        summary["CONTENTS"] = {
+            child.full_path.rsplit("/", 1)[-1]: child.digest for child in contents
+        }
+    return summary
+
+
+def diff_digests(
+    local_node: OSCPathNode,
+    fetch_summary: Callable[[str], dict[str, Any] | None],
+) -> list[tuple[OSCNodeChange, str]]:
+    """Find the differences between a local tree and a remote tree, by comparing the digests of their nodes.
+
+    Only the summaries (see digest_summary()) of nodes whose digests differ are fetched, so the differences of two
+    mostly identical trees are found with about (number of differences) * (depth of the tree) fetches. Subtrees that
+    only exist on one side are reported once, by their root.
+
+    Args:
+        local_node: Root of the local tree
+        fetch_summary: Returns the summary of the remote node with the given address, or None if it doesn't exist
+    Returns:
+        The kind of change and the address of every differing node, parents before their child nodes. Empty if the
+        trees are the same. If the remote node doesn't exist at all, the local node is reported as REMOVED
+    """
+    summary = fetch_summary(local_node.full_path)
+    if summary is None:
+        return [(OSCNodeChange.REMOVED, local_node.full_path)]
+
+    changes = []
+    stack = [(local_node, summary)]
+    while stack:
+        node, summary = stack.pop()
+        if summary["DIGEST"] == node.digest:
+            continue
+        if summary["ATTRIBUTES_DIGEST"] != node.attributes_digest:
+            changes.append((OSCNodeChange.CHANGED, node.full_path))
+
+        local_children = {
+            child.full_path.rsplit("/", 1)[-1]: child
+            for child in node.attributes.get(OSCQueryAttribute.CONTENTS) or ()
+        }
+        prefix = node.full_path.rstrip("/")
+        differing = []
+        for name, digest in (summary.get("CONTENTS") or {}).items():
+            child = local_children.pop(name, None)
+            if child is None:
+                changes.append((OSCNodeChange.ADDED, f"{prefix}/{name}"))
+            elif child.digest != digest:
+                differing.append(child)
+        for child in local_children.values():
+            changes.append((OSCNodeChange.REMOVED, child.full_path))
+
+        for child in differing:
+            child_summary = fetch_summary(child.full_path)
+            if child_summary is None:
+                # Removed since the summary of its parent was fetched
+                changes.append((OSCNodeChange.REMOVED, child.full_path))
+            else:
+                stack.append((child, child_summary))
+
+    return changes
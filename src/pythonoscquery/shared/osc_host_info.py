@@ -1,5 +1,6 @@
 import json
 from json import JSONEncoder
+from typing import Any
 
 
 class OSCHostInfoEncoder(JSONEncoder):
@@ -16,6 +17,27 @@ class OSCHostInfoEncoder(JSONEncoder):
 
 
 class OSCHostInfo:
+    @classmethod
+    def from_json(
+        cls, json_data: dict[str, Any], osc_ip: str, osc_port: int
+    ) -> "OSCHostInfo":
+        """Factory method to create an instance of OSCHostInfo from the JSON data of a HOST_INFO query.
+
+        Args:
+            json_data: The HOST_INFO JSON data
+            osc_ip: The OSC ip to use if the host info doesn't contain one, usually the ip of the OSCQuery server
+            osc_port: The OSC port to use if the host info doesn't contain one
+        """
+        return cls(
+            json_data["NAME"],
+            json_data["EXTENSIONS"],
+            json_data.get("OSC_IP", osc_ip),
+            json_data.get("OSC_PORT", osc_port),
+            json_data.get("OSC_TRANSPORT", "UDP"),
+            json_data.get("WS_IP"),
+            json_data.get("WS_PORT"),
+        )
+
     def __init__(
         self,
         name: str,
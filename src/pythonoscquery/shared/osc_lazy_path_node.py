@@ -0,0 +1,121 @@
+from collections.abc import Callable
+from typing import Any
+
+from .osc_path_node import OSCPathNode
+from .oscquery_spec import OSCQueryAttribute
+
+
+class LazyOSCPathNode(OSCPathNode):
+    """A node of a remote address space that fetches its child nodes when they are first accessed.
+
+    Only the branches of the address space that are actually accessed (via contents, find_subnode() or iteration) are
+    queried from the service. Fetched child nodes are kept, so every branch is queried at most once.
+    """
+
+    _fetch: Callable[[str], dict[str, Any] | None] | None = None
+    _fetch_depth: int | None = None
+    _loaded = True
+
+    @classmethod
+    def from_remote_json(
+        cls,
+        json_data: dict[str, Any],
+        fetch: Callable[[str], dict[str, Any] | None],
+        fetch_depth: int | None,
+    ) -> "LazyOSCPathNode":
+        """Create a node from the JSON data of a node query.
+
+        Args:
+            json_data: The JSON data of the node, with at most fetch_depth levels of child nodes
+            fetch: Queries the JSON data of the node with the given address (with at most fetch_depth levels of child
+                nodes). Returns None if the query failed
+            fetch_depth: Levels of child nodes in the JSON data returned by fetch, None if it contains the whole
+                subtree
+        Raises:
+            ValueError if fetch_depth is less than 1, since then fetch can't return child nodes
+        """
+        if fetch_depth is not None and fetch_depth < 1:
+            raise ValueError("fetch_depth must be at least 1")
+        return cls._from_remote_json(json_data, fetch, fetch_depth, fetch_depth)
+
+    @classmethod
+    def _from_remote_json(
+        cls,
+        json_data: dict[str, Any],
+        fetch: Callable[[str], dict[str, Any] | None],
+        fetch_depth: int | None,
+        depth: int | None,
+    ) -> "LazyOSCPathNode":
+        node = cls.from_json(
+            {key: value for key, value in json_data.items() if key != "CONTENTS"}
+        )
+        node._fetch = fetch
+        node._fetch_depth = fetch_depth
+        node._set_contents(json_data, depth)
+        return node
+
+    def _set_contents(self, json_data: dict[str, Any], depth: int | None):
+        """Create the child nodes from the CONTENTS of the JSON data, which has the given levels of child nodes."""
+        sub_nodes = json_data.get("CONTENTS")
+        if sub_nodes is not None:
+            child_depth = None if depth is None else depth - 1
+            self._attach_contents(
+                [
+                    self._from_remote_json(
+                        sub_node, self._fetch, self._fetch_depth, child_depth
+                    )
+                    for sub_node in sub_nodes.values()
+                ],
+                trusted=True,
+            )
+            # The digests so far didn't include the fetched child nodes
+            self._invalidate_digests()
+        # Without CONTENTS, a container at the depth limit might still have child nodes
+        self._loaded = (
+            sub_nodes is not None
+            or depth is None
+            or depth > 0
+            or bool(self._attributes[OSCQueryAttribute.VALUE])
+        )
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the child nodes of this node have been fetched."""
+        return self._loaded
+
+    @property
+    def contents(self) -> list["OSCPathNode"]:
+        if not self._loaded:
+            json_data = self._fetch(self.full_path)
+            # If the query failed, it is tried again on the next access
+            if json_data is not None:
+                self._set_contents(json_data, self._fetch_depth)
+        return self._attributes[OSCQueryAttribute.CONTENTS]
+
+    @property
+    def is_container(self) -> bool:
+        # Doesn't fetch the child nodes: nodes without values are containers anyway
+        if self._attributes[OSCQueryAttribute.CONTENTS] or not self.value:
+            return True
+        return False
+
+    def find_subnode(self, full_path: str) -> "OSCPathNode | None":
+        """Find a node with the given full path, fetching only the branch that leads to it.
+        Args:
+            full_path: Address of the node to find, e.g. "/test/bar"
+        Returns:
+            The found node or None if not found
+        """
+        if self.full_path == full_path:
+            return self
+
+        if self.value or not full_path.startswith(self.full_path.rstrip("/") + "/"):
+            return None
+
+        for sub_node in self.contents or ():
+            if full_path == sub_node.full_path or full_path.startswith(
+                sub_node.full_path + "/"
+            ):
+                return sub_node.find_subnode(full_path)
+
+        return None
@@ -0,0 +1,182 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Any
+
+default_latency_buckets = (
+    0.0001,
+    0.0005,
+    0.001,
+    0.005,
+    0.01,
+    0.05,
+    0.1,
+    0.5,
+    1.0,
+)
+"""Upper bounds (in seconds) of the default callback latency histogram buckets. Latencies above the last bound are
+counted in an additional overflow bucket."""
+
+
+# Number of counter stripes per node, see OSCNodeMetrics
+_number_of_stripes = 16
+
+
+class _Stripe:
+    """The counters of the threads whose native thread id maps to this stripe."""
+
+    __slots__ = (
+        "accepted",
+        "histogram",
+        "last_message",
+        "latency_count",
+        "latency_sum",
+        "lock",
+        "rejected",
+    )
+
+    def __init__(self, number_of_buckets: int):
+        # Only contended if threads that map to the same stripe record at the same time
+        self.lock = threading.Lock()
+        self.accepted = 0
+        self.rejected = 0
+        self.latency_count = 0
+        self.latency_sum = 0.0
+        self.histogram = [0] * number_of_buckets
+        self.last_message: float | None = None
+
+
+class OSCNodeMetrics:
+    """Message counters and a callback latency histogram for a single OSC node.
+
+    The counters are striped: every thread records into one of a fixed number of sets of counters (picked by its
+    native thread id), which are summed up when a snapshot is taken. Each stripe has its own lock, so concurrent
+    threads rarely contend, and the memory use doesn't grow with the number of threads (e.g. with a
+    ThreadingOSCUDPServer, which starts a thread per message).
+    """
+
+    def __init__(self, path: str, buckets: tuple[float, ...] = default_latency_buckets):
+        """
+        Args:
+            path: Address of the node
+            buckets: Upper bounds (in seconds) of the latency histogram buckets, in ascending order
+        """
+        self.path = path
+        self._buckets = buckets
+        self._stripes: dict[int, _Stripe] = {}
+
+    def _stripe(self) -> _Stripe:
+        # Native thread ids are mostly consecutive, so concurrent threads tend to get different stripes
+        index = threading.get_native_id() % _number_of_stripes
+        stripe = self._stripes.get(index)
+        if stripe is None:
+            stripe = self._stripes.setdefault(index, _Stripe(len(self._buckets) + 1))
+        return stripe
+
+    def record_accepted(self, count: int = 1):
+        """Count a message (or the given number of messages) that passed validation."""
+        stripe = self._stripe()
+        with stripe.lock:
+            stripe.accepted += count
+            stripe.last_message = time.time()
+
+    def record_rejected(self, count: int = 1):
+        """Count a message (or the given number of messages) that failed validation."""
+        stripe = self._stripe()
+        with stripe.lock:
+            stripe.rejected += count
+            stripe.last_message = time.time()
+
+    def record_latency(self, seconds: float):
+        """Add the run time of a callback to the histogram."""
+        bucket = bisect_left(self._buckets, seconds)
+        stripe = self._stripe()
+        with stripe.lock:
+            stripe.histogram[bucket] += 1
+            stripe.latency_count += 1
+            stripe.latency_sum += seconds
+
+    def snapshot(self) -> dict[str, Any]:
+        """The current values of all counters, summed over all threads.
+
+        Returns:
+            A dict with the keys "accepted", "rejected", "last_message" (unix timestamp or None) and "latency".
+            "latency" contains the bucket upper bounds ("buckets"), the number of callbacks per bucket ("counts",
+            with one additional overflow bucket), and the "count" and "sum" of all recorded latencies.
+        """
+        accepted = 0
+        rejected = 0
+        latency_count = 0
+        latency_sum = 0.0
+        histogram = [0] * (len(self._buckets) + 1)
+        last_message = None
+
+        for stripe in list(self._stripes.values()):
+            accepted += stripe.accepted
+            rejected += stripe.rejected
+            latency_count += stripe.latency_count
+            latency_sum += stripe.latency_sum
+            for i, count in enumerate(stripe.histogram):
+                histogram[i] += count
+            if stripe.last_message is not None and (
+                last_message is None or stripe.last_message > last_message
+            ):
+                last_message = stripe.last_message
+
+        return {
+            "accepted": accepted,
+            "rejected": rejected,
+            "last_message": last_message,
+            "latency": {
+                "buckets": list(self._buckets),
+                "counts": histogram,
+                "count": latency_count,
+                "sum": latency_sum,
+            },
+        }
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.path})"
+
+
+class OSCMetrics:
+    """Collection of the metrics of all instrumented nodes.
+
+    Pass an instance to map_node() (or map_address_space()) to record metrics for the mapped nodes, and to
+    OSCQueryService to serve them via the METRICS query.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = default_latency_buckets):
+        """
+        Args:
+            buckets: Upper bounds (in seconds) of the latency histogram buckets, in ascending order
+        """
+        if list(buckets) != sorted(buckets):
+            raise ValueError("Latency buckets must be in ascending order")
+        self._buckets = tuple(buckets)
+        self._nodes: dict[str, OSCNodeMetrics] = {}
+        self._lock = threading.Lock()
+
+    def for_node(self, path: str) -> OSCNodeMetrics:
+        """The metrics of the node with the given address. Created if they don't exist yet."""
+        metrics = self._nodes.get(path)
+        if metrics is None:
+            with self._lock:
+                metrics = self._nodes.get(path)
+                if metrics is None:
+                    metrics = OSCNodeMetrics(path, self._buckets)
+                    self._nodes[path] = metrics
+        return metrics
+
+    def snapshot(self, prefix: str = "/") -> dict[str, dict[str, Any]]:
+        """Snapshots of the metrics of all nodes at or below the given address, by address.
+        See OSCNodeMetrics.snapshot() for the contents."""
+        container_prefix = prefix.rstrip("/") + "/"
+        return {
+            path: metrics.snapshot()
+            for path, metrics in list(self._nodes.items())
+            if path == prefix or path.startswith(container_prefix)
+        }
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({len(self._nodes)} nodes)"
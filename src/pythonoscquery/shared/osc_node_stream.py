@@ -0,0 +1,324 @@
+import codecs
+import enum
+import json
+from contextlib import nullcontext
+from enum import Enum
+from functools import partial
+from json.decoder import scanstring
+from typing import Any
+
+from .osc_path_node import OSCPathNode, paused_gc
+
+
+class _Mode(Enum):
+    BUILD = enum.auto()
+    """The node is created"""
+    DESCEND = enum.auto()
+    """The node is an ancestor of the filtered node: only its CONTENTS are decoded"""
+    SKIP = enum.auto()
+    """The node and its CONTENTS are only read over"""
+
+
+class _State(Enum):
+    FIRST_KEY = enum.auto()
+    KEY = enum.auto()
+    COLON = enum.auto()
+    VALUE = enum.auto()
+    COMMA = enum.auto()
+
+
+class _Frame:
+    """A JSON object that is being decoded: a node, or the CONTENTS of a node."""
+
+    __slots__ = ("attributes", "children", "is_node", "key", "mode", "path", "state")
+
+    def __init__(self, is_node: bool, path: str, mode: _Mode):
+        self.is_node = is_node
+        self.path = path
+        self.mode = mode
+        self.attributes: dict[str, Any] | None = (
+            {} if is_node and mode is _Mode.BUILD else None
+        )
+        self.children: list[OSCPathNode] | None = None
+        self.state = _State.FIRST_KEY
+        self.key: str | None = None
+
+
+_WHITESPACE = " \t\n\r"
+# The character that a string, array or object value must end with
+_CLOSING = {'"': '"', "[": "]", "{": "}"}
+
+
+class OSCNodeStreamDecoder:
+    """Incremental decoder for the JSON data of a node query, e.g. to decode a response while it is received.
+
+    Nodes are created as soon as their JSON object is complete, so the JSON data of the whole tree is never held in
+    memory. With a path filter, only the node with this address and its child nodes are created, and decoding stops as
+    soon as that node is complete.
+
+        decoder = OSCNodeStreamDecoder("/", path_filter="/avatar/parameters")
+        for chunk in chunks:
+            decoder.feed(chunk)
+            if decoder.done:
+                break
+        node = decoder.close()
+    """
+
+    def __init__(
+        self, address: str = "/", path_filter: str | None = None, trusted: bool = False
+    ):
+        """
+        Args:
+            address: Address of the queried node, i.e. of the top-level JSON object
+            path_filter: Address of the node to decode. Nodes that are neither this node nor one of its child nodes
+                are skipped
+            trusted: Create the nodes like OSCPathNode.from_json(json_data, trusted=True)
+        """
+        self.address = address
+        self.path_filter = path_filter
+        self._trusted = trusted
+        if trusted:
+            self._build = partial(OSCPathNode._from_trusted_json, {})
+        else:
+            self._build = OSCPathNode._from_json_attributes
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json_decoder = json.JSONDecoder()
+        self._buffer = ""
+        # Length of the incomplete value at the start of the buffer that has already been scanned
+        self._scanned = 0
+        self._frames: list[_Frame] = []
+        self._node: OSCPathNode | None = None
+        self._done = False
+
+    @property
+    def done(self) -> bool:
+        """Whether the node has been decoded (or the top-level JSON object is complete without a matching node)."""
+        return self._done
+
+    @property
+    def node(self) -> OSCPathNode | None:
+        """The decoded node: the queried node, or the node matching the path filter. None until done."""
+        return self._node
+
+    def feed(self, data: bytes | str) -> list[OSCPathNode]:
+        """Decode the next part of the JSON data.
+
+        Args:
+            data: The next chunk of the JSON data. Ignored when done
+        Returns:
+            The nodes that were completed by this chunk, child nodes before their parents
+        Raises:
+            ValueError if the JSON data is not a node
+        """
+        if self._done:
+            return []
+        if isinstance(data, bytes):
+            data = self._text_decoder.decode(data)
+        self._buffer += data
+        completed = []
+        with self._gc_paused():
+            self._decode(completed, final=False)
+        return completed
+
+    def close(self) -> OSCPathNode | None:
+        """Decode the rest of the JSON data.
+
+        Returns:
+            The decoded node, or None if no node matched the path filter
+        Raises:
+            ValueError if the JSON data is incomplete or not a node
+        """
+        if not self._done:
+            self._buffer += self._text_decoder.decode(b"", final=True)
+            with self._gc_paused():
+                self._decode([], final=True)
+        if not self._done:
+            raise ValueError("Incomplete or invalid OSCQuery JSON data")
+        return self._node
+
+    def _gc_paused(self):
+        return paused_gc() if self._trusted else nullcontext()
+
+    def _mode(self, path: str, parent_mode: _Mode | None) -> _Mode:
+        if parent_mode is _Mode.SKIP or parent_mode is _Mode.BUILD:
+            return parent_mode
+        if self.path_filter is None or path == self.path_filter:
+            return _Mode.BUILD
+        if self.path_filter.startswith(path.rstrip("/") + "/"):
+            return _Mode.DESCEND
+        return _Mode.SKIP
+
+    def _decode(self, completed: list[OSCPathNode], final: bool):
+        buffer = self._buffer
+        length = len(buffer)
+        frames = self._frames
+        pos = 0
+
+        while not self._done:
+            while pos < length and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos >= length:
+                break
+            char = buffer[pos]
+
+            if not frames:
+                if char != "{":
+                    raise ValueError(f"Expected a JSON object at {pos}, got {char!r}")
+                pos = self._decode_node(buffer, pos, self.address, None, completed)
+                continue
+
+            frame = frames[-1]
+            state = frame.state
+            if state is _State.FIRST_KEY or state is _State.KEY:
+                if char == "}" and state is _State.FIRST_KEY:
+                    pos += 1
+                    self._close(frame, completed)
+                    continue
+                if char != '"':
+                    raise ValueError(f"Expected a key at {pos}, got {char!r}")
+                try:
+                    frame.key, pos = scanstring(buffer, pos + 1)
+                except json.JSONDecodeError:
+                    # Incomplete key, wait for more data
+                    break
+                frame.state = _State.COLON
+            elif state is _State.COLON:
+                if char != ":":
+                    raise ValueError(f"Expected ':' at {pos}, got {char!r}")
+                pos += 1
+                frame.state = _State.VALUE
+            elif state is _State.VALUE:
+                if not frame.is_node or frame.key == "CONTENTS":
+                    if char != "{":
+                        raise ValueError(
+                            f"Expected a JSON object at {pos}, got {char!r}"
+                        )
+                    frame.state = _State.COMMA
+                    if frame.is_node:
+                        if frame.mode is _Mode.BUILD:
+                            frame.children = []
+                        frames.append(_Frame(False, frame.path, frame.mode))
+                        pos += 1
+                    else:
+                        path = f"{frame.path.rstrip('/')}/{frame.key}"
+                        pos = self._decode_node(
+                            buffer, pos, path, frame.mode, completed
+                        )
+                    continue
+
+                closing = _CLOSING.get(char)
+                if (
+                    self._scanned
+                    and closing is not None
+                    and not final
+                    and buffer.find(closing, pos + self._scanned) < 0
+                ):
+                    # The value cannot be complete before its closing character arrives
+                    break
+                try:
+                    value, end = self._json_decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if final:
+                        raise ValueError(f"Invalid JSON value at {pos}") from None
+                    self._scanned = length - pos
+                    break
+                self._scanned = 0
+                if end == length and not final:
+                    # A number might continue in the next chunk
+                    break
+                if frame.attributes is not None:
+                    frame.attributes[frame.key] = value
+                pos = end
+                frame.state = _State.COMMA
+            else:
+                if char == ",":
+                    frame.state = _State.KEY
+                elif char == "}":
+                    self._close(frame, completed)
+                else:
+                    raise ValueError(f"Expected ',' or '}}' at {pos}, got {char!r}")
+                pos += 1
+
+        # Only the unconsumed rest of the data is kept
+        self._buffer = buffer[pos:]
+
+    def _decode_node(
+        self,
+        buffer: str,
+        pos: int,
+        path: str,
+        parent_mode: _Mode | None,
+        completed: list[OSCPathNode],
+    ) -> int:
+        """Decode the JSON object of the node with the given address, which starts at pos.
+
+        If the object is already complete in the buffer, it is decoded at once with the json module. Otherwise, it is
+        decoded incrementally. Returns the position after the object, or after its opening brace.
+        """
+        mode = self._mode(path, parent_mode)
+        try:
+            json_data, end = self._json_decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            self._frames.append(_Frame(True, path, mode))
+            return pos + 1
+
+        if mode is _Mode.DESCEND:
+            json_data = _find_json(json_data, path, self.path_filter)
+            path = self.path_filter
+            mode = _Mode.SKIP if json_data is None else _Mode.BUILD
+
+        if mode is _Mode.BUILD:
+            node = OSCPathNode._build_tree(json_data, self._build, self._trusted)
+            completed.extend(_post_order(node))
+            self._complete(node, path)
+        elif not self._frames:
+            # The whole JSON object has been decoded, without a node matching the filter
+            self._done = True
+        return end
+
+    def _close(self, frame: _Frame, completed: list[OSCPathNode]):
+        self._frames.pop()
+        if not frame.is_node:
+            return
+
+        if frame.mode is _Mode.BUILD:
+            node = self._build(frame.attributes)
+            if frame.children is not None:
+                node._attach_contents(frame.children, self._trusted)
+            completed.append(node)
+            self._complete(node, frame.path)
+        elif not self._frames:
+            # The whole JSON object has been decoded, without a node matching the filter
+            self._done = True
+
+    def _complete(self, node: OSCPathNode, path: str):
+        """Link a completed node to its parent, or finish decoding if it is the decoded node."""
+        frames = self._frames
+        if frames and frames[-2].children is not None:
+            frames[-2].children.append(node)
+        if path == self.path_filter or not frames:
+            self._node = node
+            self._done = True
+
+
+def _find_json(
+    json_data: dict[str, Any], path: str, address: str
+) -> dict[str, Any] | None:
+    """The JSON data of the node with the given address, in the JSON data of the node with the given path."""
+    for segment in address[len(path.rstrip("/")) + 1 :].split("/"):
+        json_data = (json_data.get("CONTENTS") or {}).get(segment)
+        if json_data is None:
+            return None
+    return json_data
+
+
+def _post_order(node: OSCPathNode) -> list[OSCPathNode]:
+    """The node and all of its child nodes, child nodes before their parents."""
+    ordered = []
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        ordered.append(current)
+        stack.extend(current.contents or ())
+    ordered.reverse()
+    return ordered
@@ -1,23 +1,52 @@
+import base64
 import builtins
+import gc
+import hashlib
+import itertools
 import json
 import logging
-from collections.abc import Iterable
+import math
+from collections.abc import Callable, Iterable, Sequence
+from contextlib import contextmanager
+from functools import partial
 from json import JSONEncoder
 from typing import Any, TypeVar, Union
 
+from . import osc_spec
 from .osc_access import OSCAccess
-from .osc_spec import disallowed_path_chars, is_valid_path
+from .osc_range import OSCClipMode, OSCRange
+from .osc_spec import blob_types, disallowed_path_chars, is_valid_path
 from .oscquery_spec import OSCQueryAttribute
 
 logger = logging.getLogger(__name__)
 
 
+class _DepthLimitedNode:
+    """A node to encode, with the number of levels of its subtree that are still encoded."""
+
+    __slots__ = ("depth", "node")
+
+    def __init__(self, node: "OSCPathNode", depth: int):
+        self.node = node
+        self.depth = depth
+
+
 class OSCNodeEncoder(JSONEncoder):
-    def __init__(self, attribute_filter: OSCQueryAttribute | None = None, **kwargs):
-        super(OSCNodeEncoder, self).__init__()
+    def __init__(
+        self,
+        attribute_filter: OSCQueryAttribute | None = None,
+        max_depth: int | None = None,
+        **kwargs,
+    ):
+        super(OSCNodeEncoder, self).__init__(**kwargs)
         self.attribute_filter = attribute_filter
+        self.max_depth = max_depth
 
     def default(self, o):
+        depth = self.max_depth
+        if isinstance(o, _DepthLimitedNode):
+            o, depth = o.node, o.depth
+
         if isinstance(o, OSCPathNode):
             obj_dict = {}
             o: OSCPathNode
@@ -30,7 +59,7 @@ class OSCNodeEncoder(JSONEncoder):
 
                 match k:
                     case OSCQueryAttribute.CONTENTS:
-                        if len(v) < 1:
+                        if len(v) < 1 or depth == 0:
                             continue
                         obj_dict["CONTENTS"] = {}
                         sub_node: OSCPathNode
@@ -39,9 +68,25 @@ class OSCNodeEncoder(JSONEncoder):
                                 sub_node.attributes[OSCQueryAttribute.FULL_PATH].split(
                                     "/"
                                 )[-1]
-                            ] = sub_node
+                            ] = (
+                                sub_node
+                                if depth is None
+                                else _DepthLimitedNode(sub_node, depth - 1)
+                            )
                     case OSCQueryAttribute.TYPE:
                         obj_dict["TYPE"] = python_type_list_to_osc_type(v)
+                    case OSCQueryAttribute.RANGE:
+                        obj_dict["RANGE"] = [
+                            r.to_json() if r is not None else None for r in v
+                        ]
+                    case OSCQueryAttribute.CLIPMODE:
+                        obj_dict["CLIPMODE"] = [c.value for c in v]
+                    case OSCQueryAttribute.VALUE:
+                        # Read through the property, the values might live in an OSCValueStore
+                        if o._has_blobs:
+                            obj_dict["VALUE"] = [_to_json_value(v) for v in o.value]
+                        else:
+                            obj_dict["VALUE"] = o.value
                     case _:
                         obj_dict[k.name.upper()] = v
 
@@ -50,22 +95,71 @@ class OSCNodeEncoder(JSONEncoder):
         return json.JSONEncoder.default(self, o)  # pragma: no cover
 
 
-T = TypeVar("T", bound=int | float | bool | str)
+T = TypeVar("T", bound=int | float | bool | str | bytes | memoryview | list)
 
 
 class OSCPathNode:
     """A node in the OSC address space tree."""
 
     @classmethod
-    def from_json(cls, json_data: dict[str, Any]) -> "OSCPathNode":
-        """Factory method to create an instance of OSCPathNode from JSON data."""
-        contents = None
-        if "CONTENTS" in json_data:
-            sub_nodes = []
-            for subNode in json_data["CONTENTS"]:
-                sub_nodes.append(OSCPathNode.from_json(json_data["CONTENTS"][subNode]))
-            contents = sub_nodes
+    def from_json(
+        cls, json_data: dict[str, Any], trusted: bool = False
+    ) -> "OSCPathNode":
+        """Factory method to create an instance of OSCPathNode from JSON data.
+
+        The tree of child nodes (CONTENTS) is built iteratively, so deep trees don't hit the recursion limit. RANGEs
+        that can't be enforced for the type of their value (e.g. a minimum for a string, or an int range without any
+        integer) are dropped with a warning, in both modes.
+
+        Args:
+            json_data: The JSON data of the node
+            trusted: Skip the validation of paths and of the consistency of the attributes, for JSON data that is known
+                to be valid (e.g. served by python-oscquery). The nodes are then built without running the constructor,
+                nodes with the same types share their compiled validators, and the cyclic garbage collector is paused
+                while the tree is built.
+        Raises:
+            TypeError or ValueError if the JSON data is invalid. If trusted, only the values are checked against TYPE.
+        """
+        if not trusted:
+            return cls._build_tree(json_data, cls._from_json_attributes, False)
+
+        with paused_gc():
+            return cls._build_tree(json_data, partial(cls._from_trusted_json, {}), True)
+
+    @classmethod
+    def _build_tree(
+        cls,
+        json_data: dict[str, Any],
+        build: Callable[[dict[str, Any]], "OSCPathNode"],
+        trusted: bool,
+    ) -> "OSCPathNode":
+        """Build the node and its child nodes, breadth first per container, without recursion."""
+        root = build(json_data)
+        stack = [(json_data, root)]
+        while stack:
+            data, node = stack.pop()
+            if "CONTENTS" not in data:
+                continue
+            sub_nodes = data["CONTENTS"]
+            contents = [build(sub_data) for sub_data in sub_nodes.values()]
+            node._attach_contents(contents, trusted)
+            stack.extend(zip(sub_nodes.values(), contents))
+
+        return root
+
+    def _attach_contents(self, contents: list["OSCPathNode"], trusted: bool):
+        """Set the child nodes of a node created from JSON data."""
+        if contents and self._attributes[OSCQueryAttribute.VALUE] and not trusted:
+            raise ValueError(
+                "A node can either have child nodes (for OSC containers) or values (for OSC methods), but not both."
+            )
+        for child in contents:
+            child._parent = self
+        self._attributes[OSCQueryAttribute.CONTENTS] = contents
 
+    @classmethod
+    def _from_json_attributes(cls, json_data: dict[str, Any]) -> "OSCPathNode":
+        """Create a node from JSON data, without its child nodes."""
         # This *should* be required but some implementations don't have it...
         full_path = None
         if "FULL_PATH" in json_data:
@@ -81,21 +175,101 @@ class OSCPathNode:
 
         value = None
         if "VALUE" in json_data:
-            value = []
             if not isinstance(json_data["VALUE"], list):
                 raise TypeError("OSCQuery JSON Value is not List / Array? Out-of-spec?")
 
-            for v in json_data["VALUE"]:
-                value.append(v)
+            value = list(json_data["VALUE"])
+
+            if "TYPE" in json_data:
+                value = _values_from_json(value, json_data["TYPE"])
+
+        value_range, clipmode = _range_and_clipmode_from_json(json_data, value)
 
         return cls(
             full_path=full_path,
             access=access,
             description=description,
             value=value,
-            contents=contents,
+            value_range=value_range,
+            clipmode=clipmode,
         )
 
+    @classmethod
+    def _from_trusted_json(
+        cls,
+        compiled_validators: dict[tuple, tuple[Callable, Callable, bool]],
+        json_data: dict[str, Any],
+    ) -> "OSCPathNode":
+        """Create a node from trusted JSON data, without its child nodes. Sets the same fields as the constructor."""
+        value = json_data.get("VALUE")
+        types = None
+        has_arrays = False
+        if value:
+            value = list(value)
+            osc_type = json_data.get("TYPE")
+            if osc_type is not None and (
+                not isinstance(osc_type, str)
+                or not _converted_type_tags.isdisjoint(osc_type)
+            ):
+                value = _values_from_json(value, osc_type)
+            # JSON values (after conversion) are never bytearray or memoryview, only arrays need python_type_of_value()
+            types = list(map(type, value))
+            if list in types:
+                has_arrays = True
+                types = [python_type_of_value(v) for v in value]
+        else:
+            value = None
+
+        value_range = clipmode = None
+        if "RANGE" in json_data or "CLIPMODE" in json_data:
+            value_range, clipmode = _range_and_clipmode_from_json(json_data, value)
+
+        access = json_data.get("ACCESS")
+        if access is not None:
+            access = _access_by_value[access]
+
+        attributes = {
+            OSCQueryAttribute.FULL_PATH: json_data.get("FULL_PATH"),
+            OSCQueryAttribute.CONTENTS: None,
+            OSCQueryAttribute.VALUE: value,
+            OSCQueryAttribute.TYPE: types,
+            OSCQueryAttribute.ACCESS: access,
+            OSCQueryAttribute.DESCRIPTION: json_data.get("DESCRIPTION"),
+        }
+        if value_range is not None:
+            attributes[OSCQueryAttribute.RANGE] = _per_value(
+                value_range, value, "value_range"
+            )
+        if clipmode is not None:
+            attributes[OSCQueryAttribute.CLIPMODE] = _per_value(
+                clipmode, value, "clipmode"
+            )
+
+        # Validators only depend on the types (and ranges), so nodes with the same plain types share them
+        key = None
+        if value_range is None and clipmode is None and not has_arrays:
+            key = tuple(types) if types else ()
+        compiled = compiled_validators.get(key) if key is not None else None
+        if compiled is None:
+            validator = compile_validator(
+                types,
+                attributes.get(OSCQueryAttribute.RANGE),
+                attributes.get(OSCQueryAttribute.CLIPMODE),
+            )
+            compiled = (
+                validator,
+                compile_batch_validator(
+                    types, validator, attributes.get(OSCQueryAttribute.RANGE)
+                ),
+                bytes in _flatten_types(types or []),
+            )
+            if key is not None:
+                compiled_validators[key] = compiled
+
+        node = cls.__new__(cls)
+        node._init_state(attributes, *compiled)
+        return node
+
     def __init__(
         self,
         full_path: str,
@@ -103,16 +277,24 @@ class OSCPathNode:
         value: Union[T, list[T]] = None,
         description: str = None,
         contents: list["OSCPathNode"] = None,
+        value_range: OSCRange | list[OSCRange | None] | None = None,
+        clipmode: OSCClipMode | list[OSCClipMode] | None = None,
     ):
         """
         Args:
             full_path: The OSC address path, e.g. "/test/foo/bar"
             access: The access mode of the node
             value: A list of initial values for the node. The argument types are derived from those values
-                If the actual value does not matter, a placeholder with the correct type can be used instead
+                If the actual value does not matter, a placeholder with the correct type can be used instead.
+                Besides bool, int, float and str, values can be blobs (bytes), OSCInt64, OSCDouble and arrays
+                (a list of values inside the list of values)
             description: A textual description of the node's purpose
             contents: The child nodes of this node. Don't use this directly, but  add new node via the AddressSpace.
                 This parameter exists for instantiation via json data.
+            value_range: The RANGE of the values. Either one OSCRange per value (None for values without range), or a
+                single OSCRange that applies to all values. Values outside the range are rejected by validate_values()
+            clipmode: The CLIPMODE of the values, one per value or a single one for all values. Decides whether
+                values outside the range are clipped instead of rejected
         """
         if not is_valid_path(full_path):
             raise ValueError(
@@ -128,14 +310,14 @@ class OSCPathNode:
                 "A node can either have child nodes (for OSC containers) or values (for OSC methods), but not both."
             )
 
-        self._attributes: dict[OSCQueryAttribute, Any] = {}
+        attributes: dict[OSCQueryAttribute, Any] = {}
 
-        self._attributes[OSCQueryAttribute.FULL_PATH] = full_path
+        attributes[OSCQueryAttribute.FULL_PATH] = full_path
 
-        self._attributes[OSCQueryAttribute.CONTENTS]: list["OSCPathNode"] = contents
+        attributes[OSCQueryAttribute.CONTENTS] = contents
 
         # Ensure that value is an iterable
-        if not isinstance(value, Iterable) or isinstance(value, str):
+        if not isinstance(value, Iterable) or isinstance(value, (str, *blob_types)):
             value = [value] if value is not None else []
 
         if not value and access is not OSCAccess.NO_VALUE:
@@ -148,18 +330,67 @@ class OSCPathNode:
                 f"Value(s) given, access must not be {OSCAccess.NO_VALUE.name} for method nodes."
             )
 
-        self._attributes[OSCQueryAttribute.VALUE] = value if value else None
+        attributes[OSCQueryAttribute.VALUE] = value if value else None
 
         types = []
         if value:
-            for v in self._attributes[OSCQueryAttribute.VALUE]:
-                types.append(type(v))
+            for v in attributes[OSCQueryAttribute.VALUE]:
+                types.append(python_type_of_value(v))
 
-        self._attributes[OSCQueryAttribute.TYPE] = types if value else None
+        attributes[OSCQueryAttribute.TYPE] = types if value else None
+
+        attributes[OSCQueryAttribute.ACCESS] = access
+
+        attributes[OSCQueryAttribute.DESCRIPTION] = description
+
+        # The optional RANGE and CLIPMODE attributes are only present when configured
+        if value_range is not None:
+            attributes[OSCQueryAttribute.RANGE] = _per_value(
+                value_range, value, "value_range"
+            )
+            _check_value_ranges(types, attributes[OSCQueryAttribute.RANGE])
+        if clipmode is not None:
+            attributes[OSCQueryAttribute.CLIPMODE] = _per_value(
+                clipmode, value, "clipmode"
+            )
+
+        validator = compile_validator(
+            attributes[OSCQueryAttribute.TYPE],
+            attributes.get(OSCQueryAttribute.RANGE),
+            attributes.get(OSCQueryAttribute.CLIPMODE),
+        )
+        batch_validator = compile_batch_validator(
+            attributes[OSCQueryAttribute.TYPE],
+            validator,
+            attributes.get(OSCQueryAttribute.RANGE),
+        )
+        self._init_state(
+            attributes, validator, batch_validator, bytes in _flatten_types(types)
+        )
+
+    def _init_state(
+        self,
+        attributes: dict[OSCQueryAttribute, Any],
+        validator: Callable[[Sequence], Sequence],
+        batch_validator: Callable[[Sequence[Sequence]], list[Sequence | None]],
+        has_blobs: bool,
+    ):
+        """Set the instance fields of a new node. Both the constructor and _from_trusted_json() end up here."""
+        self._attributes = attributes
+        self._parent: OSCPathNode | None = None
+        for child in attributes[OSCQueryAttribute.CONTENTS] or ():
+            child._parent = self
 
-        self._attributes[OSCQueryAttribute.ACCESS] = access
+        self._validator = validator
+        self._batch_validator = batch_validator
+        self._has_blobs = has_blobs
 
-        self._attributes[OSCQueryAttribute.DESCRIPTION] = description
+        self._value_store = None
+        self._value_slot: slice | None = None
+        self._version_counter = itertools.count(1)
+        self._version = 0
+        # (digest, attributes digest), computed on demand, see digest
+        self._digests: tuple[str, str] | None = None
 
     @property
     def attributes(self) -> dict[OSCQueryAttribute, Any]:
@@ -183,12 +414,27 @@ class OSCPathNode:
 
     @property
     def value(self) -> Any:
+        if self._value_store is not None:
+            return self._value_store.get_values(self._value_slot)
         return self._attributes[OSCQueryAttribute.VALUE]
 
+    @property
+    def version(self) -> int:
+        """Incremented whenever the value of the node is changed via set_value()."""
+        return self._version
+
     @property
     def type(self) -> Any:
         return self._attributes[OSCQueryAttribute.TYPE]
 
+    @property
+    def value_range(self) -> list[OSCRange | None] | None:
+        return self._attributes.get(OSCQueryAttribute.RANGE)
+
+    @property
+    def clipmode(self) -> list[OSCClipMode] | None:
+        return self._attributes.get(OSCQueryAttribute.CLIPMODE)
+
     @property
     def is_container(self) -> bool:
         """Returns True if this node is an OSC container, False otherwise.
@@ -210,6 +456,131 @@ class OSCPathNode:
         if self.contents is None:
             self._attributes[OSCQueryAttribute.CONTENTS] = []
         self.contents.append(child)
+        child._parent = self
+        self._invalidate_digests()
+
+    def set_value(self, values: Sequence[T], validate: bool = True):
+        """Replace the value of this node, e.g. with the values of a received message.
+
+        The list of values is replaced as a whole, so concurrent readers (like the OSCQuery server) see either the old
+        or the new values, without any locking. Blobs are copied, since the received data might be reused.
+
+        Args:
+            values: The new values, one per type of the node
+            validate: Whether to validate (and sanitize) the values first, see validate_values()
+        Raises:
+            TypeError, ValueError if the values are validated and invalid
+        """
+        if validate:
+            values = self.validate_values(values)
+
+        if self._value_store is not None:
+            self._value_store.set_values(self._value_slot, values)
+        else:
+            if self._has_blobs:
+                values = [_stored_value(v) for v in values]
+            self._attributes[OSCQueryAttribute.VALUE] = list(values)
+
+        self._version = next(self._version_counter)
+        self._invalidate_digests()
+
+    @property
+    def parent(self) -> "OSCPathNode | None":
+        """The node this node is a child node of, None for root nodes."""
+        return self._parent
+
+    @property
+    def digest(self) -> str:
+        """Hex digest of the attributes of this node and the digests of its child nodes (a Merkle tree hash).
+
+        Two nodes have the same digest exactly if their subtrees have the same attributes and values, so comparing
+        digests tells whether (and where) two big trees differ without comparing them node by node. The digests are
+        computed on first access and kept until the node or one of its descendants changes: set_value(),
+        OSCValueStore.set_values() and adding or removing child nodes via OSCAddressSpace discard the digests of the
+        node and its ancestors. Other changes, like values that are changed in place (node.value[0] = ...) or written
+        via OSCValueStore.array, are not tracked: call invalidate_digests() with the changed nodes after them.
+        """
+        digests = self._digests
+        if digests is None:
+            digests = self._compute_digests()
+        return digests[0]
+
+    @property
+    def attributes_digest(self) -> str:
+        """Hex digest of the attributes of this node alone, without its child nodes. See digest."""
+        digests = self._digests
+        if digests is None:
+            digests = self._compute_digests()
+        return digests[1]
+
+    def _compute_digests(self) -> tuple[str, str]:
+        """Compute the digests of this node and of all descendants without digests, child nodes first."""
+        epoch = next(_digest_epochs)
+        computed: dict[int, tuple[OSCPathNode, tuple[str, str]]] = {}
+        # Frames of [node, (child node, digests or None if still to be computed) of each child node]
+        stack: list[list] = [[self, None]]
+        while stack:
+            frame = stack[-1]
+            node, children = frame
+            if children is None:
+                children = frame[1] = []
+                # The raw CONTENTS, lazy nodes are not fetched
+                for child in node._attributes[OSCQueryAttribute.CONTENTS] or ():
+                    child_digests = child._digests
+                    children.append((child, child_digests))
+                    if child_digests is None:
+                        stack.append([child, None])
+                continue
+
+            stack.pop()
+            child_digests = [
+                (child.full_path.rsplit("/", 1)[-1], digests or computed[id(child)][1])
+                for child, digests in children
+            ]
+            computed[id(node)] = (node, node._hash(child_digests))
+
+        digests = computed[id(self)][1]
+        for node, node_digests in computed.values():
+            node._digests = node_digests
+            if node._value_store is not None:
+                node._value_store._digests_cached = True
+        # Something changed while computing: the computed digests might already be outdated, so they are not kept
+        if next(_digest_epochs) != epoch + 1:
+            for node, _ in computed.values():
+                node._digests = None
+        return digests
+
+    def _invalidate_digests(self):
+        """Discard the digests of this node and of its ancestors, after the node changed."""
+        next(_digest_epochs)
+        node = self
+        while node is not None:
+            node._digests = None
+            node = node._parent
+
+    def _hash(
+        self, child_digests: list[tuple[str, tuple[str, str]]]
+    ) -> tuple[str, str]:
+        """The digests of this node, from the (name, digests) of its child nodes."""
+        attributes_json = json.dumps(
+            self, cls=OSCNodeEncoder, max_depth=0, sort_keys=True
+        )
+        attributes_digest = hashlib.blake2b(
+            attributes_json.encode(), digest_size=16
+        ).digest()
+        subtree = hashlib.blake2b(attributes_digest, digest_size=16)
+        # CONTENTS are unordered, so the order of the child nodes doesn't matter
+        for name, (digest, _) in sorted(child_digests):
+            subtree.update(name.encode())
+            subtree.update(b"\0")
+            subtree.update(bytes.fromhex(digest))
+        return subtree.hexdigest(), attributes_digest.hex()
+
+    def _bind_value_store(self, store, slot: slice):
+        """Let the values of this node be read from an OSCValueStore.
+        *This should not be called directly, but implicitly from OSCValueStore.add_node()*"""
+        self._value_store = store
+        self._value_slot = slot
 
     def find_subnode(self, full_path: str) -> "OSCPathNode | None":
         """Recursively find a node with the given full path.
@@ -231,63 +602,61 @@ class OSCPathNode:
 
         return None
 
-    def to_json(self, attribute: OSCQueryAttribute | None = None) -> str:
+    def to_json(
+        self, attribute: OSCQueryAttribute | None = None, depth: int | None = None
+    ) -> str:
         """Convert the attributes of this node to json.
 
         Args:
             attribute: OSC query attribute, e.g. "OSCQueryAttribute.VALUE". If given, only this attribute will be rendered.
+            depth: If given, only this many levels of child nodes are rendered. With 0, the CONTENTS are omitted.
         Returns:
             The json string
         """
-        return json.dumps(self, cls=OSCNodeEncoder, attribute_filter=attribute)
+        return json.dumps(
+            self, cls=OSCNodeEncoder, attribute_filter=attribute, max_depth=depth
+        )
 
-    def validate_values(self, values: list[T]) -> list[T]:
+    def validate_values(self, values: Sequence[T]) -> Sequence[T]:
         """Validate the given value types against the specified types of this node.
 
         Sanitizes some values:
 
         - If the client sent 0 or 1 as a substitute for a boolean value, the value will be converted to its boolean
         equivalent.
+        - Blobs are converted to a `memoryview` of the received data, so they are passed on without being copied.
+        - Values outside the RANGE of the node are clipped to the range, if the CLIPMODE of the value allows it.
 
         Args:
-            values: List of values to validate. Must be in the same order as configured for this node.
+            values: Values to validate. Must be in the same order as configured for this node.
         Returns:
-             Sanitized values
+             Sanitized values. This is the given sequence itself, unless a value had to be converted
         Raises:
             TypeError if any of the values are invalid, of if the number of values does
             not match the number of types of this node.
+            ValueError if a value is outside the RANGE of the node (and can't be clipped).
         """
-        if not self.type and values:
-            raise TypeError(f"Expected no value(s), got {len(values)}")
+        return self._validator(values)
 
-        if not self.type:
-            return values
-
-        if len(values) != len(self.type):
-            raise TypeError(f"Expected {len(self.type)} value(s), got {len(values)}")
+    def validate_batch(
+        self, values_list: Sequence[Sequence[T]]
+    ) -> list[Sequence[T] | None]:
+        """Validate the values of several messages at once, e.g. of all messages for this node in an OSC bundle.
 
-        for i, expected_type in enumerate(self.type):
-            received_type = type(values[i])
-            if received_type is not expected_type:
-                if (
-                    expected_type is builtins.bool
-                    and received_type is builtins.int
-                    and values[i] in (0, 1)
-                ):
-                    # Some clients might send int 0 or 1 as substitute for bool
-                    values[i] = bool(values[i])
-                    continue
+        If all messages have exactly the types of this node, the whole batch is checked in one pass.
 
-                raise TypeError(
-                    f"Expected {expected_type} for value {i}, got {type(values[i])}"
-                )
-        return values
+        Args:
+            values_list: The values of each message
+        Returns:
+            For each message, the sanitized values (see validate_values()) or None if the values are invalid
+        """
+        return self._batch_validator(values_list)
 
     def are_values_valid(self, values: list[T]) -> bool:
         """Convenience method for validate_values()."""
         try:
             self.validate_values(values)
-        except TypeError:
+        except (TypeError, ValueError):
             return False
         return True
 
@@ -306,21 +675,522 @@ class OSCPathNode:
         return self.full_path == other.full_path
 
 
-def python_type_list_to_osc_type(types_: list[type]) -> str:
+def python_type_of_value(value: Any) -> type | list:
+    """The type of a node value, as used in the TYPE attribute. Blobs are always `bytes`, arrays are lists of the
+    types of their values."""
+    if isinstance(value, list):
+        return [python_type_of_value(v) for v in value]
+    if isinstance(value, blob_types):
+        return bytes
+    return type(value)
+
+
+def python_type_list_to_osc_type(types_: list[type | list]) -> str:
     output = []
     for type_ in types_:
         match type_:
             case builtins.bool:
                 output.append("T")
+            case osc_spec.OSCInt64:
+                output.append("h")
             case builtins.int:
                 output.append("i")
+            case osc_spec.OSCDouble:
+                output.append("d")
             case builtins.float:
                 output.append("f")
             case builtins.str:
                 output.append("s")
+            case builtins.bytes:
+                output.append("b")
+            case list():
+                output.append(f"[{python_type_list_to_osc_type(type_)}]")
             case _:  # pragma: no cover
                 raise Exception(
                     f"Cannot convert {type_} to OSC type!"
                 )  # pragma: no cover
 
     return "".join(output)
+
+
+def osc_type_to_python_type_list(osc_type: str) -> list[type | list | None]:
+    """Parse an OSC type tag string, e.g. "if[ff]". Types that can't be represented as python types are None.
+
+    Raises:
+        ValueError if the brackets of arrays don't match
+    """
+    stack: list[list] = [[]]
+    for char in osc_type:
+        if char == "[":
+            array = []
+            stack[-1].append(array)
+            stack.append(array)
+        elif char == "]":
+            if len(stack) < 2:
+                raise ValueError(f"Unexpected closing bracket in type tag: {osc_type}")
+            stack.pop()
+        else:
+            stack[-1].append(_osc_type_tags.get(char))
+    if len(stack) != 1:
+        raise ValueError(f"Missing closing bracket in type tag: {osc_type}")
+    return stack[0]
+
+
+_osc_type_tags = {
+    "T": bool,
+    "F": bool,
+    "i": int,
+    "h": osc_spec.OSCInt64,
+    "f": float,
+    "d": osc_spec.OSCDouble,
+    "s": str,
+    "b": bytes,
+}
+
+
+def _flatten_types(types_: list[type | list]) -> list[type]:
+    flat = []
+    for type_ in types_:
+        if isinstance(type_, list):
+            flat.extend(_flatten_types(type_))
+        else:
+            flat.append(type_)
+    return flat
+
+
+def _wire_type(type_: type | list) -> type:
+    """The python type that python-osc decodes values of the given node type to."""
+    if isinstance(type_, list):
+        return list
+    if type_ is osc_spec.OSCInt64:
+        return int
+    if type_ is osc_spec.OSCDouble:
+        return float
+    return type_
+
+
+def _stored_value(value: Any) -> Any:
+    """Blobs that are views of other data are copied to bytes."""
+    if isinstance(value, (memoryview, bytearray)):
+        return bytes(value)
+    if isinstance(value, list):
+        return [_stored_value(v) for v in value]
+    return value
+
+
+def _to_json_value(value: Any) -> Any:
+    """Blobs are served as base64 strings."""
+    if isinstance(value, blob_types):
+        return base64.b64encode(value).decode("ascii")
+    if isinstance(value, list):
+        return [_to_json_value(v) for v in value]
+    return value
+
+
+def _from_json_value(value: Any, type_: type | list | None) -> Any:
+    if type_ is None:
+        return value
+    if isinstance(type_, list):
+        if not isinstance(value, list):
+            raise TypeError(f"Expected array, got {value!r}")
+        return _values_from_json(value, type_)
+    if type_ is bytes:
+        if not isinstance(value, str):
+            raise TypeError(f"Expected base64 encoded blob, got {value!r}")
+        return base64.b64decode(value, validate=True)
+    if type_ is osc_spec.OSCInt64 or type_ is osc_spec.OSCDouble:
+        return type_(value)
+    return value
+
+
+@contextmanager
+def paused_gc():
+    """Pause the cyclic garbage collector, e.g. while building a big tree of nodes. All created nodes stay reachable,
+    so collections during the build couldn't free anything."""
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+# Advanced by every invalidation (and computation) of digests, see OSCPathNode._compute_digests()
+_digest_epochs = itertools.count()
+
+
+def invalidate_digests(nodes: Iterable[OSCPathNode]):
+    """Discard the digests of the given nodes and of their ancestors, after the nodes changed."""
+    next(_digest_epochs)
+    invalidated = set()
+    for node in nodes:
+        while node is not None and id(node) not in invalidated:
+            node._digests = None
+            invalidated.add(id(node))
+            node = node._parent
+
+
+# Type tags whose JSON values have to be converted, see _from_json_value()
+_converted_type_tags = frozenset("hdb[")
+
+_access_by_value = {access.value: access for access in OSCAccess}
+
+
+def _range_and_clipmode_from_json(
+    json_data: dict[str, Any], value: list | None
+) -> tuple[list[OSCRange | None] | None, OSCClipMode | list[OSCClipMode] | None]:
+    """Parse the RANGE and CLIPMODE attributes of a node, which are only used for nodes with values."""
+    value_range = None
+    if value and json_data.get("RANGE") is not None:
+        if not isinstance(json_data["RANGE"], list):
+            raise TypeError("OSCQuery JSON Range is not List / Array? Out-of-spec?")
+        value_range = [
+            _range_from_json(json_data, r, value[i] if i < len(value) else None, i)
+            for i, r in enumerate(json_data["RANGE"])
+        ]
+
+    clipmode = None
+    if value and json_data.get("CLIPMODE") is not None:
+        clipmodes = json_data["CLIPMODE"]
+        try:
+            if isinstance(clipmodes, list):
+                clipmode = [OSCClipMode(c) for c in clipmodes]
+            else:
+                clipmode = OSCClipMode(clipmodes)
+        except ValueError as ex:
+            raise TypeError(f"Unknown OSCQuery CLIPMODE: {ex}") from ex
+
+    return value_range, clipmode
+
+
+def _range_from_json(
+    json_data: dict[str, Any], range_data: Any, value: Any, i: int
+) -> OSCRange | None:
+    """Parse the RANGE of a single value. Ranges that can't be enforced (e.g. a minimum for a string value) are
+    dropped, since other implementations serve them."""
+    if not isinstance(range_data, dict):
+        return None
+    try:
+        value_range = OSCRange.from_json(range_data)
+    except (TypeError, ValueError) as ex:
+        error = str(ex)
+    else:
+        if value is None:
+            # More ranges than values, which the node rejects
+            return value_range
+        error = _range_error(python_type_of_value(value), value_range)
+        if error is None:
+            return value_range
+        error = f"RANGE {error}"
+    logger.warning(
+        "Ignoring RANGE of value %d of node %s: %s",
+        i,
+        json_data.get("FULL_PATH"),
+        error,
+    )
+    return None
+
+
+def _values_from_json(values: list, osc_type: str | list) -> list:
+    """Convert the VALUE of an OSCQuery node from JSON according to its TYPE (e.g. base64 strings to blobs)."""
+    try:
+        types_ = (
+            osc_type_to_python_type_list(osc_type)
+            if isinstance(osc_type, str)
+            else osc_type
+        )
+        converted = [
+            _from_json_value(value, type_) for value, type_ in zip(values, types_)
+        ]
+    except ValueError as ex:
+        raise TypeError(f"OSCQuery JSON VALUE doesn't match TYPE: {ex}") from ex
+    # Values without a type tag are kept as they are
+    return converted + values[len(converted) :]
+
+
+def compile_validator(
+    types_: list[type | list] | None,
+    value_ranges: list[OSCRange | None] | None = None,
+    clipmodes: list[OSCClipMode] | None = None,
+) -> Callable[[Sequence], Sequence]:
+    """Build a function that validates a sequence of values against the given types and ranges.
+
+    The checks that are needed for the given types are decided once, so that validating a message only does the
+    work that is necessary for this particular type signature. See OSCPathNode.validate_values() for the semantics.
+    """
+    validate_types = _compile_type_validator(types_)
+
+    range_checks = []
+    for i, value_range in enumerate(value_ranges or ()):
+        # Ranges of blobs and arrays are served, but not checked
+        if value_range is None or types_[i] is bytes or isinstance(types_[i], list):
+            continue
+        clipmode = clipmodes[i] if clipmodes else OSCClipMode.NONE
+        range_checks.append(
+            (
+                i,
+                _compile_range_check(value_range, clipmode, _wire_type(types_[i])),
+            )
+        )
+
+    if not range_checks:
+        return validate_types
+
+    def validate_values_in_range(values: Sequence) -> Sequence:
+        values = validate_types(values)
+        for i, check_range in range_checks:
+            value = values[i]
+            checked = check_range(value, i)
+            if checked is not value:
+                if not isinstance(values, list):
+                    values = list(values)
+                values[i] = checked
+        return values
+
+    return validate_values_in_range
+
+
+def _compile_type_validator(
+    types_: list[type | list] | None,
+) -> Callable[[Sequence], Sequence]:
+    if not types_:
+
+        def validate_no_values(values: Sequence) -> Sequence:
+            if values:
+                raise TypeError(f"Expected no value(s), got {len(values)}")
+            return values
+
+        return validate_no_values
+
+    expected_types = tuple(map(_wire_type, types_))
+    count = len(expected_types)
+    bool_positions = frozenset(
+        i for i, expected_type in enumerate(expected_types) if expected_type is bool
+    )
+    # Blobs and arrays are always converted (or checked element-wise)
+    converters = {
+        i: _compile_converter(type_)
+        for i, type_ in enumerate(types_)
+        if type_ is bytes or isinstance(type_, list)
+    }
+
+    def check_each(values: Sequence) -> Sequence:
+        """Slow path, only taken if the types don't match exactly."""
+        for i, expected_type in enumerate(expected_types):
+            converter = converters.get(i)
+            if converter is not None:
+                converted = converter(values[i], i)
+                if converted is not values[i]:
+                    if not isinstance(values, list):
+                        values = list(values)
+                    values[i] = converted
+                continue
+
+            received_type = type(values[i])
+            if received_type is expected_type:
+                continue
+            if (
+                i in bool_positions
+                and received_type is builtins.int
+                and values[i] in (0, 1)
+            ):
+                # Some clients might send int 0 or 1 as substitute for bool
+                if not isinstance(values, list):
+                    values = list(values)
+                values[i] = bool(values[i])
+                continue
+
+            raise TypeError(
+                f"Expected {expected_type} for value {i}, got {received_type}"
+            )
+        return values
+
+    if converters:
+
+        def validate_and_convert_values(values: Sequence) -> Sequence:
+            if len(values) != count:
+                raise TypeError(f"Expected {count} value(s), got {len(values)}")
+            return check_each(values)
+
+        return validate_and_convert_values
+
+    if count == 1:
+        expected_type = expected_types[0]
+
+        def validate_single_value(values: Sequence) -> Sequence:
+            if len(values) != 1:
+                raise TypeError(f"Expected 1 value(s), got {len(values)}")
+            if type(values[0]) is expected_type:
+                return values
+            return check_each(values)
+
+        return validate_single_value
+
+    def validate_values(values: Sequence) -> Sequence:
+        if len(values) != count:
+            raise TypeError(f"Expected {count} value(s), got {len(values)}")
+        if tuple(map(type, values)) == expected_types:
+            return values
+        return check_each(values)
+
+    return validate_values
+
+
+def _check_value_ranges(types_: list[type | list], value_ranges: list[OSCRange | None]):
+    """Raise a ValueError if the minimum or maximum of a RANGE can't be applied to the type of its value."""
+    for i, value_range in enumerate(value_ranges):
+        error = _range_error(types_[i], value_range)
+        if error is not None:
+            raise ValueError(f"RANGE of value {i} {error}")
+
+
+def _range_error(type_: type | list, value_range: OSCRange | None) -> str | None:
+    """Why the minimum or maximum of a RANGE can't be applied to a value of the given type, None if it can."""
+    if value_range is None or type_ is bytes or isinstance(type_, list):
+        return None
+    bounds = [
+        bound
+        for bound in (value_range.minimum, value_range.maximum)
+        if bound is not None
+    ]
+    if not bounds:
+        return None
+    wire_type = _wire_type(type_)
+    if wire_type not in (int, float):
+        return f"has a minimum or maximum, but its type {type_.__name__} is not numeric"
+    if any(
+        not isinstance(bound, (int, float)) or isinstance(bound, bool)
+        for bound in bounds
+    ):
+        return "has a minimum or maximum that is not a number"
+    if (
+        wire_type is int
+        and len(bounds) == 2
+        and math.ceil(value_range.minimum) > math.floor(value_range.maximum)
+    ):
+        return "contains no integer"
+    return None
+
+
+def _compile_range_check(
+    value_range: OSCRange, clipmode: OSCClipMode, wire_type: type
+) -> Callable[[Any, int], Any]:
+    """Build a function that checks a single value against its range, and clips it if the clip mode allows it."""
+    minimum = value_range.minimum
+    maximum = value_range.maximum
+    if wire_type is int:
+        # Clip integers to the integers inside of the range
+        if minimum is not None:
+            minimum = math.ceil(minimum)
+        if maximum is not None:
+            maximum = math.floor(maximum)
+    allowed = tuple(value_range.vals) if value_range.vals is not None else None
+    clip_low = clipmode in (OSCClipMode.LOW, OSCClipMode.BOTH)
+    clip_high = clipmode in (OSCClipMode.HIGH, OSCClipMode.BOTH)
+
+    def check_range(value: Any, i: int) -> Any:
+        if allowed is not None and value not in allowed:
+            raise ValueError(f"Expected one of {allowed} for value {i}, got {value!r}")
+        if minimum is not None and value < minimum:
+            if not clip_low:
+                raise ValueError(
+                    f"Expected at least {minimum} for value {i}, got {value!r}"
+                )
+            return type(value)(minimum)
+        if maximum is not None and value > maximum:
+            if not clip_high:
+                raise ValueError(
+                    f"Expected at most {maximum} for value {i}, got {value!r}"
+                )
+            return type(value)(maximum)
+        return value
+
+    return check_range
+
+
+def _compile_converter(type_: type | list) -> Callable[[Any, int], Any]:
+    """Build a function that validates and converts a single blob or array value."""
+    if type_ is bytes:
+
+        def convert_blob(value: Any, i: int) -> memoryview:
+            if type(value) is memoryview:
+                return value
+            if isinstance(value, (bytes, bytearray)):
+                # A view, not a copy of the data
+                return memoryview(value)
+            raise TypeError(f"Expected blob for value {i}, got {type(value)}")
+
+        return convert_blob
+
+    validate_array = compile_validator(type_)
+
+    def convert_array(value: Any, i: int) -> Sequence:
+        if type(value) is not list:
+            raise TypeError(f"Expected array for value {i}, got {type(value)}")
+        return validate_array(value)
+
+    return convert_array
+
+
+def compile_batch_validator(
+    types_: list[type | list] | None,
+    validator: Callable[[Sequence], Sequence],
+    value_ranges: list[OSCRange | None] | None = None,
+) -> Callable[[Sequence[Sequence]], list[Sequence | None]]:
+    """Build a function that validates the values of several messages against the given types.
+
+    See OSCPathNode.validate_batch() for the semantics. The given validator (see compile_validator()) is used for
+    the messages of batches that don't match exactly.
+    """
+    expected_types = tuple(map(_wire_type, types_ or ()))
+    count = len(expected_types)
+    distinct_types = frozenset(expected_types)
+    # Without conversions or range checks, a batch that matches the types exactly is valid as a whole
+    needs_conversion = bool(types_) and any(
+        type_ is bytes or isinstance(type_, list) for type_ in types_
+    )
+    needs_conversion = needs_conversion or any(
+        value_range is not None for value_range in value_ranges or ()
+    )
+
+    def validate_each(values_list: Sequence[Sequence]) -> list[Sequence | None]:
+        validated = []
+        for values in values_list:
+            try:
+                validated.append(validator(values))
+            except (TypeError, ValueError):
+                validated.append(None)
+        return validated
+
+    def matches_exactly(values_list: Sequence[Sequence]) -> bool:
+        if any(len(values) != count for values in values_list):
+            return False
+        if len(distinct_types) <= 1:
+            # All values must have the same type, so the values of all messages are checked in one pass
+            return distinct_types.issuperset(
+                map(type, itertools.chain.from_iterable(values_list))
+            )
+        return all(tuple(map(type, values)) == expected_types for values in values_list)
+
+    def validate_batch(values_list: Sequence[Sequence]) -> list[Sequence | None]:
+        if not needs_conversion and matches_exactly(values_list):
+            return list(values_list)
+        return validate_each(values_list)
+
+    return validate_batch
+
+
+def _per_value(setting: Any, values: list, name: str) -> list | None:
+    """Expand a node setting that can be given once for all values or once per value to one entry per value."""
+    if setting is None:
+        return None
+    if not values:
+        raise ValueError(f"{name} can only be given for method nodes")
+    if not isinstance(setting, list):
+        return [setting] * len(values)
+    if len(setting) != len(values):
+        raise ValueError(
+            f"{name} must have one entry per value ({len(values)}), got {len(setting)}"
+        )
+    return setting
@@ -0,0 +1,68 @@
+from collections.abc import Iterable
+from enum import Enum
+from typing import Any
+
+
+class OSCClipMode(Enum):
+    """How values outside the RANGE of a node are handled.
+
+    NONE rejects values below the minimum and above the maximum, LOW clips values below the minimum to the minimum,
+    HIGH clips values above the maximum to the maximum, and BOTH clips on both ends.
+    """
+
+    NONE = "none"
+    LOW = "low"
+    HIGH = "high"
+    BOTH = "both"
+
+
+class OSCRange:
+    """The RANGE of a single value of a node: a minimum, a maximum and/or a set of allowed values."""
+
+    def __init__(
+        self,
+        minimum: Any = None,
+        maximum: Any = None,
+        vals: Iterable[Any] | None = None,
+    ):
+        """
+        Args:
+            minimum: The smallest allowed value, or None if there is no lower bound
+            maximum: The largest allowed value, or None if there is no upper bound
+            vals: The allowed values, or None if any value (within the bounds) is allowed
+        """
+        if minimum is not None and maximum is not None and minimum > maximum:
+            raise ValueError(f"Minimum {minimum} is larger than maximum {maximum}")
+        self.minimum = minimum
+        self.maximum = maximum
+        self.vals = list(vals) if vals is not None else None
+
+    @classmethod
+    def from_json(cls, json_data: dict[str, Any] | None) -> "OSCRange | None":
+        """Factory method to create an instance of OSCRange from the JSON data of one value of a RANGE attribute."""
+        if not json_data:
+            return None
+        return cls(json_data.get("MIN"), json_data.get("MAX"), json_data.get("VALS"))
+
+    def to_json(self) -> dict[str, Any]:
+        """The JSON data of this range, as used for one value of the RANGE attribute."""
+        obj_dict = {}
+        if self.minimum is not None:
+            obj_dict["MIN"] = self.minimum
+        if self.maximum is not None:
+            obj_dict["MAX"] = self.maximum
+        if self.vals is not None:
+            obj_dict["VALS"] = self.vals
+        return obj_dict
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, OSCRange):
+            return NotImplemented
+        return (self.minimum, self.maximum, self.vals) == (
+            other.minimum,
+            other.maximum,
+            other.vals,
+        )
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(min={self.minimum}, max={self.maximum}, vals={self.vals})"
@@ -0,0 +1,309 @@
+import logging
+import threading
+from collections import deque
+from collections.abc import Callable, Hashable
+from enum import Enum
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class OverflowPolicy(Enum):
+    """What a client send queue does when a message is pushed while it is full."""
+
+    DROP_OLDEST = "drop_oldest"
+    """Discard the oldest queued message to make room for the new one."""
+
+    COALESCE_BY_PATH = "coalesce_by_path"
+    """Replace a queued message for the same path with the new payload. Falls back to dropping the oldest message
+    if no message for that path is queued."""
+
+    DISCONNECT = "disconnect"
+    """Close the queue and disconnect the client."""
+
+
+class OSCClientSendQueue:
+    """Bounded outbound queue for a single push client (e.g. a websocket connection).
+
+    Messages are written to the client by a dedicated writer thread, so a stalled client never blocks the
+    thread that pushes messages, nor any other client.
+
+    Example:
+        queue = OSCClientSendQueue(connection_send, policy=OverflowPolicy.COALESCE_BY_PATH)
+        queue.push("/levels/1", payload)
+    """
+
+    def __init__(
+        self,
+        send: Callable[[str, Any], None],
+        max_size: int = 256,
+        policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+        name: str | None = None,
+        on_disconnect: Callable[["OSCClientSendQueue"], None] | None = None,
+    ):
+        """
+        Args:
+            send: Function that writes one message to the client. Called from the writer thread with the OSC path
+                and the payload. If it raises, the client is disconnected.
+            max_size: Maximum number of queued messages
+            policy: Overflow policy that is applied when the queue is full
+            name: Name of the client, used for logging and the writer thread name
+            on_disconnect: Called (once) with this queue when the client gets disconnected. It is called without
+                holding the lock of the queue, from the thread that caused the disconnect
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+
+        self._send = send
+        self._max_size = max_size
+        self._policy = policy
+        self._name = name or f"client-{id(self):x}"
+        self._on_disconnect = on_disconnect
+
+        self._queue: deque[list] = deque()
+        self._queued_paths: dict[str, list] = {}
+        self._condition = threading.Condition()
+        self._connected = True
+
+        self._sent = 0
+        self._dropped = 0
+        self._coalesced = 0
+
+        self._writer = threading.Thread(
+            target=self._write_loop, name=f"{self._name} writer", daemon=True
+        )
+        self._writer.start()
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def policy(self) -> OverflowPolicy:
+        return self._policy
+
+    @property
+    def depth(self) -> int:
+        """The number of messages currently waiting to be written."""
+        return len(self._queue)
+
+    @property
+    def dropped(self) -> int:
+        """The number of messages that were discarded because the queue was full."""
+        return self._dropped
+
+    @property
+    def coalesced(self) -> int:
+        """The number of messages that were merged into an already queued message for the same path."""
+        return self._coalesced
+
+    @property
+    def sent(self) -> int:
+        """The number of messages that were written to the client."""
+        return self._sent
+
+    @property
+    def is_connected(self) -> bool:
+        return self._connected
+
+    def push(self, path: str, payload: Any) -> bool:
+        """Queue a message for the client. Never blocks on the client.
+
+        Args:
+            path: OSC address the message refers to
+            payload: The message that will be handed to the send function
+        Returns:
+            False if the client is (or got) disconnected, True otherwise
+        """
+        with self._condition:
+            if not self._connected:
+                return False
+
+            if self._policy is OverflowPolicy.COALESCE_BY_PATH:
+                entry = self._queued_paths.get(path)
+                if entry is not None:
+                    entry[1] = payload
+                    self._coalesced += 1
+                    return True
+
+            overflowed = len(self._queue) >= self._max_size
+            if not overflowed or self._policy is not OverflowPolicy.DISCONNECT:
+                if overflowed:
+                    oldest = self._queue.popleft()
+                    self._forget_path(oldest)
+                    self._dropped += 1
+
+                entry = [path, payload]
+                self._queue.append(entry)
+                if self._policy is OverflowPolicy.COALESCE_BY_PATH:
+                    self._queued_paths[path] = entry
+
+                self._condition.notify()
+                return True
+
+            logger.warning("Send queue of %s overflowed, disconnecting", self._name)
+            self._disconnect()
+
+        self._notify_disconnect()
+        return False
+
+    def close(self):
+        """Disconnect the client and stop the writer thread. Queued messages are discarded."""
+        with self._condition:
+            disconnected = self._disconnect()
+        if disconnected:
+            self._notify_disconnect()
+
+    def join(self, timeout: float | None = None):
+        """Wait for the writer thread to terminate."""
+        self._writer.join(timeout)
+
+    def snapshot(self) -> dict[str, Any]:
+        """The current queue statistics."""
+        return {
+            "depth": self.depth,
+            "sent": self._sent,
+            "dropped": self._dropped,
+            "coalesced": self._coalesced,
+            "connected": self._connected,
+        }
+
+    def _forget_path(self, entry: list):
+        if self._queued_paths.get(entry[0]) is entry:
+            del self._queued_paths[entry[0]]
+
+    def _disconnect(self) -> bool:
+        """Must be called with the condition held. The caller has to call _notify_disconnect() after releasing it
+        if True is returned, i.e. if the client was connected until now."""
+        if not self._connected:
+            return False
+        self._connected = False
+        self._queue.clear()
+        self._queued_paths.clear()
+        self._condition.notify_all()
+        return True
+
+    def _notify_disconnect(self):
+        if self._on_disconnect is not None:
+            self._on_disconnect(self)
+
+    def _write_loop(self):
+        while True:
+            with self._condition:
+                while self._connected and not self._queue:
+                    self._condition.wait()
+                if not self._connected:
+                    return
+                entry = self._queue.popleft()
+                self._forget_path(entry)
+
+            try:
+                self._send(entry[0], entry[1])
+            except Exception:
+                logger.exception("Writing to %s failed, disconnecting", self._name)
+                with self._condition:
+                    disconnected = self._disconnect()
+                if disconnected:
+                    self._notify_disconnect()
+                return
+            self._sent += 1
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self._name}, depth={self.depth}, dropped={self._dropped})"
+
+
+class OSCPushFanout:
+    """Distributes messages to any number of push clients, each with its own bounded send queue."""
+
+    def __init__(
+        self,
+        max_queue_size: int = 256,
+        policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+    ):
+        """
+        Args:
+            max_queue_size: Default maximum queue size for new clients
+            policy: Default overflow policy for new clients
+        Raises:
+            ValueError if max_queue_size is less than 1
+        """
+        if max_queue_size < 1:
+            raise ValueError("max_queue_size must be at least 1")
+
+        self._max_queue_size = max_queue_size
+        self._policy = policy
+        self._clients: dict[Hashable, OSCClientSendQueue] = {}
+        self._lock = threading.Lock()
+
+    def add_client(
+        self,
+        client_id: Hashable,
+        send: Callable[[str, Any], None],
+        max_queue_size: int | None = None,
+        policy: OverflowPolicy | None = None,
+    ) -> OSCClientSendQueue:
+        """Register a client. Clients that get disconnected are removed automatically.
+
+        Args:
+            client_id: Unique key of the client
+            send: Function that writes one message to the client, see OSCClientSendQueue
+            max_queue_size: Overrides the default maximum queue size
+            policy: Overrides the default overflow policy
+        Returns:
+            The send queue of the client
+        Raises:
+            ValueError if max_queue_size is less than 1
+        """
+
+        def on_disconnect(queue: OSCClientSendQueue):
+            with self._lock:
+                if self._clients.get(client_id) is queue:
+                    del self._clients[client_id]
+
+        queue = OSCClientSendQueue(
+            send,
+            max_size=self._max_queue_size if max_queue_size is None else max_queue_size,
+            policy=self._policy if policy is None else policy,
+            name=str(client_id),
+            on_disconnect=on_disconnect,
+        )
+        with self._lock:
+            previous = self._clients.get(client_id)
+            self._clients[client_id] = queue
+        if previous is not None:
+            previous.close()
+        return queue
+
+    def remove_client(self, client_id: Hashable):
+        """Disconnect and remove a client. Does nothing if the client is unknown."""
+        with self._lock:
+            queue = self._clients.pop(client_id, None)
+        if queue is not None:
+            queue.close()
+
+    def publish(self, path: str, payload: Any):
+        """Queue a message for all connected clients."""
+        with self._lock:
+            queues = list(self._clients.values())
+        for queue in queues:
+            queue.push(path, payload)
+
+    def stats(self) -> dict[Hashable, dict[str, Any]]:
+        """Queue statistics of all connected clients, by client id."""
+        with self._lock:
+            clients = list(self._clients.items())
+        return {client_id: queue.snapshot() for client_id, queue in clients}
+
+    def close(self):
+        """Disconnect all clients."""
+        with self._lock:
+            queues = list(self._clients.values())
+            self._clients.clear()
+        for queue in queues:
+            queue.close()
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({len(self)} clients)"
@@ -30,3 +30,21 @@ def is_valid_path(path: str) -> bool:
         return False
 
     return True
+
+
+class OSCInt64(int):
+    """Marks an int value of a node as 64-bit integer (OSC type tag "h") instead of a 32-bit one ("i").
+
+    python-osc decodes both to `int`, so messages for such a node are validated against `int`.
+    """
+
+
+class OSCDouble(float):
+    """Marks a float value of a node as 64-bit double (OSC type tag "d") instead of a 32-bit float ("f").
+
+    python-osc decodes both to `float`, so messages for such a node are validated against `float`.
+    """
+
+
+blob_types = (bytes, bytearray, memoryview)
+"""Python types that are accepted as OSC blob (type tag "b") values. The type of a blob is always `bytes`."""
@@ -0,0 +1,203 @@
+import logging
+from array import array
+from collections.abc import Iterable, Sequence
+from typing import Any
+
+from .osc_path_node import OSCPathNode, invalidate_digests
+from .osc_spec import OSCDouble, OSCInt64
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+logger = logging.getLogger(__name__)
+
+float_typecodes = ("f", "d")
+int_typecodes = ("i", "l", "q")
+
+
+class OSCValueStore:
+    """Keeps the values of numeric OSC method nodes in one contiguous buffer.
+
+    Nodes that are added to the store no longer hold their own values; reading the value of the node (and serving it
+    via OSCQuery) reads from the buffer instead. This allows updating the values of many nodes with a single
+    (vectorized) write.
+
+    The buffer is an `array.array`. If NumPy is available, a NumPy view of the same memory is used for writes with
+    index lists.
+
+    Example:
+        store = OSCValueStore("d")
+        for node in level_nodes:
+            store.add_node(node)
+        # Update all levels at once
+        store.set_values(slice(0, len(store)), new_levels)
+    """
+
+    def __init__(self, typecode: str = "d", use_numpy: bool = True):
+        """
+        Args:
+            typecode: `array` typecode of the buffer. "f" or "d" for float nodes, "i", "l" or "q" for int nodes
+            use_numpy: Whether to use NumPy for writes with index lists, if it is installed
+        """
+        if typecode in float_typecodes:
+            self._element_type = float
+            self._node_types = (float, OSCDouble)
+        elif typecode in int_typecodes:
+            self._element_type = int
+            self._node_types = (int, OSCInt64)
+        else:
+            raise ValueError(
+                f"Unsupported typecode '{typecode}', must be one of {float_typecodes + int_typecodes}"
+            )
+
+        self._buffer = array(typecode)
+        self._use_numpy = use_numpy and numpy is not None
+        self._view = None
+        self._slots: dict[str, slice] = {}
+        self._nodes: list[OSCPathNode] = []
+        # Whether digests of stored nodes have been computed since the last write, see OSCPathNode.digest
+        self._digests_cached = False
+
+    @property
+    def typecode(self) -> str:
+        return self._buffer.typecode
+
+    @property
+    def array(self) -> Any:
+        """The value buffer. A NumPy view of the buffer if NumPy is used, otherwise the `array.array` itself.
+
+        Don't hold on to the returned object while adding nodes to the store. Writes to it don't discard the digests
+        of the stored nodes (see OSCPathNode.digest), use set_values() or call invalidate_digests() afterwards."""
+        if self._use_numpy:
+            return self._numpy_view()
+        return self._buffer
+
+    def add_node(self, node: OSCPathNode) -> slice:
+        """Move the values of a node into the store.
+
+        Args:
+            node: A method node whose values all match the element type of the store (float or OSCDouble, int or
+                OSCInt64, but not bool)
+        Returns:
+            The position of the node's values in the buffer
+        Raises:
+            ValueError if the node is already stored, is a container or has values of the wrong type or out of the
+            range of the typecode
+        """
+        if node.full_path in self._slots:
+            raise ValueError(f"Node '{node.full_path}' is already in the store")
+
+        if not node.type or any(t not in self._node_types for t in node.type):
+            raise ValueError(
+                f"Only method nodes with {self._element_type.__name__} values can be stored, node '{node.full_path}' has types {node.type}"
+            )
+
+        # The buffer can't be resized while a view of it exists
+        self._view = None
+
+        try:
+            values = array(self.typecode, node.value)
+        except OverflowError as ex:
+            raise ValueError(
+                f"Values of node '{node.full_path}' don't fit typecode '{self.typecode}': {ex}"
+            ) from ex
+
+        start = len(self._buffer)
+        self._buffer.extend(values)
+        slot = slice(start, len(self._buffer))
+        self._slots[node.full_path] = slot
+        self._nodes.append(node)
+        node._bind_value_store(self, slot)
+        return slot
+
+    def index_of(self, node: OSCPathNode | str) -> slice:
+        """The position of the values of the given node (or node address) in the buffer."""
+        if isinstance(node, OSCPathNode):
+            node = node.full_path
+        return self._slots[node]
+
+    def get_values(self, index: slice | int) -> list:
+        """Read values from the buffer."""
+        if isinstance(index, slice):
+            return self._buffer[index].tolist()
+        return [self._buffer[index]]
+
+    def set_values(self, index: slice | int | Sequence[int], values: Iterable):
+        """Write values into the buffer.
+
+        Args:
+            index: A slice (e.g. from index_of()), a single position or a sequence of positions
+            values: The new values. Must have the same length as the indexed range, a single position takes a list
+                with one value (like get_values() returns it). Writing to a slice from an `array.array` with the same
+                typecode (or a NumPy array) is a single memory copy.
+        Raises:
+            ValueError if the number of values doesn't match the index, or a value is out of the range of the typecode
+        """
+        try:
+            self._write(index, values)
+        except OverflowError as ex:
+            raise ValueError(
+                f"Values don't fit typecode '{self.typecode}': {ex}"
+            ) from ex
+
+        # Writes don't go through the nodes, so the digests of the stored nodes are discarded after the write (once
+        # per write after the digests were computed). The digest epoch is advanced before the check, so that digests
+        # that are computed concurrently from the old values are not kept either.
+        invalidate_digests(())
+        if self._digests_cached:
+            self._digests_cached = False
+            invalidate_digests(self._nodes)
+
+    def _write(self, index: slice | int | Sequence[int], values: Iterable):
+        if isinstance(index, int):
+            values = list(values)
+            if len(values) != 1:
+                raise ValueError(f"Expected 1 value, got {len(values)}")
+            self._buffer[index] = values[0]
+            return
+
+        if isinstance(index, slice):
+            if self._use_numpy and isinstance(values, numpy.ndarray):
+                self._numpy_view()[index] = values
+                return
+            if not isinstance(values, array) or values.typecode != self.typecode:
+                values = array(self.typecode, values)
+            expected = len(range(*index.indices(len(self._buffer))))
+            if len(values) != expected:
+                raise ValueError(f"Expected {expected} value(s), got {len(values)}")
+            self._buffer[index] = values
+            return
+
+        if self._use_numpy:
+            self._numpy_view()[numpy.asarray(index)] = values
+            return
+
+        # Converted first, so that values out of range don't leave a partial write
+        values = array(self.typecode, values)
+        if len(values) != len(index):
+            raise ValueError(f"Expected {len(index)} value(s), got {len(values)}")
+        buffer = self._buffer
+        for i, value in zip(index, values):
+            buffer[i] = value
+
+    def set_node_values(self, node: OSCPathNode | str, values: Iterable):
+        """Write the values of a single node."""
+        self.set_values(self.index_of(node), values)
+
+    def _numpy_view(self):
+        if self._view is None:
+            self._view = numpy.frombuffer(self._buffer, dtype=self.typecode)
+        return self._view
+
+    def __contains__(self, node: OSCPathNode | str) -> bool:
+        if isinstance(node, OSCPathNode):
+            node = node.full_path
+        return node in self._slots
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}('{self.typecode}', {len(self._slots)} nodes, {len(self)} values)"
@@ -14,3 +14,4 @@ class OSCQueryAttribute(Enum):
     ACCESS = enum.auto()
     HOST_INFO = enum.auto()
     RANGE = enum.auto()
+    CLIPMODE = enum.auto()
@@ -0,0 +1,75 @@
+import socket
+from ipaddress import IPv4Address
+
+import pytest
+from zeroconf import ServiceInfo
+
+from pythonoscquery.osc_query_service import OSCQueryService
+from pythonoscquery.shared.osc_access import OSCAccess
+from pythonoscquery.shared.osc_address_space import OSCAddressSpace
+from pythonoscquery.shared.osc_path_node import OSCPathNode
+
+
+@pytest.fixture(scope="session")
+def service_info():
+    """Builds the zeroconf service info of a local OSCQuery service from its port."""
+
+    def build(port):
+        return ServiceInfo(
+            "_oscjson._tcp.local.",
+            f"Unit test {port}._oscjson._tcp.local.",
+            port=port,
+            addresses=[socket.inet_aton("127.0.0.1")],
+        )
+
+    return build
+
+
+@pytest.fixture(scope="session")
+def start_service():
+    """Starts an OSCQuery service for an address space on a free port."""
+
+    def start(address_space, server_name):
+        return OSCQueryService(
+            address_space, server_name, 0, 9000, IPv4Address("127.0.0.1")
+        )
+
+    return start
+
+
+@pytest.fixture(scope="module")
+def served_address_space():
+    """The address space that is served by the server fixture. Override it in a test module to serve other nodes."""
+    address_space = OSCAddressSpace()
+    for i in range(10):
+        address_space.add_node(
+            OSCPathNode(f"/test/{i}", value=i, access=OSCAccess.READONLY_VALUE)
+        )
+    return address_space
+
+
+@pytest.fixture(scope="module")
+def server(request, served_address_space, start_service):
+    """An OSCQuery service for served_address_space, named after the test module."""
+    module_name = request.module.__name__.rsplit(".", 1)[-1]
+    return start_service(served_address_space, f"Unit test {module_name} server")
+
+
+@pytest.fixture
+def unresponsive_ports():
+    """Ports that accept connections, but never respond."""
+    listeners = []
+    for _ in range(3):
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.bind(("127.0.0.1", 0))
+        listener.listen()
+        listeners.append(listener)
+    yield [listener.getsockname()[1] for listener in listeners]
+    for listener in listeners:
+        listener.close()
+
+
+@pytest.fixture
+def unresponsive_port(unresponsive_ports):
+    """A port that accepts connections, but never responds."""
+    return unresponsive_ports[0]
@@ -1,14 +1,25 @@
+import asyncio
 import builtins
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 import pytest
-from pythonosc import osc_message_builder
+from pythonosc import osc_bundle_builder, osc_message_builder
 from pythonosc.dispatcher import Dispatcher
 
-from pythonoscquery.pythonosc_callback_wrapper import OSCCallbackWrapper, map_node
+from pythonoscquery.pythonosc_callback_wrapper import (
+    OSCCallbackWrapper,
+    OSCQueryDispatcher,
+    map_address_space,
+    map_node,
+)
 from pythonoscquery.shared.osc_access import OSCAccess
 from pythonoscquery.shared.osc_address_space import OSCAddressSpace
+from pythonoscquery.shared.osc_metrics import OSCMetrics
 from pythonoscquery.shared.osc_path_node import OSCPathNode
+from pythonoscquery.shared.osc_range import OSCClipMode, OSCRange
+from pythonoscquery.shared.osc_value_store import OSCValueStore
 
 logging.basicConfig(level=logging.DEBUG)
 
@@ -322,3 +333,616 @@ class TestCallbackWrapper:
             assert called == pytest.approx(expected)
 
         callback.assert_called_once()
+
+    def test_blob_passed_to_callback_as_memoryview(self, dispatcher, callback):
+        # Arrange
+        node = OSCPathNode("/leds", value=[b"", 0.0], access=OSCAccess.READWRITE_VALUE)
+        map_node(node, dispatcher, callback)
+        frame = bytes(range(256)) * 16
+        message_builder = osc_message_builder.OscMessageBuilder("/leds")
+        message_builder.add_arg(frame, "b")
+        message_builder.add_arg(0.5, "d")
+        message = message_builder.build()
+        # Act
+        for h in dispatcher.handlers_for_address("/leds"):
+            h.invoke(("dummy", 99), message)
+        # Assert
+        _, blob, brightness = callback.call_args.args
+        assert type(blob) is memoryview
+        assert blob == frame
+        assert brightness == 0.5
+
+    def test_values_outside_range_clipped_or_dropped(self, dispatcher, callback):
+        # Arrange
+        node = OSCPathNode(
+            "/fader",
+            value=0.0,
+            access=OSCAccess.READWRITE_VALUE,
+            value_range=OSCRange(0.0, 1.0),
+            clipmode=OSCClipMode.HIGH,
+        )
+        handler = map_node(node, dispatcher, callback)
+        # Act
+        for value in [0.5, 1.5, -0.5]:
+            handler.invoke(("dummy", 99), float_message("/fader", value))
+        # Assert
+        assert [call.args for call in callback.call_args_list] == [
+            ("/fader", 0.5),
+            ("/fader", 1.0),
+        ]
+
+    def test_write_through_stores_accepted_values(self, dispatcher, callback):
+        # Arrange
+        node = OSCPathNode("/fader", value=0.0, access=OSCAccess.READWRITE_VALUE)
+        handler = map_node(node, dispatcher, callback, write_through=True)
+        # Act
+        handler.invoke(("dummy", 99), float_message("/fader", 0.5))
+        handler.invoke(("dummy", 99), float_message("/fader", "wrong"))
+        # Assert
+        assert node.value == [0.5]
+        assert node.version == 1
+
+    def test_values_not_stored_without_write_through(self, dispatcher, callback):
+        # Arrange
+        node = OSCPathNode("/fader", value=0.0, access=OSCAccess.READWRITE_VALUE)
+        handler = map_node(node, dispatcher, callback)
+        # Act
+        handler.invoke(("dummy", 99), float_message("/fader", 0.5))
+        # Assert
+        assert node.value == [0.0]
+        assert node.version == 0
+
+    def test_values_out_of_store_range_rejected(self, dispatcher, callback):
+        # Arrange
+        node = OSCPathNode("/count", value=1, access=OSCAccess.READWRITE_VALUE)
+        OSCValueStore("i").add_node(node)
+        handler = map_node(node, dispatcher, callback, write_through=True)
+        # Act
+        handler.invoke(("dummy", 99), float_message("/count", 2**40))
+        handler.invoke(("dummy", 99), float_message("/count", 2))
+        # Assert
+        assert [call.args for call in callback.call_args_list] == [("/count", 2)]
+        assert node.value == [2]
+
+
+@pytest.fixture
+def populated_address_space(address_space):
+    for path in ["/mixer/level", "/mixer/mute", "/transport/play"]:
+        address_space.add_node(
+            OSCPathNode(path, value=1, access=OSCAccess.READWRITE_VALUE)
+        )
+    return address_space
+
+
+class TestMapAddressSpace:
+    def test_all_method_nodes_mapped_with_routing_function(
+        self, populated_address_space, dispatcher, callback
+    ):
+        # Act
+        handlers = map_address_space(
+            populated_address_space, dispatcher, lambda node: callback
+        )
+        # Assert
+        assert set(handlers) == {"/mixer/level", "/mixer/mute", "/transport/play"}
+        message_builder = osc_message_builder.OscMessageBuilder("/mixer/level")
+        message_builder.add_arg(5)
+        for h in dispatcher.handlers_for_address("/mixer/level"):
+            h.invoke(("dummy", 99), message_builder.build())
+        callback.assert_called_once_with("/mixer/level", 5)
+
+    def test_nodes_not_mapped_when_routing_function_returns_none(
+        self, populated_address_space, dispatcher, callback
+    ):
+        # Act
+        handlers = map_address_space(
+            populated_address_space,
+            dispatcher,
+            lambda node: callback if node.full_path.startswith("/mixer") else None,
+        )
+        # Assert
+        assert set(handlers) == {"/mixer/level", "/mixer/mute"}
+        assert list(dispatcher.handlers_for_address("/transport/play")) == []
+
+    def test_longest_prefix_callback_used_with_mapping(
+        self, populated_address_space, dispatcher, mocker
+    ):
+        # Arrange
+        default_callback = mocker.stub(name="default")
+        mixer_callback = mocker.stub(name="mixer")
+        # Act
+        handlers = map_address_space(
+            populated_address_space,
+            dispatcher,
+            {"/": default_callback, "/mixer": mixer_callback},
+            "fixed",
+        )
+        # Assert
+        assert handlers["/mixer/mute"].callback.callback is mixer_callback
+        assert handlers["/transport/play"].callback.callback is default_callback
+        assert handlers["/transport/play"].args == ["fixed"]
+
+    def test_prefix_only_matches_whole_segments(
+        self, populated_address_space, dispatcher, callback
+    ):
+        # Act
+        handlers = map_address_space(
+            populated_address_space, dispatcher, {"/mix": callback}
+        )
+        # Assert
+        assert handlers == {}
+
+
+routing_paths = [
+    "/mixer/ch/1/level",
+    "/mixer/ch/2/level",
+    "/mixer/ch/10/level",
+    "/mixer/ch/1/mute",
+    "/mixer/master",
+    "/transport/play",
+]
+
+
+@pytest.fixture
+def routing_address_space(address_space):
+    for path in routing_paths:
+        address_space.add_node(
+            OSCPathNode(path, value=1, access=OSCAccess.READWRITE_VALUE)
+        )
+    return address_space
+
+
+def mapped_addresses(dispatcher, address_pattern):
+    return sorted(
+        h.callback.node.full_path
+        for h in dispatcher.handlers_for_address(address_pattern)
+    )
+
+
+class TestOSCQueryDispatcher:
+    @pytest.mark.parametrize(
+        "address_pattern",
+        [
+            "/mixer/ch/1/level",
+            "/mixer/ch/1",
+            "/mixer/ch/3/level",
+            "/mixer/ch/*/level",
+            "/mixer/ch/?/level",
+            "/mixer/ch/[12]/*",
+            "/mixer/ch/[!1]/level",
+            "/mixer/{master,ch}",
+            "/mixer/{master,ch}/1/mute",
+            "/*/master",
+            "/*",
+            "/mixer/ch/1*/level",
+            "/mixer/ch/[",
+        ],
+    )
+    def test_routes_like_python_osc_dispatcher(
+        self, routing_address_space, callback, address_pattern
+    ):
+        # Arrange
+        dispatcher = Dispatcher()
+        query_dispatcher = OSCQueryDispatcher(routing_address_space)
+        for node in routing_address_space.root_node:
+            if not node.is_container:
+                map_node(node, dispatcher, callback)
+                map_node(node, query_dispatcher, callback)
+        # Act
+        # Assert
+        assert mapped_addresses(query_dispatcher, address_pattern) == mapped_addresses(
+            dispatcher, address_pattern
+        )
+
+    def test_routes_addresses_not_in_address_space(
+        self, routing_address_space, callback
+    ):
+        # Arrange
+        dispatcher = OSCQueryDispatcher(routing_address_space)
+        dispatcher.map("/not/in/space", callback)
+        dispatcher.map("/wildcard/*", callback)
+        # Act
+        # Assert
+        assert len(list(dispatcher.handlers_for_address("/not/in/space"))) == 1
+        assert len(list(dispatcher.handlers_for_address("/not/*/space"))) == 1
+        assert len(list(dispatcher.handlers_for_address("/wildcard/foo"))) == 1
+        assert len(list(dispatcher.handlers_for_address("/wildcard/f?o"))) == 1
+        assert list(dispatcher.handlers_for_address("/other")) == []
+
+    def test_default_handler_used_when_nothing_matches(
+        self, routing_address_space, callback
+    ):
+        # Arrange
+        dispatcher = OSCQueryDispatcher(routing_address_space)
+        dispatcher.set_default_handler(callback)
+        # Act
+        handlers = list(dispatcher.handlers_for_address("/mixer/ch/1/level"))
+        # Assert
+        assert [h.callback for h in handlers] == [callback]
+
+    def test_dispatches_packets(self, routing_address_space, callback):
+        # Arrange
+        dispatcher = OSCQueryDispatcher(routing_address_space)
+        map_node(
+            routing_address_space.find_node("/mixer/ch/2/level"), dispatcher, callback
+        )
+        message_builder = osc_message_builder.OscMessageBuilder("/mixer/ch/*/level")
+        message_builder.add_arg(7)
+        # Act
+        dispatcher.call_handlers_for_packet(
+            message_builder.build().dgram, ("dummy", 99)
+        )
+        # Assert
+        callback.assert_called_once_with("/mixer/ch/*/level", 7)
+
+
+def float_message(address, value):
+    message_builder = osc_message_builder.OscMessageBuilder(address)
+    message_builder.add_arg(value)
+    return message_builder.build()
+
+
+class TestCoroutineCallbacks:
+    @pytest.fixture
+    def float_node(self):
+        return OSCPathNode("/test", value=1.0, access=OSCAccess.READWRITE_VALUE)
+
+    def test_coroutine_callbacks_run_in_arrival_order(self, float_node, dispatcher):
+        # Arrange
+        received = []
+
+        async def callback(address, value):
+            await asyncio.sleep(0.01 if value == 0.0 else 0)
+            received.append(value)
+
+        handler = map_node(float_node, dispatcher, callback, max_in_flight=1)
+
+        async def receive():
+            for i in range(5):
+                handler.invoke(("dummy", 99), float_message("/test", float(i)))
+            while len(received) < 5:
+                await asyncio.sleep(0.001)
+
+        # Act
+        asyncio.run(asyncio.wait_for(receive(), 5))
+        # Assert
+        assert received == [0.0, 1.0, 2.0, 3.0, 4.0]
+
+    def test_coroutine_callbacks_bounded_in_flight(self, float_node, dispatcher):
+        # Arrange
+        running = 0
+        max_running = 0
+        done = []
+
+        async def callback(address, value):
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.001)
+            running -= 1
+            done.append(value)
+
+        handler = map_node(float_node, dispatcher, callback, max_in_flight=3)
+
+        async def receive():
+            for i in range(20):
+                handler.invoke(("dummy", 99), float_message("/test", float(i)))
+            while len(done) < 20:
+                await asyncio.sleep(0.001)
+
+        # Act
+        asyncio.run(asyncio.wait_for(receive(), 5))
+        # Assert
+        assert max_running == 3
+
+    def test_invalid_message_not_scheduled(self, float_node, dispatcher):
+        # Arrange
+        called = []
+
+        async def callback(address, value):
+            called.append(value)
+
+        handler = map_node(float_node, dispatcher, callback)
+
+        async def receive():
+            handler.invoke(("dummy", 99), float_message("/test", "not a float"))
+            await asyncio.sleep(0.01)
+
+        # Act
+        asyncio.run(receive())
+        # Assert
+        assert called == []
+
+    def test_coroutine_callback_scheduled_on_given_loop_from_other_thread(
+        self, float_node, dispatcher
+    ):
+        # Arrange
+        received = []
+        loop = asyncio.new_event_loop()
+        loop_thread = threading.Thread(target=loop.run_forever, daemon=True)
+        loop_thread.start()
+        done = threading.Event()
+
+        async def callback(address, value):
+            received.append(asyncio.get_running_loop())
+            done.set()
+
+        handler = map_node(float_node, dispatcher, callback, loop=loop)
+        # Act
+        handler.invoke(("dummy", 99), float_message("/test", 2.0))
+        # Assert
+        assert done.wait(5)
+        assert received == [loop]
+        loop.call_soon_threadsafe(loop.stop)
+        loop_thread.join(5)
+        loop.close()
+
+    def test_coroutine_callback_without_loop_dropped(self, float_node, dispatcher):
+        # Arrange
+        called = []
+
+        async def callback(address, value):
+            called.append(value)
+
+        handler = map_node(float_node, dispatcher, callback)
+        # Act
+        result = handler.invoke(("dummy", 99), float_message("/test", 2.0))
+        # Assert
+        assert result is None
+        assert called == []
+
+
+class TestExecutorCallbacks:
+    @pytest.fixture
+    def executor(self):
+        executor = ThreadPoolExecutor(max_workers=4)
+        yield executor
+        executor.shutdown(wait=True)
+
+    def test_messages_for_same_address_run_in_order(self, dispatcher, executor):
+        # Arrange
+        node = OSCPathNode("/test", value=1.0, access=OSCAccess.READWRITE_VALUE)
+        received = []
+        done = threading.Event()
+
+        def callback(address, value):
+            received.append(value)
+            if len(received) == 100:
+                done.set()
+
+        handler = map_node(node, dispatcher, callback, executor=executor)
+        # Act
+        for i in range(100):
+            result = handler.invoke(("dummy", 99), float_message("/test", float(i)))
+            assert result is None
+        # Assert
+        assert done.wait(5)
+        assert received == [float(i) for i in range(100)]
+
+    def test_messages_for_different_addresses_run_in_parallel(
+        self, dispatcher, executor
+    ):
+        # Arrange
+        slow_node = OSCPathNode("/slow", value=1.0, access=OSCAccess.READWRITE_VALUE)
+        fast_node = OSCPathNode("/fast", value=1.0, access=OSCAccess.READWRITE_VALUE)
+        release = threading.Event()
+        fast_done = threading.Event()
+
+        slow_handler = map_node(
+            slow_node, dispatcher, lambda *args: release.wait(5), executor=executor
+        )
+        fast_handler = map_node(
+            fast_node, dispatcher, lambda *args: fast_done.set(), executor=executor
+        )
+        # Act
+        slow_handler.invoke(("dummy", 99), float_message("/slow", 1.0))
+        fast_handler.invoke(("dummy", 99), float_message("/fast", 1.0))
+        # Assert
+        assert fast_done.wait(5)
+        assert not release.is_set()
+        release.set()
+
+    def test_messages_delivered_after_failed_submit(self, dispatcher, caplog):
+        # Arrange
+        class FailingOnceExecutor(ThreadPoolExecutor):
+            failed = False
+
+            def submit(self, *args, **kwargs):
+                if not self.failed:
+                    self.failed = True
+                    raise RuntimeError("cannot schedule new futures after shutdown")
+                return super().submit(*args, **kwargs)
+
+        executor = FailingOnceExecutor(max_workers=1)
+        node = OSCPathNode("/test", value=1.0, access=OSCAccess.READWRITE_VALUE)
+        received = []
+        done = threading.Event()
+
+        def callback(address, value):
+            received.append(value)
+            done.set()
+
+        handler = map_node(node, dispatcher, callback, executor=executor)
+        # Act
+        handler.invoke(("dummy", 99), float_message("/test", 1.0))
+        handler.invoke(("dummy", 99), float_message("/test", 2.0))
+        # Assert
+        assert done.wait(5)
+        executor.shutdown(wait=True)
+        assert received == [2.0]
+        assert "1 call(s) dropped" in caplog.text
+
+
+def bundle(*messages):
+    bundle_builder = osc_bundle_builder.OscBundleBuilder(osc_bundle_builder.IMMEDIATELY)
+    for message in messages:
+        bundle_builder.add_content(message)
+    return bundle_builder.build()
+
+
+class TestBundleBatches:
+    @pytest.fixture
+    def address_space(self):
+        address_space = OSCAddressSpace()
+        for i in range(2):
+            address_space.add_node(
+                OSCPathNode(f"/level/{i}", value=1.0, access=OSCAccess.READWRITE_VALUE)
+            )
+        return address_space
+
+    @pytest.fixture
+    def dispatcher(self, address_space):
+        return OSCQueryDispatcher(address_space)
+
+    def test_messages_dispatched_in_bundle_order(
+        self, address_space, dispatcher, callback
+    ):
+        # Arrange
+        map_address_space(address_space, dispatcher, {"/": callback})
+        packet = bundle(
+            float_message("/level/0", 1.0),
+            float_message("/level/1", 2.0),
+            float_message("/level/0", 3.0),
+        )
+        # Act
+        dispatcher.call_handlers_for_packet(packet.dgram, ("dummy", 99))
+        # Assert
+        assert [call.args for call in callback.call_args_list] == [
+            ("/level/0", 1.0),
+            ("/level/1", 2.0),
+            ("/level/0", 3.0),
+        ]
+
+    @pytest.mark.parametrize("use_async", [False, True], indirect=False)
+    def test_plain_handlers_called_in_bundle_order(self, dispatcher, use_async):
+        # Arrange
+        received = []
+
+        def callback(address, value):
+            received.append((address, value))
+
+        dispatcher.map("/a", callback)
+        dispatcher.map("/b", callback)
+        packet = bundle(
+            float_message("/a", 1.0),
+            float_message("/b", 2.0),
+            float_message("/a", 3.0),
+        )
+        # Act
+        if use_async:
+            asyncio.run(
+                dispatcher.async_call_handlers_for_packet(packet.dgram, ("dummy", 99))
+            )
+        else:
+            dispatcher.call_handlers_for_packet(packet.dgram, ("dummy", 99))
+        # Assert
+        assert received == [("/a", 1.0), ("/b", 2.0), ("/a", 3.0)]
+
+    def test_invalid_messages_dropped_from_batch(
+        self, address_space, dispatcher, callback
+    ):
+        # Arrange
+        metrics = OSCMetrics()
+        map_address_space(address_space, dispatcher, {"/": callback}, metrics=metrics)
+        packet = bundle(
+            float_message("/level/0", 1.0),
+            float_message("/level/0", "wrong"),
+            float_message("/level/0", 3.0),
+        )
+        # Act
+        dispatcher.call_handlers_for_packet(packet.dgram, ("dummy", 99))
+        # Assert
+        assert [call.args for call in callback.call_args_list] == [
+            ("/level/0", 1.0),
+            ("/level/0", 3.0),
+        ]
+        snapshot = metrics.for_node("/level/0").snapshot()
+        assert snapshot["accepted"] == 2
+        assert snapshot["rejected"] == 1
+
+    @pytest.mark.parametrize("needs_reply_address", [False, True])
+    def test_batch_callback_called_once_per_node(
+        self, address_space, dispatcher, callback, fixed_args, needs_reply_address
+    ):
+        # Arrange
+        map_address_space(
+            address_space,
+            dispatcher,
+            {"/": callback},
+            *fixed_args,
+            needs_reply_address=needs_reply_address,
+            batch=True,
+        )
+        packet = bundle(*(float_message("/level/0", float(i)) for i in range(100)))
+        # Act
+        dispatcher.call_handlers_for_packet(packet.dgram, ("dummy", 99))
+        # Assert
+        reply_address = (("dummy", 99),) if needs_reply_address else ()
+        callback.assert_called_once_with(
+            *reply_address,
+            "/level/0",
+            fixed_args,
+            [[float(i)] for i in range(100)],
+        )
+
+    def test_batch_callback_called_with_single_message(
+        self, address_space, dispatcher, callback
+    ):
+        # Arrange
+        map_address_space(address_space, dispatcher, {"/": callback}, batch=True)
+        # Act
+        dispatcher.call_handlers_for_packet(
+            float_message("/level/1", 5.0).dgram, ("dummy", 99)
+        )
+        # Assert
+        callback.assert_called_once_with("/level/1", [[5.0]])
+
+    def test_write_through_stores_last_values_of_batch(
+        self, address_space, dispatcher, callback
+    ):
+        # Arrange
+        map_address_space(
+            address_space, dispatcher, {"/": callback}, write_through=True
+        )
+        packet = bundle(*(float_message("/level/0", float(i)) for i in range(10)))
+        # Act
+        dispatcher.call_handlers_for_packet(packet.dgram, ("dummy", 99))
+        # Assert
+        node = address_space.find_node("/level/0")
+        assert node.value == [9.0]
+        assert node.version == 1
+
+    def test_replies_of_batch_collected(self, address_space, dispatcher):
+        # Arrange
+        map_address_space(
+            address_space, dispatcher, {"/": lambda address, value: ("/reply", value)}
+        )
+        packet = bundle(float_message("/level/0", 1.0), float_message("/level/1", 2.0))
+        # Act
+        results = dispatcher.call_handlers_for_packet(packet.dgram, ("dummy", 99))
+        # Assert
+        assert results == [("/reply", 1.0), ("/reply", 2.0)]
+
+    def test_async_dispatch_of_bundle(self, address_space, dispatcher):
+        # Arrange
+        received = []
+
+        def callback(address, value):
+            received.append((address, value))
+
+        map_address_space(address_space, dispatcher, {"/": callback})
+        dispatcher.map("/other", callback)
+        packet = bundle(
+            float_message("/level/1", 1.0),
+            float_message("/level/1", 2.0),
+            float_message("/other", 3.0),
+        )
+        # Act
+        asyncio.run(
+            dispatcher.async_call_handlers_for_packet(packet.dgram, ("dummy", 99))
+        )
+        # Assert
+        assert received == [
+            ("/level/1", 1.0),
+            ("/level/1", 2.0),
+            ("/other", 3.0),
+        ]
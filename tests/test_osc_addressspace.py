@@ -1,5 +1,7 @@
 import pytest
+from pythonoscquery.shared.osc_access import OSCAccess
 from pythonoscquery.shared.osc_address_space import OSCAddressSpace
+from pythonoscquery.shared.osc_lazy_path_node import LazyOSCPathNode
 from pythonoscquery.shared.osc_path_node import OSCPathNode
 
 
@@ -93,3 +95,93 @@ class TestOSCAddressSpace:
         address_space.add_node(OSCPathNode(path))
         # Assert
         assert address_space.number_of_nodes == number_of_children_before_adding
+
+    def test_address_space_adding_sibling_does_not_duplicate_parent(self):
+        # Arrange
+        ns = OSCAddressSpace()
+        ns.add_node(OSCPathNode("/test/foo"))
+        # Act
+        ns.add_node(OSCPathNode("/test/bar"))
+        # Assert
+        assert ns.root_node.contents == [ns.find_node("/test")]
+        assert ns.number_of_nodes == 4
+
+    def test_address_space_finds_children_of_added_node(self):
+        # Arrange
+        ns = OSCAddressSpace()
+        node = OSCPathNode("/test", contents=[OSCPathNode("/test/child")])
+        # Act
+        ns.add_node(node)
+        # Assert
+        assert ns.find_node("/test/child") is node.contents[0]
+        assert ns.number_of_nodes == 3
+
+    def test_address_space_removes_node_with_child_nodes(self):
+        # Arrange
+        ns = OSCAddressSpace()
+        ns.add_node(OSCPathNode("/test/for/bar"))
+        ns.add_node(OSCPathNode("/test/other"))
+        version = ns.version
+
+        # Act
+        removed = ns.remove_node("/test/for")
+
+        # Assert
+        assert removed.full_path == "/test/for"
+        assert ns.find_node("/test/for") is None
+        assert ns.find_node("/test/for/bar") is None
+        assert [node.full_path for node in ns.root_node] == [
+            "/",
+            "/test",
+            "/test/other",
+        ]
+        assert ns.version > version
+
+    def test_address_space_remove_missing_node_returns_none(self):
+        # Arrange
+        ns = OSCAddressSpace()
+        # Act
+        removed = ns.remove_node("/test")
+        # Assert
+        assert removed is None
+
+    def test_address_space_root_node_cannot_be_removed(self):
+        # Arrange
+        ns = OSCAddressSpace()
+        # Act
+        # Assert
+        with pytest.raises(ValueError):
+            ns.remove_node("/")
+
+    def test_adding_below_method_node_leaves_address_space_unchanged(self):
+        # Arrange
+        ns = OSCAddressSpace()
+        ns.add_node(OSCPathNode("/test", value=1, access=OSCAccess.READWRITE_VALUE))
+        version = ns.version
+        # Act
+        # Assert
+        with pytest.raises(ValueError):
+            ns.add_node(OSCPathNode("/test/foo/bar"))
+        assert ns.find_node("/test/foo") is None
+        assert ns.number_of_nodes == 2
+        assert ns.version == version
+
+    def test_lazy_node_is_added_and_removed_without_fetching(self):
+        # Arrange
+        ns = OSCAddressSpace()
+        fetched = []
+        json_data = {
+            "FULL_PATH": "/remote",
+            "ACCESS": 0,
+            "CONTENTS": {"a": {"FULL_PATH": "/remote/a", "ACCESS": 0}},
+        }
+        node = LazyOSCPathNode.from_remote_json(json_data, fetched.append, 1)
+        # Act
+        ns.add_node(node)
+        found = ns.find_node("/remote/a")
+        ns.remove_node("/remote")
+        # Assert
+        assert found is not None
+        assert not found.is_loaded
+        assert fetched == []
+        assert ns.number_of_nodes == 1
@@ -0,0 +1,130 @@
+import pytest
+
+from pythonoscquery.shared.osc_access import OSCAccess
+from pythonoscquery.shared.osc_address_space import OSCAddressSpace
+from pythonoscquery.shared.osc_digest import (
+    OSCNodeChange,
+    diff_digests,
+    digest_summary,
+)
+from pythonoscquery.shared.osc_path_node import OSCPathNode
+from pythonoscquery.shared.oscquery_spec import OSCQueryAttribute
+
+
+def build_address_space(branching: int = 10) -> OSCAddressSpace:
+    address_space = OSCAddressSpace()
+    for i in range(branching):
+        for j in range(branching):
+            address_space.add_node(
+                OSCPathNode(
+                    f"/c{i}/c{j}/value", value=i * j, access=OSCAccess.READWRITE_VALUE
+                )
+            )
+    return address_space
+
+
+class SummaryRecorder:
+    """Serves the digest summaries of a "remote" address space and records the fetched addresses."""
+
+    def __init__(self, address_space: OSCAddressSpace):
+        self.address_space = address_space
+        self.paths = []
+
+    def __call__(self, path: str):
+        self.paths.append(path)
+        node = self.address_space.find_node(path)
+        return digest_summary(node) if node is not None else None
+
+
+class TestDigestSummary:
+    def test_summary_contains_digests_of_child_nodes(self):
+        # Arrange
+        address_space = build_address_space(2)
+        node = address_space.find_node("/c1")
+        # Act
+        summary = digest_summary(node)
+        # Assert
+        assert summary == {
+            "DIGEST": node.digest,
+            "ATTRIBUTES_DIGEST": node.attributes_digest,
+            "CONTENTS": {
+                "c0": address_space.find_node("/c1/c0").digest,
+                "c1": address_space.find_node("/c1/c1").digest,
+            },
+        }
+
+    def test_summary_of_method_node_has_no_contents(self):
+        # Arrange
+        node = OSCPathNode("/value", value=1, access=OSCAccess.READWRITE_VALUE)
+        # Act
+        summary = digest_summary(node)
+        # Assert
+        assert "CONTENTS" not in summary
+
+
+class TestDiffDigests:
+    def test_same_trees_need_one_fetch(self):
+        # Arrange
+        local = build_address_space()
+        fetch = SummaryRecorder(build_address_space())
+        # Act
+        changes = diff_digests(local.root_node, fetch)
+        # Assert
+        assert changes == []
+        assert fetch.paths == ["/"]
+
+    def test_changed_value_is_found_along_its_branch(self):
+        # Arrange
+        local = build_address_space()
+        remote = build_address_space()
+        remote.find_node("/c3/c4/value").set_value([100])
+        fetch = SummaryRecorder(remote)
+        # Act
+        changes = diff_digests(local.root_node, fetch)
+        # Assert
+        assert changes == [(OSCNodeChange.CHANGED, "/c3/c4/value")]
+        assert fetch.paths == ["/", "/c3", "/c3/c4", "/c3/c4/value"]
+
+    @pytest.mark.parametrize(
+        "change, expected",
+        [
+            ("add", [(OSCNodeChange.ADDED, "/c5/new")]),
+            ("remove", [(OSCNodeChange.REMOVED, "/c5/c2")]),
+        ],
+        indirect=False,
+    )
+    def test_added_and_removed_subtrees_are_reported_once(self, change, expected):
+        # Arrange
+        local = build_address_space()
+        remote = build_address_space()
+        if change == "add":
+            remote.add_node(
+                OSCPathNode("/c5/new/value", value=1, access=OSCAccess.READWRITE_VALUE)
+            )
+        else:
+            remote.remove_node("/c5/c2")
+        fetch = SummaryRecorder(remote)
+        # Act
+        changes = diff_digests(local.root_node, fetch)
+        # Assert
+        assert changes == expected
+        assert fetch.paths == ["/", "/c5"]
+
+    def test_changed_description_of_container_is_reported(self):
+        # Arrange
+        local = build_address_space(2)
+        remote = build_address_space(2)
+        remote.find_node("/c1").attributes[OSCQueryAttribute.DESCRIPTION] = "changed"
+        # Act
+        changes = diff_digests(local.root_node, SummaryRecorder(remote))
+        # Assert
+        assert changes == [(OSCNodeChange.CHANGED, "/c1")]
+
+    def test_missing_remote_node_is_reported_as_removed(self):
+        # Arrange
+        local = build_address_space(2)
+        remote = OSCAddressSpace()
+        # Act
+        changes = diff_digests(local.find_node("/c1"), SummaryRecorder(remote))
+        # Assert
+        assert changes == [(OSCNodeChange.REMOVED, "/c1")]
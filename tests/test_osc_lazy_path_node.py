@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+from pythonoscquery.shared.osc_access import OSCAccess
+from pythonoscquery.shared.osc_address_space import OSCAddressSpace
+from pythonoscquery.shared.osc_lazy_path_node import LazyOSCPathNode
+from pythonoscquery.shared.osc_path_node import OSCPathNode
+
+
+@pytest.fixture
+def address_space():
+    address_space = OSCAddressSpace()
+    for path in ("/a/b/c", "/a/b/d", "/a/e", "/f/g"):
+        address_space.add_node(
+            OSCPathNode(path, value=1, access=OSCAccess.READWRITE_VALUE)
+        )
+    return address_space
+
+
+class FetchRecorder:
+    """Fetches nodes from an address space, like a query with DEPTH."""
+
+    def __init__(self, address_space, depth):
+        self.address_space = address_space
+        self.depth = depth
+        self.fetched = []
+        self.fail = False
+
+    def __call__(self, path):
+        self.fetched.append(path)
+        if self.fail:
+            return None
+        node = self.address_space.find_node(path)
+        if node is None:
+            return None
+        return json.loads(node.to_json(depth=self.depth))
+
+
+class TestLazyOSCPathNode:
+    def test_only_accessed_branches_are_fetched(self, address_space):
+        # Arrange
+        fetch = FetchRecorder(address_space, 1)
+        root = LazyOSCPathNode.from_remote_json(fetch("/"), fetch, 1)
+        # Act
+        node = root.find_subnode("/a/b/d")
+        # Assert
+        assert node.value == [1]
+        assert fetch.fetched == ["/", "/a", "/a/b"]
+        assert not root.find_subnode("/f").is_loaded
+
+    def test_fetched_children_are_kept(self, address_space):
+        # Arrange
+        fetch = FetchRecorder(address_space, 1)
+        root = LazyOSCPathNode.from_remote_json(fetch("/"), fetch, 1)
+        # Act
+        first = [node.full_path for node in root]
+        second = [node.full_path for node in root]
+        # Assert
+        assert first == second == [node.full_path for node in address_space.root_node]
+        assert sorted(fetch.fetched) == ["/", "/a", "/a/b", "/f"]
+
+    def test_is_container_does_not_fetch(self, address_space):
+        # Arrange
+        fetch = FetchRecorder(address_space, 1)
+        root = LazyOSCPathNode.from_remote_json(fetch("/"), fetch, 1)
+        # Act
+        containers = [node.is_container for node in root.contents]
+        # Assert
+        assert containers == [True, True]
+        assert fetch.fetched == ["/"]
+
+    def test_failed_fetch_is_retried(self, address_space):
+        # Arrange
+        fetch = FetchRecorder(address_space, 1)
+        node = LazyOSCPathNode.from_remote_json(fetch("/"), fetch, 1).contents[0]
+        fetch.fail = True
+        # Act
+        missing = node.contents
+        fetch.fail = False
+        contents = node.contents
+        # Assert
+        assert missing is None
+        assert [node.full_path for node in contents] == ["/a/b", "/a/e"]
+
+    def test_zero_fetch_depth_raises(self, address_space):
+        # Arrange
+        fetch = FetchRecorder(address_space, 0)
+        # Act
+        # Assert
+        with pytest.raises(ValueError):
+            LazyOSCPathNode.from_remote_json(fetch("/"), fetch, 0)
+
+    def test_unlimited_depth_is_fetched_at_once(self, address_space):
+        # Arrange
+        fetch = FetchRecorder(address_space, None)
+        # Act
+        root = LazyOSCPathNode.from_remote_json(fetch("/"), fetch, None)
+        # Assert
+        assert root.find_subnode("/a/b/c").value == [1]
+        assert fetch.fetched == ["/"]
@@ -0,0 +1,127 @@
+import threading
+
+import pytest
+from pythonosc import osc_message_builder
+from pythonosc.dispatcher import Dispatcher
+
+from pythonoscquery.pythonosc_callback_wrapper import map_node
+from pythonoscquery.shared.osc_access import OSCAccess
+from pythonoscquery.shared.osc_metrics import OSCMetrics, OSCNodeMetrics
+from pythonoscquery.shared.osc_path_node import OSCPathNode
+
+
+@pytest.fixture
+def metrics():
+    return OSCMetrics()
+
+
+def int_message(address, value):
+    message_builder = osc_message_builder.OscMessageBuilder(address)
+    message_builder.add_arg(value)
+    return message_builder.build()
+
+
+class TestOSCNodeMetrics:
+    def test_counters_summed_over_threads(self):
+        # Arrange
+        node_metrics = OSCNodeMetrics("/test")
+
+        def record():
+            for _ in range(1000):
+                node_metrics.record_accepted()
+            node_metrics.record_rejected()
+
+        threads = [threading.Thread(target=record) for _ in range(4)]
+        # Act
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        snapshot = node_metrics.snapshot()
+        # Assert
+        assert snapshot["accepted"] == 4000
+        assert snapshot["rejected"] == 4
+        assert snapshot["last_message"] is not None
+
+    def test_stripes_are_bounded_with_a_thread_per_message(self):
+        # Arrange
+        node_metrics = OSCNodeMetrics("/test")
+        release = threading.Event()
+
+        def record():
+            # Threads that are alive at the same time have different ids
+            node_metrics.record_accepted()
+            release.wait(5)
+
+        threads = [threading.Thread(target=record) for _ in range(100)]
+        # Act
+        for thread in threads:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join()
+        snapshot = node_metrics.snapshot()
+        # Assert
+        assert snapshot["accepted"] == 100
+        assert len(node_metrics._stripes) <= 16
+
+    def test_latencies_counted_in_buckets(self):
+        # Arrange
+        node_metrics = OSCNodeMetrics("/test", buckets=(0.001, 0.01))
+        # Act
+        for latency in (0.0005, 0.001, 0.005, 0.5):
+            node_metrics.record_latency(latency)
+        latency = node_metrics.snapshot()["latency"]
+        # Assert
+        assert latency["buckets"] == [0.001, 0.01]
+        assert latency["counts"] == [2, 1, 1]
+        assert latency["count"] == 4
+        assert latency["sum"] == pytest.approx(0.5065)
+
+    def test_empty_snapshot(self):
+        # Arrange
+        node_metrics = OSCNodeMetrics("/test")
+        # Act
+        snapshot = node_metrics.snapshot()
+        # Assert
+        assert snapshot["accepted"] == 0
+        assert snapshot["last_message"] is None
+
+
+class TestOSCMetrics:
+    def test_snapshot_filtered_by_prefix(self, metrics):
+        # Arrange
+        for path in ["/mixer", "/mixer/level", "/mixer2/level", "/transport"]:
+            metrics.for_node(path).record_accepted()
+        # Act
+        snapshot = metrics.snapshot("/mixer")
+        # Assert
+        assert set(snapshot) == {"/mixer", "/mixer/level"}
+        assert set(metrics.snapshot("/")) == {
+            "/mixer",
+            "/mixer/level",
+            "/mixer2/level",
+            "/transport",
+        }
+
+    def test_same_node_metrics_returned(self, metrics):
+        assert metrics.for_node("/test") is metrics.for_node("/test")
+
+    def test_unsorted_buckets_raise(self):
+        with pytest.raises(ValueError):
+            OSCMetrics(buckets=(0.1, 0.01))
+
+    def test_mapped_node_records_messages(self, metrics, mocker):
+        # Arrange
+        dispatcher = Dispatcher()
+        node = OSCPathNode("/test", value=1, access=OSCAccess.READWRITE_VALUE)
+        handler = map_node(node, dispatcher, mocker.stub(), metrics=metrics)
+        # Act
+        handler.invoke(("dummy", 99), int_message("/test", 5))
+        handler.invoke(("dummy", 99), int_message("/test", 6))
+        handler.invoke(("dummy", 99), int_message("/test", "wrong type"))
+        snapshot = metrics.snapshot()["/test"]
+        # Assert
+        assert snapshot["accepted"] == 2
+        assert snapshot["rejected"] == 1
+        assert snapshot["latency"]["count"] == 2
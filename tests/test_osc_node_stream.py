@@ -0,0 +1,139 @@
+import json
+
+import pytest
+
+from pythonoscquery.shared.osc_access import OSCAccess
+from pythonoscquery.shared.osc_address_space import OSCAddressSpace
+from pythonoscquery.shared.osc_node_stream import OSCNodeStreamDecoder
+from pythonoscquery.shared.osc_path_node import OSCPathNode
+from pythonoscquery.shared.osc_range import OSCRange
+
+
+@pytest.fixture
+def json_text():
+    address_space = OSCAddressSpace()
+    address_space.add_node(
+        OSCPathNode("/a/b/c", access=OSCAccess.READWRITE_VALUE, value=[1, 'ä"'])
+    )
+    address_space.add_node(
+        OSCPathNode(
+            "/a/d",
+            access=OSCAccess.READONLY_VALUE,
+            value=[12345.5, [1, 2]],
+            value_range=[OSCRange(0.0, 1e6), None],
+        )
+    )
+    address_space.add_node(
+        OSCPathNode("/e", access=OSCAccess.READWRITE_VALUE, value=b"\x00\x01")
+    )
+    return address_space.root_node.to_json()
+
+
+def decode(data: bytes, chunk_size: int, **kwargs) -> tuple[OSCNodeStreamDecoder, int]:
+    """Feed the data in chunks until the decoder is done, returns the decoder and the number of fed bytes."""
+    decoder = OSCNodeStreamDecoder(**kwargs)
+    fed = 0
+    while fed < len(data) and not decoder.done:
+        decoder.feed(data[fed : fed + chunk_size])
+        fed += chunk_size
+    decoder.close()
+    return decoder, min(fed, len(data))
+
+
+class TestOSCNodeStreamDecoder:
+    @pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 100_000], indirect=False)
+    @pytest.mark.parametrize("trusted", [False, True], indirect=False)
+    def test_decoded_tree_matches_from_json(self, json_text, chunk_size, trusted):
+        # Arrange
+        data = json_text.encode()
+        # Act
+        decoder, _ = decode(data, chunk_size, trusted=trusted)
+        # Assert
+        expected = OSCPathNode.from_json(json.loads(json_text))
+        assert decoder.node.to_json() == expected.to_json()
+        assert [node.full_path for node in decoder.node] == [
+            node.full_path for node in expected
+        ]
+
+    def test_nodes_are_returned_when_complete(self, json_text):
+        # Arrange
+        decoder = OSCNodeStreamDecoder()
+        # Act
+        completed = []
+        for char in json_text:
+            completed.extend(node.full_path for node in decoder.feed(char))
+        # Assert
+        assert completed == ["/a/b/c", "/a/b", "/a/d", "/a", "/e", "/"]
+
+    def test_path_filter_stops_early(self, json_text):
+        # Arrange
+        data = json_text.encode()
+        # Act
+        decoder, fed = decode(data, 1, path_filter="/a/b")
+        # Assert
+        assert decoder.node.full_path == "/a/b"
+        assert [node.full_path for node in decoder.node] == ["/a/b", "/a/b/c"]
+        assert decoder.node.contents[0].value == [1, 'ä"']
+        assert fed < len(data)
+
+    def test_path_filter_without_match(self, json_text):
+        # Arrange
+        data = json_text.encode()
+        # Act
+        decoder, fed = decode(data, 16, path_filter="/a/x")
+        # Assert
+        assert decoder.done
+        assert decoder.node is None
+        assert fed == len(data)
+
+    def test_address_of_queried_node(self):
+        # Arrange
+        node = OSCPathNode(
+            "/a",
+            contents=[OSCPathNode("/a/b", access=OSCAccess.READONLY_VALUE, value=1)],
+        )
+        # Act
+        decoder, _ = decode(
+            node.to_json().encode(), 4, address="/a", path_filter="/a/b"
+        )
+        # Assert
+        assert decoder.node.value == [1]
+
+    @pytest.mark.parametrize(
+        "value", ["x" * 10_000, list(range(2_000))], indirect=False
+    )
+    def test_value_spanning_chunks_is_not_rescanned(self, value):
+        # Arrange
+        node = OSCPathNode("/", access=OSCAccess.READONLY_VALUE, value=value)
+        data = node.to_json().encode()
+        expected = node.value
+        decoder = OSCNodeStreamDecoder()
+        raw_decode = decoder._json_decoder.raw_decode
+        calls = []
+
+        def counting_raw_decode(*args):
+            calls.append(args)
+            return raw_decode(*args)
+
+        decoder._json_decoder.raw_decode = counting_raw_decode
+        # Act
+        for start in range(0, len(data), 8):
+            decoder.feed(data[start : start + 8])
+        decoder.close()
+        # Assert
+        assert decoder.node.value == expected
+        assert len(calls) < 100
+
+    @pytest.mark.parametrize(
+        "data",
+        [b'{"FULL_PATH": "/", "ACCESS": 0', b'{"FULL_PATH": "/", "ACCESS": 0,}', b"[]"],
+        indirect=False,
+    )
+    def test_invalid_data_raises(self, data):
+        # Arrange
+        decoder = OSCNodeStreamDecoder()
+        # Act
+        # Assert
+        with pytest.raises(ValueError):
+            decoder.feed(data)
+            decoder.close()
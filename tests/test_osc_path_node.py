@@ -1,10 +1,14 @@
 import builtins
+import json
 
 import pytest
 
 from pythonoscquery.shared.osc_access import OSCAccess
 from pythonoscquery.shared.osc_address_space import OSCAddressSpace
 from pythonoscquery.shared.osc_path_node import OSCPathNode
+from pythonoscquery.shared.osc_range import OSCClipMode, OSCRange
+from pythonoscquery.shared.osc_spec import OSCDouble, OSCInt64
+from pythonoscquery.shared.osc_value_store import OSCValueStore
 from pythonoscquery.shared.oscquery_spec import OSCQueryAttribute
 
 
@@ -211,6 +215,84 @@ class TestOSCPathNode:
         # Assert
         assert node.are_values_valid([12.55, False, 897, "gsdfg", 12]) is False
 
+    @pytest.mark.parametrize(
+        "values",
+        [[], [1], [1, "a"], (1,), (1, "a", 2.0, True, 5)],
+        indirect=False,
+    )
+    def test_node_value_checker_rejects_wrong_number_of_values(self, values):
+        # Arrange
+        node = OSCPathNode(
+            "/test",
+            access=OSCAccess.READONLY_VALUE,
+            value=[99, "hello", 1.5, True],
+        )
+        # Act
+        # Assert
+        with pytest.raises(TypeError):
+            node.validate_values(values)
+
+    def test_node_value_checker_returns_given_sequence_when_types_match(self):
+        # Arrange
+        node = OSCPathNode(
+            "/test", access=OSCAccess.READONLY_VALUE, value=[99, "hello"]
+        )
+        values = (12, "hi")
+        # Act
+        validated = node.validate_values(values)
+        # Assert
+        assert validated is values
+
+    @pytest.mark.parametrize(
+        "values", [(1, 0), [1, 0]], indirect=False, ids=["tuple", "list"]
+    )
+    def test_node_value_checker_converts_int_substitutes_for_bool(self, values):
+        # Arrange
+        node = OSCPathNode("/test", access=OSCAccess.READONLY_VALUE, value=[99, False])
+        # Act
+        validated = node.validate_values(values)
+        # Assert
+        assert list(validated) == [1, False]
+        assert type(validated[1]) is bool
+
+    @pytest.mark.parametrize("value", [2, -1, 1.0, "1"], indirect=False)
+    def test_node_value_checker_rejects_other_substitutes_for_bool(self, value):
+        # Arrange
+        node = OSCPathNode("/test", access=OSCAccess.READONLY_VALUE, value=True)
+        # Act
+        # Assert
+        assert node.are_values_valid([value]) is False
+
+    @pytest.mark.parametrize(
+        "node_value, values_list, expected",
+        [
+            (1.0, [[1.0], [2.0], [3.0]], [[1.0], [2.0], [3.0]]),
+            (1.0, [[1.0], ["a"], [3.0]], [[1.0], None, [3.0]]),
+            (1.0, [[1.0], [2.0, 3.0], []], [[1.0], None, None]),
+            ([1, "a"], [[1, "b"], ["b", 1], [2, "c"]], [[1, "b"], None, [2, "c"]]),
+            (True, [[False], [1], [2]], [[False], [True], None]),
+        ],
+        indirect=False,
+        ids=["valid", "wrong type", "wrong count", "mixed", "bool"],
+    )
+    def test_node_batch_validation(self, node_value, values_list, expected):
+        # Arrange
+        node = OSCPathNode("/test", access=OSCAccess.READONLY_VALUE, value=node_value)
+        # Act
+        validated = node.validate_batch(values_list)
+        # Assert
+        assert [
+            None if values is None else list(values) for values in validated
+        ] == expected
+
+    def test_node_batch_validation_without_configured_types(self):
+        # Arrange
+        node = OSCPathNode("/test")
+        # Act
+        validated = node.validate_batch([(), (1,)])
+        # Assert
+        assert validated == [(), None]
+
     def test_node_attributes_are_set(self):
         # Arrange
         child = OSCPathNode(
@@ -294,6 +376,32 @@ class TestOSCPathNode:
             == '{"FULL_PATH": "/test", "CONTENTS": {"foo": {"FULL_PATH": "/test/foo", "VALUE": [99, "hello", true, false, 123.5], "TYPE": "isTTf", "ACCESS": 1, "DESCRIPTION": "test"}}, "ACCESS": 0}'
         )
 
+    @pytest.mark.parametrize(
+        "depth, expected",
+        [
+            (0, {"FULL_PATH": "/a", "ACCESS": 0}),
+            (
+                1,
+                {
+                    "FULL_PATH": "/a",
+                    "CONTENTS": {"b": {"FULL_PATH": "/a/b", "ACCESS": 0}},
+                    "ACCESS": 0,
+                },
+            ),
+        ],
+        indirect=False,
+    )
+    def test_node_json_serialization_depth(self, depth, expected):
+        # Arrange
+        leaf = OSCPathNode("/a/b/c", access=OSCAccess.READONLY_VALUE, value=1)
+        node = OSCPathNode("/a", contents=[OSCPathNode("/a/b", contents=[leaf])])
+
+        # Act
+        json_data = json.loads(node.to_json(depth=depth))
+        # Assert
+        assert json_data == expected
+        assert json.loads(node.to_json(depth=2)) == json.loads(node.to_json())
+
     def test_node_json_complete_serialization_empty_description_empty_contents(self):
         # Arrange
         node = OSCPathNode(
@@ -481,3 +589,633 @@ class TestOSCPathNode:
         # Assert
         with pytest.raises(ValueError):
             method_node.add_child(child_node)
+
+
+class TestExtendedTypes:
+    @pytest.mark.parametrize(
+        "value, osc_type",
+        [
+            (OSCInt64(2**40), "h"),
+            (OSCDouble(0.5), "d"),
+            (b"\x00\x01", "b"),
+            (bytearray(b"\x00\x01"), "b"),
+            ([[1.0, 2.0], 3], "[ff]i"),
+            ([["a", [True]]], "[s[T]]"),
+        ],
+        indirect=False,
+    )
+    def test_node_type(self, value, osc_type):
+        # Arrange
+        node = OSCPathNode("/test", access=OSCAccess.READWRITE_VALUE, value=value)
+        # Act
+        json = node.to_json(OSCQueryAttribute.TYPE)
+        # Assert
+        assert json == f'{{"TYPE": "{osc_type}"}}'
+
+    @pytest.mark.parametrize(
+        "value, received",
+        [(OSCInt64(1), 2**40), (OSCDouble(1.0), 0.25)],
+        indirect=False,
+    )
+    def test_node_validates_int64_and_double_as_decoded_by_python_osc(
+        self, value, received
+    ):
+        # Arrange
+        node = OSCPathNode("/test", access=OSCAccess.READWRITE_VALUE, value=value)
+        # Act
+        # Assert
+        assert node.are_values_valid([received]) is True
+        assert node.are_values_valid(["wrong"]) is False
+
+    @pytest.mark.parametrize(
+        "blob",
+        [b"\x01\x02\x03", bytearray(b"\x01\x02\x03"), memoryview(b"\x01\x02\x03")],
+        indirect=False,
+        ids=["bytes", "bytearray", "memoryview"],
+    )
+    def test_blob_validated_as_memoryview_without_copy(self, blob):
+        # Arrange
+        node = OSCPathNode("/test", access=OSCAccess.READWRITE_VALUE, value=[b"", 1])
+        # Act
+        validated = node.validate_values((blob, 5))
+        # Assert
+        assert type(validated[0]) is memoryview
+        assert validated[0].obj is (blob.obj if isinstance(blob, memoryview) else blob)
+        assert validated[1] == 5
+
+    @pytest.mark.parametrize("value", ["text", 1, [1, 2]], indirect=False)
+    def test_blob_node_rejects_other_types(self, value):
+        # Arrange
+        node = OSCPathNode("/test", access=OSCAccess.READWRITE_VALUE, value=b"")
+        # Act
+        # Assert
+        assert node.are_values_valid([value]) is False
+
+    @pytest.mark.parametrize(
+        "values, valid",
+        [
+            ([[1.0, 2.0], 3], True),
+            ([[1.0, 2], 3], False),
+            ([[1.0], 3], False),
+            ([(1.0, 2.0), 3], False),
+            ([1.0, 3], False),
+        ],
+        indirect=False,
+    )
+    def test_array_validation(self, values, valid):
+        # Arrange
+        node = OSCPathNode(
+            "/test", access=OSCAccess.READWRITE_VALUE, value=[[0.0, 0.0], 0]
+        )
+        # Act
+        # Assert
+        assert node.are_values_valid(values) is valid
+
+    def test_batch_validation_converts_blobs(self):
+        # Arrange
+        node = OSCPathNode("/test", access=OSCAccess.READWRITE_VALUE, value=b"")
+        # Act
+        validated = node.validate_batch([[b"\x01"], ["wrong"], [b"\x02"]])
+        # Assert
+        assert [None if v is None else type(v[0]) for v in validated] == [
+            memoryview,
+            None,
+            memoryview,
+        ]
+
+    def test_blob_serialized_as_base64(self):
+        # Arrange
+        node = OSCPathNode(
+            "/test", access=OSCAccess.READWRITE_VALUE, value=[b"\x00\xff", [b"ab"]]
+        )
+        # Act
+        json = node.to_json(OSCQueryAttribute.VALUE)
+        # Assert
+        assert json == '{"VALUE": ["AP8=", ["YWI="]]}'
+
+    def test_node_from_json_with_extended_types(self):
+        # Arrange
+        node = OSCPathNode(
+            "/test",
+            access=OSCAccess.READWRITE_VALUE,
+            value=[OSCInt64(2**40), OSCDouble(0.5), b"\x00\xff", [1.0, "a"]],
+        )
+        # Act
+        parsed = OSCPathNode.from_json(json.loads(node.to_json()))
+        # Assert
+        assert parsed.type == node.type
+        assert parsed.value == node.value
+        assert parsed.to_json() == node.to_json()
+
+    @pytest.mark.parametrize(
+        "value, osc_type",
+        [(["not base64!"], "b"), ([1.0], "[f]"), ([[1.0]], "[f")],
+        indirect=False,
+    )
+    def test_node_from_json_value_not_matching_type_raises(self, value, osc_type):
+        with pytest.raises(TypeError):
+            OSCPathNode.from_json(
+                {"FULL_PATH": "/test", "VALUE": value, "TYPE": osc_type, "ACCESS": 3}
+            )
+
+
+class TestRange:
+    @pytest.mark.parametrize(
+        "clipmode, values, expected",
+        [
+            (None, [0.5], [0.5]),
+            (None, [-1.0], None),
+            (None, [2.0], None),
+            (OSCClipMode.NONE, [2.0], None),
+            (OSCClipMode.LOW, [-1.0], [0.0]),
+            (OSCClipMode.LOW, [2.0], None),
+            (OSCClipMode.HIGH, [2.0], [1.0]),
+            (OSCClipMode.HIGH, [-1.0], None),
+            (OSCClipMode.BOTH, [-1.0], [0.0]),
+            (OSCClipMode.BOTH, [2.0], [1.0]),
+        ],
+        indirect=False,
+    )
+    def test_values_checked_against_range(self, clipmode, values, expected):
+        # Arrange
+        node = OSCPathNode(
+            "/test",
+            access=OSCAccess.READWRITE_VALUE,
+            value=0.5,
+            value_range=OSCRange(0.0, 1.0),
+            clipmode=clipmode,
+        )
+        # Act
+        # Assert
+        if expected is None:
+            with pytest.raises(ValueError):
+                node.validate_values(values)
+            assert node.are_values_valid(values) is False
+        else:
+            assert list(node.validate_values(values)) == expected
+
+    def test_values_checked_against_allowed_values(self):
+        # Arrange
+        node = OSCPathNode(
+            "/test",
+            access=OSCAccess.READWRITE_VALUE,
+            value=[1, "on"],
+            value_range=[None, OSCRange(vals=["on", "off"])],
+        )
+        # Act
+        # Assert
+        assert node.are_values_valid([100, "off"]) is True
+        assert node.are_values_valid([100, "dimmed"]) is False
+
+    def test_clipping_keeps_value_type(self):
+        # Arrange
+        node = OSCPathNode(
+            "/test",
+            access=OSCAccess.READWRITE_VALUE,
+            value=5,
+            value_range=OSCRange(0.0, 10.0),
+            clipmode=OSCClipMode.BOTH,
+        )
+        # Act
+        validated = node.validate_values((12,))
+        # Assert
+        assert validated == [10]
+        assert type(validated[0]) is int
+
+    @pytest.mark.parametrize(
+        "value, expected", [(0, 1), (10, 9), (5, 5)], indirect=False
+    )
+    def test_int_clipped_into_fractional_range(self, value, expected):
+        # Arrange
+        node = OSCPathNode(
+            "/test",
+            access=OSCAccess.READWRITE_VALUE,
+            value=5,
+            value_range=OSCRange(0.5, 9.5),
+            clipmode=OSCClipMode.BOTH,
+        )
+        # Act
+        validated = node.validate_values([value])
+        # Assert
+        assert validated == [expected]
+        assert type(validated[0]) is int
+
+    @pytest.mark.parametrize(
+        "value, value_range",
+        [
+            ("a", OSCRange(0, 1)),
+            (True, OSCRange(maximum=1)),
+            (1.0, OSCRange("a", "b")),
+            (1, OSCRange(0.2, 0.8)),
+        ],
+        indirect=False,
+    )
+    def test_range_incompatible_with_type_raises(self, value, value_range):
+        with pytest.raises(ValueError):
+            OSCPathNode(
+                "/test",
+                access=OSCAccess.READWRITE_VALUE,
+                value=value,
+                value_range=value_range,
+            )
+
+    @pytest.mark.parametrize(
+        "osc_type, value, range_json",
+        [
+            ("T", [True], {"MIN": 0, "MAX": 1}),
+            ("s", ["a"], {"MIN": 0}),
+            ("i", [1], {"MIN": 0.2, "MAX": 0.8}),
+            ("f", [0.5], {"MIN": 1.0, "MAX": 0.0}),
+            ("f", [0.5], {"MIN": 0, "MAX": "a"}),
+        ],
+        indirect=False,
+    )
+    @pytest.mark.parametrize("trusted", [False, True], indirect=False)
+    def test_unenforceable_range_from_json_is_dropped(
+        self, osc_type, value, range_json, trusted
+    ):
+        # Arrange
+        json_data = {
+            "FULL_PATH": "/test",
+            "ACCESS": 3,
+            "TYPE": osc_type,
+            "VALUE": value,
+            "RANGE": [range_json],
+        }
+        # Act
+        node = OSCPathNode.from_json(json_data, trusted=trusted)
+        # Assert
+        assert node.value_range == [None]
+        assert node.validate_values(value) == value
+
+    def test_batch_validation_checks_range(self):
+        # Arrange
+        node = OSCPathNode(
+            "/test",
+            access=OSCAccess.READWRITE_VALUE,
+            value=0.5,
+            value_range=OSCRange(maximum=1.0),
+            clipmode=OSCClipMode.HIGH,
+        )
+        # Act
+        validated = node.validate_batch([[0.5], [1.5], ["wrong"]])
+        # Assert
+        assert validated == [[0.5], [1.0], None]
+
+    @pytest.mark.parametrize(
+        "value_range, clipmode",
+        [
+            ([OSCRange(0, 1)], None),
+            (None, [OSCClipMode.BOTH] * 3),
+        ],
+        indirect=False,
+    )
+    def test_settings_with_wrong_number_of_entries_raise(self, value_range, clipmode):
+        with pytest.raises(ValueError):
+            OSCPathNode(
+                "/test",
+                access=OSCAccess.READWRITE_VALUE,
+                value=[1, 2],
+                value_range=value_range,
+                clipmode=clipmode,
+            )
+
+    def test_minimum_larger_than_maximum_raises(self):
+        with pytest.raises(ValueError):
+            OSCRange(1, 0)
+
+    def test_range_serialization(self):
+        # Arrange
+        node = OSCPathNode(
+            "/test",
+            access=OSCAccess.READWRITE_VALUE,
+            value=[0.5, "a", 1],
+            value_range=[OSCRange(0.0, 1.0), OSCRange(vals=["a", "b"]), None],
+            clipmode=OSCClipMode.LOW,
+        )
+        # Act
+        json_data = json.loads(node.to_json())
+        parsed = OSCPathNode.from_json(json_data)
+        # Assert
+        assert json_data["RANGE"] == [
+            {"MIN": 0.0, "MAX": 1.0},
+            {"VALS": ["a", "b"]},
+            None,
+        ]
+        assert json_data["CLIPMODE"] == ["low", "low", "low"]
+        assert parsed.value_range == node.value_range
+        assert parsed.clipmode == node.clipmode
+
+    def test_node_without_range_serialized_without_range(self):
+        # Arrange
+        node = OSCPathNode("/test", access=OSCAccess.READWRITE_VALUE, value=1)
+        # Act
+        json_data = json.loads(node.to_json())
+        # Assert
+        assert "RANGE" not in json_data
+        assert "CLIPMODE" not in json_data
+        assert node.value_range is None
+
+
+class TestSetValue:
+    def test_set_value_replaces_value_and_bumps_version(self):
+        # Arrange
+        node = OSCPathNode("/test", access=OSCAccess.READWRITE_VALUE, value=[1, "a"])
+        old_value = node.value
+        # Act
+        node.set_value((2, "b"))
+        # Assert
+        assert node.value == [2, "b"]
+        assert old_value == [1, "a"]
+        assert node.version == 1
+        assert node.to_json(OSCQueryAttribute.VALUE) == '{"VALUE": [2, "b"]}'
+
+    @pytest.mark.parametrize("values", [["wrong"], [1, 2]], indirect=False)
+    def test_set_value_with_invalid_values_raises(self, values):
+        # Arrange
+        node = OSCPathNode("/test", access=OSCAccess.READWRITE_VALUE, value=1)
+        # Act
+        # Assert
+        with pytest.raises(TypeError):
+            node.set_value(values)
+        assert node.value == [1]
+        assert node.version == 0
+
+    def test_set_value_copies_blobs(self):
+        # Arrange
+        node = OSCPathNode("/test", access=OSCAccess.READWRITE_VALUE, value=b"")
+        data = bytearray(b"\x01\x02")
+        # Act
+        node.set_value([memoryview(data)])
+        data[0] = 0xFF
+        # Assert
+        assert node.value == [b"\x01\x02"]
+        assert type(node.value[0]) is bytes
+
+
+def address_space_json():
+    address_space = OSCAddressSpace()
+    address_space.add_node(
+        OSCPathNode("/a/int", access=OSCAccess.READWRITE_VALUE, value=[1, "x"])
+    )
+    address_space.add_node(
+        OSCPathNode("/a/other_int", access=OSCAccess.READONLY_VALUE, value=[2, "y"])
+    )
+    address_space.add_node(
+        OSCPathNode(
+            "/b/extended",
+            access=OSCAccess.READWRITE_VALUE,
+            value=[OSCInt64(1), OSCDouble(0.5), b"\x00", [1.0, 2.0]],
+            description="extended",
+        )
+    )
+    address_space.add_node(
+        OSCPathNode(
+            "/b/ranged",
+            access=OSCAccess.READWRITE_VALUE,
+            value=0.5,
+            value_range=OSCRange(0.0, 1.0),
+            clipmode=OSCClipMode.BOTH,
+        )
+    )
+    return json.loads(address_space.root_node.to_json())
+
+
+def node_state(node):
+    """The instance fields of a node, with the ones that can't be compared replaced by their types."""
+    state = dict(vars(node))
+    for name in ("_validator", "_batch_validator", "_version_counter"):
+        state[name] = type(state[name])
+    state["_parent"] = node.parent.full_path if node.parent is not None else None
+    return state
+
+
+class TestFromJson:
+    @pytest.mark.parametrize("trusted", [False, True], indirect=False)
+    def test_node_from_json_round_trip(self, trusted):
+        # Arrange
+        json_data = address_space_json()
+        # Act
+        node = OSCPathNode.from_json(json_data, trusted=trusted)
+        # Assert
+        assert json.loads(node.to_json()) == json_data
+        assert [n.full_path for n in node] == [
+            "/",
+            "/a",
+            "/a/int",
+            "/a/other_int",
+            "/b",
+            "/b/extended",
+            "/b/ranged",
+        ]
+
+    def test_trusted_node_matches_constructed_node(self):
+        # Arrange
+        json_data = address_space_json()
+        # Act
+        nodes = list(OSCPathNode.from_json(json_data))
+        trusted_nodes = list(OSCPathNode.from_json(json_data, trusted=True))
+        # Assert
+        for node, trusted_node in zip(nodes, trusted_nodes):
+            assert trusted_node.attributes == node.attributes
+            assert trusted_node._has_blobs == node._has_blobs
+            assert trusted_node.version == node.version
+            assert node_state(trusted_node) == node_state(node)
+
+    def test_trusted_nodes_validate_values(self):
+        # Arrange
+        root = OSCPathNode.from_json(address_space_json(), trusted=True)
+        int_node = root.find_subnode("/a/int")
+        ranged_node = root.find_subnode("/b/ranged")
+        # Act
+        int_node.set_value([5, "z"])
+        clipped = ranged_node.validate_values([2.0])
+        # Assert
+        assert int_node.value == [5, "z"]
+        assert int_node.version == 1
+        assert clipped == [1.0]
+        assert not int_node.are_values_valid([1.5, "z"])
+        assert int_node._validator is root.find_subnode("/a/other_int")._validator
+
+    def test_deep_tree_from_json(self):
+        # Arrange
+        depth = 5000
+        json_data = {"FULL_PATH": "/", "ACCESS": 0}
+        parent = json_data
+        path = ""
+        for i in range(depth):
+            path += f"/n{i}"
+            child = {"FULL_PATH": path, "ACCESS": 0}
+            parent["CONTENTS"] = {f"n{i}": child}
+            parent = child
+        # Act
+        node = OSCPathNode.from_json(json_data)
+        # Assert
+        levels = 0
+        while node.contents:
+            node = node.contents[0]
+            levels += 1
+        assert levels == depth
+        assert node.full_path == path
+
+    def test_node_from_json_with_contents_and_value_raises(self):
+        # Arrange
+        json_data = {
+            "FULL_PATH": "/test",
+            "VALUE": [1],
+            "TYPE": "i",
+            "ACCESS": 1,
+            "CONTENTS": {"child": {"FULL_PATH": "/test/child", "ACCESS": 0}},
+        }
+        # Act
+        # Assert
+        with pytest.raises(ValueError):
+            OSCPathNode.from_json(json_data)
+
+    def test_trusted_node_from_json_skips_path_validation(self):
+        # Arrange
+        json_data = {"FULL_PATH": "/not valid#", "VALUE": [1], "TYPE": "i", "ACCESS": 1}
+        # Act
+        node = OSCPathNode.from_json(json_data, trusted=True)
+        # Assert
+        assert node.full_path == "/not valid#"
+        with pytest.raises(ValueError):
+            OSCPathNode.from_json(json_data)
+
+
+def digest_address_space() -> OSCAddressSpace:
+    address_space = OSCAddressSpace()
+    for i in range(3):
+        address_space.add_node(
+            OSCPathNode(f"/foo/{i}", value=i, access=OSCAccess.READWRITE_VALUE)
+        )
+    address_space.add_node(
+        OSCPathNode("/bar/baz", value=0.5, access=OSCAccess.READWRITE_VALUE)
+    )
+    return address_space
+
+
+class TestDigest:
+    def test_same_trees_have_same_digest(self):
+        # Arrange
+        address_space = digest_address_space()
+        other = digest_address_space()
+        # Act
+        digest = address_space.root_node.digest
+        other_digest = other.root_node.digest
+        # Assert
+        assert digest == other_digest
+        assert address_space.find_node("/foo").digest != other.find_node("/bar").digest
+
+    @pytest.mark.parametrize("trusted", [False, True], indirect=False)
+    def test_tree_from_json_has_same_digest(self, trusted):
+        # Arrange
+        address_space = digest_address_space()
+        json_data = json.loads(address_space.root_node.to_json())
+        # Act
+        node = OSCPathNode.from_json(json_data, trusted=trusted)
+        # Assert
+        assert node.digest == address_space.root_node.digest
+
+    def test_order_of_child_nodes_does_not_matter(self):
+        # Arrange
+        address_space = digest_address_space()
+        root = address_space.root_node
+        digest = root.digest
+        # Act
+        root.contents.reverse()
+        root._invalidate_digests()
+        # Assert
+        assert root.digest == digest
+
+    def test_set_value_changes_digests_of_ancestors(self):
+        # Arrange
+        address_space = digest_address_space()
+        root_digest = address_space.root_node.digest
+        foo_digest = address_space.find_node("/foo").digest
+        bar_digest = address_space.find_node("/bar").digest
+        node = address_space.find_node("/foo/1")
+        attributes_digest = node.attributes_digest
+        # Act
+        node.set_value([5])
+        # Assert
+        assert address_space.root_node.digest != root_digest
+        assert address_space.find_node("/foo").digest != foo_digest
+        assert address_space.find_node("/bar").digest == bar_digest
+        assert node.attributes_digest != attributes_digest
+
+    def test_setting_the_previous_value_restores_the_digest(self):
+        # Arrange
+        address_space = digest_address_space()
+        digest = address_space.root_node.digest
+        node = address_space.find_node("/foo/1")
+        # Act
+        node.set_value([5])
+        node.set_value([1])
+        # Assert
+        assert address_space.root_node.digest == digest
+
+    def test_adding_and_removing_nodes_changes_digest(self):
+        # Arrange
+        address_space = digest_address_space()
+        digest = address_space.root_node.digest
+        # Act
+        address_space.add_node(
+            OSCPathNode("/foo/new", value=1, access=OSCAccess.READWRITE_VALUE)
+        )
+        added_digest = address_space.root_node.digest
+        removed = address_space.remove_node("/foo/new")
+        # Assert
+        assert added_digest != digest
+        assert address_space.root_node.digest == digest
+        assert removed.parent is None
+
+    def test_value_store_writes_change_digest(self):
+        # Arrange
+        address_space = digest_address_space()
+        store = OSCValueStore("q", use_numpy=False)
+        for i in range(3):
+            store.add_node(address_space.find_node(f"/foo/{i}"))
+        digest = address_space.root_node.digest
+        # Act
+        store.set_values(slice(0, 3), [7, 8, 9])
+        changed_digest = address_space.root_node.digest
+        store.set_values(slice(0, 3), [0, 1, 2])
+        # Assert
+        assert changed_digest != digest
+        assert address_space.root_node.digest == digest
+
+    def test_digest_computed_during_value_store_write_is_discarded(self):
+        # Arrange
+        address_space = digest_address_space()
+        store = OSCValueStore("q", use_numpy=False)
+        for i in range(3):
+            store.add_node(address_space.find_node(f"/foo/{i}"))
+        store.set_values(slice(0, 3), [7, 8, 9])
+        changed_digest = address_space.root_node.digest
+        store.set_values(slice(0, 3), [0, 1, 2])
+        write = store._write
+
+        def write_while_digest_is_computed(index, values):
+            # Like a server thread that computes the digests right before the buffer is written
+            assert address_space.root_node.digest != changed_digest
+            write(index, values)
+
+        store._write = write_while_digest_is_computed
+        # Act
+        store.set_values(slice(0, 3), [7, 8, 9])
+        # Assert
+        assert address_space.root_node.digest == changed_digest
+
+    def test_digest_of_deep_tree(self):
+        # Arrange
+        depth = 3000
+        path = "".join(f"/n{i}" for i in range(depth))
+        address_space = OSCAddressSpace()
+        address_space.add_node(
+            OSCPathNode(path, value=1, access=OSCAccess.READWRITE_VALUE)
+        )
+        # Act
+        digest = address_space.root_node.digest
+        # Assert
+        assert len(digest) == 32
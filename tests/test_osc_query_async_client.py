@@ -0,0 +1,144 @@
+import asyncio
+import json
+import time
+
+from pythonoscquery.osc_query_async_client import AsyncOSCQueryClient
+from pythonoscquery.osc_query_cache import OSCQueryCache
+
+
+async def start_slow_server(delay):
+    """A server that answers every request after the given delay, with a chunked body."""
+    body = json.dumps(
+        {"FULL_PATH": "/slow", "VALUE": [1.0], "TYPE": "f", "ACCESS": 1}
+    ).encode()
+
+    async def handle(reader, writer):
+        while await reader.readuntil(b"\r\n\r\n"):
+            await asyncio.sleep(delay)
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n"
+                + b"%x\r\n%s\r\n" % (10, body[:10])
+                + b"%x\r\n%s\r\n" % (len(body) - 10, body[10:])
+                + b"0\r\n\r\n"
+            )
+            await writer.drain()
+
+    return await asyncio.start_server(handle, "127.0.0.1", 0)
+
+
+class TestAsyncOSCQueryClient:
+    def test_concurrent_queries(self, service_info, server):
+        async def query():
+            async with AsyncOSCQueryClient(
+                service_info(server.http_port), max_connections=3
+            ) as client:
+                host_info = await client.get_host_info()
+                nodes = await asyncio.gather(
+                    *(client.query_node(f"/test/{i % 10}") for i in range(30))
+                )
+                return host_info, nodes, len(client._idle_connections)
+
+        # Arrange
+        # Act
+        host_info, nodes, open_connections = asyncio.run(query())
+        # Assert
+        assert host_info.name == server.server_name
+        assert host_info.osc_port == server.osc_port
+        assert [node.value for node in nodes] == [[i % 10] for i in range(30)]
+        assert open_connections <= 3
+
+    def test_missing_node_returns_none(self, service_info, server):
+        async def query():
+            async with AsyncOSCQueryClient(service_info(server.http_port)) as client:
+                return await client.query_node("/bogus")
+
+        # Arrange
+        # Act
+        node = asyncio.run(query())
+        # Assert
+        assert node is None
+
+    def test_sweep_of_slow_services_runs_concurrently(self, service_info):
+        async def sweep():
+            servers = [await start_slow_server(0.2) for _ in range(10)]
+            clients = [
+                AsyncOSCQueryClient(service_info(s.sockets[0].getsockname()[1]))
+                for s in servers
+            ]
+            start = time.monotonic()
+            nodes = await asyncio.gather(
+                *(client.query_node("/slow") for client in clients)
+            )
+            duration = time.monotonic() - start
+            for client in clients:
+                await client.close()
+            for s in servers:
+                s.close()
+            return nodes, duration
+
+        # Arrange
+        # Act
+        nodes, duration = asyncio.run(sweep())
+        # Assert
+        assert [node.value for node in nodes] == [[1.0]] * 10
+        assert duration < 1.0
+
+    def test_shared_limit_bounds_concurrent_queries(self, service_info):
+        async def sweep():
+            limit = asyncio.Semaphore(2)
+            servers = [await start_slow_server(0.1) for _ in range(4)]
+            clients = [
+                AsyncOSCQueryClient(
+                    service_info(s.sockets[0].getsockname()[1]), limit=limit
+                )
+                for s in servers
+            ]
+            start = time.monotonic()
+            await asyncio.gather(*(client.query_node("/slow") for client in clients))
+            duration = time.monotonic() - start
+            for client in clients:
+                await client.close()
+            for s in servers:
+                s.close()
+            return duration
+
+        # Arrange
+        # Act
+        duration = asyncio.run(sweep())
+        # Assert
+        assert duration >= 0.2
+
+    def test_deadline_exceeded_returns_none(self, service_info):
+        async def query():
+            slow_server = await start_slow_server(5.0)
+            port = slow_server.sockets[0].getsockname()[1]
+            start = time.monotonic()
+            async with AsyncOSCQueryClient(service_info(port), timeout=5.0) as client:
+                node = await client.query_node("/slow", timeout=0.2)
+            duration = time.monotonic() - start
+            slow_server.close()
+            return node, duration
+
+        # Arrange
+        # Act
+        node, duration = asyncio.run(query())
+        # Assert
+        assert node is None
+        assert duration < 1.0
+
+    def test_cached_node_is_revalidated(self, service_info, server):
+        async def query(cache):
+            async with AsyncOSCQueryClient(
+                service_info(server.http_port), cache=cache
+            ) as client:
+                first = await client.query_node("/test/4")
+                cached = await client.query_node("/test/4")
+                return first, cached, await client._get("/test/4", None)
+
+        # Arrange
+        cache = OSCQueryCache(ttl=0.0)
+        # Act
+        first, cached, (_, headers, _) = asyncio.run(query(cache))
+        # Assert
+        assert cached is first
+        assert "etag" in headers
@@ -0,0 +1,249 @@
+import time
+
+import pytest
+
+from pythonoscquery.osc_query_browser import OSCQueryBrowser
+from pythonoscquery.osc_query_path_index import OSCQueryPathIndex
+from pythonoscquery.shared.osc_access import OSCAccess
+from pythonoscquery.shared.osc_address_space import OSCAddressSpace
+from pythonoscquery.shared.osc_path_node import OSCPathNode
+
+OSCJSON_TYPE = "_oscjson._tcp.local."
+
+
+@pytest.fixture(scope="module")
+def served_address_space():
+    address_space = OSCAddressSpace()
+    address_space.add_node(
+        OSCPathNode("/test/value", value=1, access=OSCAccess.READWRITE_VALUE)
+    )
+    return address_space
+
+
+@pytest.fixture(scope="module")
+def server_name(server):
+    """The zeroconf service name of the server."""
+    return f"{server.server_name}.{OSCJSON_TYPE}"
+
+
+@pytest.fixture
+def browser():
+    browser = OSCQueryBrowser()
+    yield browser
+    browser.close()
+
+
+@pytest.fixture
+def discover(browser, service_info):
+    """Let the browser know the services on the given ports, without waiting for zeroconf."""
+
+    def add(*ports: int):
+        for port in ports:
+            info = service_info(port)
+            browser.listener.oscjson_services[info.name] = info
+
+    return add
+
+
+class TestFindNodesByEndpointAddress:
+    def test_node_is_found(self, discover, server, browser):
+        # Arrange
+        discover(server.http_port)
+        # Act
+        results = browser.find_nodes_by_endpoint_address("/test/value")
+        # Assert
+        assert len(results) == 1
+        svc, host_info, node = results[0]
+        assert svc.port == server.http_port
+        assert host_info.name == server.server_name
+        assert node.value == [1]
+
+    def test_missing_node_is_not_found(self, discover, server, browser):
+        # Arrange
+        discover(server.http_port)
+        # Act
+        results = browser.find_nodes_by_endpoint_address("/bogus")
+        # Assert
+        assert results == []
+
+    def test_unresponsive_services_are_queried_in_parallel(
+        self, discover, server, browser, unresponsive_ports
+    ):
+        # Arrange
+        discover(*unresponsive_ports, server.http_port)
+        start = time.monotonic()
+        # Act
+        results = browser.find_nodes_by_endpoint_address("/test/value", timeout=0.5)
+        duration = time.monotonic() - start
+        # Assert
+        assert [svc.port for svc, _, _ in results] == [server.http_port]
+        assert duration < 1.5
+
+    def test_results_are_yielded_as_they_arrive(
+        self, discover, server, browser, unresponsive_ports
+    ):
+        # Arrange
+        discover(*unresponsive_ports, server.http_port)
+        start = time.monotonic()
+        # Act
+        results = browser.iter_nodes_by_endpoint_address("/test/value", timeout=2.0)
+        svc, _, _ = next(results)
+        duration = time.monotonic() - start
+        results.close()
+        # Assert
+        assert svc.port == server.http_port
+        assert duration < 1.0
+
+
+class TestOSCQueryListener:
+    def test_host_info_and_client_are_cached(
+        self, service_info, discover, server, browser
+    ):
+        # Arrange
+        discover(server.http_port)
+        name = service_info(server.http_port).name
+        # Act
+        host_info = browser.listener.get_host_info(name)
+        client = browser.listener.get_client(name)
+        # Assert
+        assert host_info.name == server.server_name
+        assert browser.listener.get_host_info(name) is host_info
+        assert browser.listener.get_client(name) is client
+        assert browser.find_service_by_name(server.server_name).port == server.http_port
+
+    @pytest.mark.parametrize("event", ["update", "remove"], indirect=False)
+    def test_cache_is_invalidated_by_zeroconf_events(self, server_name, browser, event):
+        # Arrange
+        name = server_name
+        listener = browser.listener
+        listener.add_service(browser.zc, OSCJSON_TYPE, name)
+        listener.wait_until_resolved(5.0)
+        host_info = listener.get_host_info(name)
+        client = listener.get_client(name)
+        # Act
+        if event == "update":
+            listener.update_service(browser.zc, OSCJSON_TYPE, name)
+            listener.wait_until_resolved(5.0)
+        else:
+            listener.remove_service(browser.zc, OSCJSON_TYPE, name)
+        # Assert
+        assert host_info is not None
+        if event == "update":
+            assert listener.get_host_info(name) is not host_info
+            assert listener.get_client(name) is not client
+        else:
+            assert listener.get_host_info(name) is None
+            assert listener.get_client(name) is None
+
+    def test_unknown_service_has_no_host_info(self, browser):
+        # Act
+        host_info = browser.listener.get_host_info("Unknown._oscjson._tcp.local.")
+        # Assert
+        assert host_info is None
+
+
+class TestDiscovery:
+    def test_advertised_service_is_resolved(self, server_name, server, browser):
+        # Act
+        deadline = time.monotonic() + 5.0
+        while (
+            server_name not in browser.listener.oscjson_services
+            and time.monotonic() < deadline
+        ):
+            time.sleep(0.05)
+        # Assert
+        assert browser.listener.oscjson_services[server_name].port == server.http_port
+
+    def test_resolution_does_not_block_the_zeroconf_thread(self, browser):
+        # Arrange
+        listener = browser.listener
+        names = [f"Missing {i}._oscjson._tcp.local." for i in range(5)]
+        start = time.monotonic()
+        # Act
+        for name in names:
+            listener.add_service(browser.zc, OSCJSON_TYPE, name)
+        duration = time.monotonic() - start
+        resolved = listener.wait_until_resolved(0.1)
+        for name in names:
+            listener.remove_service(browser.zc, OSCJSON_TYPE, name)
+        # Assert
+        assert duration < 0.5
+        assert resolved is False
+        assert listener.wait_until_resolved(0.1) is True
+        assert not set(names) & set(listener.oscjson_services)
+
+
+class TestOSCQueryPathIndex:
+    def test_services_are_found_by_address(
+        self, service_info, discover, server, browser, served_address_space
+    ):
+        # Arrange
+        discover(server.http_port)
+        index = OSCQueryPathIndex(browser.listener)
+        # Act
+        index.start()
+        indexed = index.wait_until_indexed(5.0)
+        services = index.find_services("/test/value")
+        missing = index.find_services("/bogus")
+        index.stop()
+        # Assert
+        assert indexed is True
+        assert service_info(server.http_port).name in [svc.name for svc in services]
+        assert missing == []
+        assert index.is_indexed(service_info(server.http_port).name)
+
+    def test_changed_address_space_is_reindexed(
+        self, service_info, discover, server, browser, served_address_space
+    ):
+        # Arrange
+        discover(server.http_port)
+        name = service_info(server.http_port).name
+        index = OSCQueryPathIndex(browser.listener)
+        index.refresh(name)
+        served_address_space.add_node(
+            OSCPathNode("/test/added", value=1, access=OSCAccess.READWRITE_VALUE)
+        )
+        # Act
+        index.refresh(name)
+        found = index.find_services("/test/added")
+        served_address_space.remove_node("/test/added")
+        index.refresh(name)
+        # Assert
+        assert [svc.port for svc in found] == [server.http_port]
+        assert index.find_services("/test/added") == []
+
+    def test_removed_service_is_removed_from_index(
+        self, service_info, discover, server, browser
+    ):
+        # Arrange
+        discover(server.http_port)
+        name = service_info(server.http_port).name
+        index = OSCQueryPathIndex(browser.listener)
+        index.start()
+        index.wait_until_indexed(5.0)
+        # Act
+        browser.listener.remove_service(browser.zc, OSCJSON_TYPE, name)
+        index.wait_until_indexed(5.0)
+        index.stop()
+        # Assert
+        assert name not in [svc.name for svc in index.find_services("/test/value")]
+        assert not index.is_indexed(name)
+
+    def test_lookup_skips_services_indexed_without_the_address(
+        self, service_info, discover, server, browser, unresponsive_ports
+    ):
+        # Arrange
+        browser.path_index = OSCQueryPathIndex(browser.listener)
+        discover(server.http_port, *unresponsive_ports)
+        browser.path_index.refresh(service_info(server.http_port).name)
+        for port in unresponsive_ports:
+            browser.path_index._set_paths(
+                service_info(port).name, frozenset({"/", "/other"}), None
+            )
+        start = time.monotonic()
+        # Act
+        results = browser.find_nodes_by_endpoint_address("/test/value", timeout=2.0)
+        duration = time.monotonic() - start
+        # Assert
+        assert server.http_port in [svc.port for svc, _, _ in results]
+        assert duration < 1.0
@@ -0,0 +1,68 @@
+import pytest
+
+from pythonoscquery.osc_query_cache import OSCQueryCache
+from pythonoscquery.shared.osc_path_node import OSCPathNode
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def put(cache, query_root, path):
+    return cache.put(query_root, path, OSCPathNode(path), {}, None)
+
+
+class TestOSCQueryCache:
+    def test_least_recently_used_entry_is_evicted(self):
+        # Arrange
+        cache = OSCQueryCache(max_entries=2)
+        put(cache, "http://a", "/x")
+        put(cache, "http://a", "/y")
+        cache.get("http://a", "/x")
+        # Act
+        put(cache, "http://a", "/z")
+        # Assert
+        assert len(cache) == 2
+        assert cache.get("http://a", "/y") is None
+        assert cache.get("http://a", "/x") is not None
+        assert cache.get("http://a", "/z") is not None
+
+    def test_entries_expire_after_ttl(self):
+        # Arrange
+        clock = FakeClock()
+        cache = OSCQueryCache(ttl=5.0, clock=clock)
+        entry = put(cache, "http://a", "/x")
+        # Act
+        clock.now = 4.0
+        fresh = cache.is_fresh(entry)
+        clock.now = 5.0
+        expired = not cache.is_fresh(entry)
+        cache.refresh(entry)
+        refreshed = cache.is_fresh(entry)
+        # Assert
+        assert fresh and expired and refreshed
+
+    def test_entries_are_keyed_by_service(self):
+        # Arrange
+        cache = OSCQueryCache()
+        put(cache, "http://a", "/x")
+        put(cache, "http://a", "/y")
+        put(cache, "http://b", "/x")
+        # Act
+        cache.invalidate("http://a")
+        # Assert
+        assert cache.get("http://a", "/x") is None
+        assert cache.get("http://a", "/y") is None
+        assert cache.get("http://b", "/x") is not None
+
+    @pytest.mark.parametrize("max_entries", [0, -1], indirect=False)
+    def test_invalid_size_raises(self, max_entries):
+        # Arrange
+        # Act
+        # Assert
+        with pytest.raises(ValueError):
+            OSCQueryCache(max_entries=max_entries)
@@ -0,0 +1,242 @@
+import time
+
+import pytest
+
+from pythonoscquery.osc_query_cache import OSCQueryCache
+from pythonoscquery.osc_query_client import OSCQueryClient
+from pythonoscquery.shared.osc_access import OSCAccess
+from pythonoscquery.shared.osc_address_space import OSCAddressSpace
+from pythonoscquery.shared.osc_digest import OSCNodeChange
+from pythonoscquery.shared.osc_path_node import OSCPathNode
+
+
+@pytest.fixture(scope="module")
+def digest_server(start_service):
+    address_space = OSCAddressSpace()
+    for i in range(10):
+        for j in range(10):
+            address_space.add_node(
+                OSCPathNode(
+                    f"/c{i}/c{j}/value", value=j, access=OSCAccess.READWRITE_VALUE
+                )
+            )
+    return start_service(address_space, "Unit test digest server")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestOSCQueryClient:
+    def test_queries_reuse_connection(self, service_info, server):
+        # Arrange
+        with OSCQueryClient(service_info(server.http_port)) as client:
+            # Act
+            host_info = client.get_host_info()
+            nodes = [client.query_node(f"/test/{i}") for i in range(10)]
+            pools = client._session.get_adapter(
+                f"http://127.0.0.1:{server.http_port}"
+            ).poolmanager.pools
+            connections = [pools[key].num_connections for key in pools.keys()]
+            # Assert
+            assert host_info.name == server.server_name
+            assert [node.value for node in nodes] == [[i] for i in range(10)]
+            assert connections == [1]
+
+    def test_missing_node_returns_none(self, service_info, server):
+        # Arrange
+        with OSCQueryClient(service_info(server.http_port)) as client:
+            # Act
+            node = client.query_node("/bogus")
+            # Assert
+            assert node is None
+
+    def test_unresponsive_service_times_out(self, service_info, unresponsive_port):
+        # Arrange
+        client = OSCQueryClient(
+            service_info(unresponsive_port), timeout=(0.5, 0.2), retries=1
+        )
+        start = time.monotonic()
+        # Act
+        node = client.query_node("/")
+        host_info = client.get_host_info()
+        # Assert
+        assert node is None
+        assert host_info is None
+        assert time.monotonic() - start < 5
+        client.close()
+
+
+class TestOSCQueryStreaming:
+    def test_streamed_node_matches_query(self, service_info, server):
+        # Arrange
+        with OSCQueryClient(service_info(server.http_port)) as client:
+            completed = []
+            # Act
+            node = client.query_node_streaming(
+                "/", on_node=completed.append, chunk_size=16
+            )
+            expected = client.query_node("/")
+        # Assert
+        assert node.to_json() == expected.to_json()
+        assert completed[-1] is node
+        assert len(completed) == 12
+
+    def test_streamed_node_with_path_filter(self, service_info, server):
+        # Arrange
+        with OSCQueryClient(service_info(server.http_port)) as client:
+            # Act
+            node = client.query_node_streaming("/", path_filter="/test/3", trusted=True)
+            missing = client.query_node_streaming("/bogus")
+        # Assert
+        assert node.full_path == "/test/3"
+        assert node.value == [3]
+        assert missing is None
+
+
+class TestOSCQueryLazyNode:
+    def test_child_nodes_are_queried_on_access(self, service_info, server):
+        # Arrange
+        with OSCQueryClient(service_info(server.http_port)) as client:
+            # Act
+            root = client.query_lazy_node("/")
+            test_node = root.contents[0]
+            loaded_before_access = test_node.is_loaded
+            found = root.find_subnode("/test/5")
+            # Assert
+            assert root.is_loaded
+            assert test_node.full_path == "/test"
+            assert not loaded_before_access
+            assert test_node.is_loaded
+            assert found.value == [5]
+            assert [node.full_path for node in root] == ["/", "/test"] + [
+                f"/test/{i}" for i in range(10)
+            ]
+
+    def test_missing_node_returns_none(self, service_info, server):
+        # Arrange
+        with OSCQueryClient(service_info(server.http_port)) as client:
+            # Act
+            node = client.query_lazy_node("/bogus")
+            # Assert
+            assert node is None
+
+
+class TestOSCQueryClientCache:
+    def test_fresh_entry_is_used_without_query(self, service_info, server):
+        # Arrange
+        cache = OSCQueryCache(ttl=10.0, clock=FakeClock())
+        with OSCQueryClient(service_info(server.http_port), cache=cache) as client:
+            first = client.query_node("/test/1")
+            client._session.close()
+            client._get = None
+            # Act
+            second = client.query_node("/test/1")
+        # Assert
+        assert second is first
+        assert len(cache) == 1
+
+    def test_unchanged_node_is_reused_after_revalidation(self, service_info, server):
+        # Arrange
+        clock = FakeClock()
+        cache = OSCQueryCache(ttl=1.0, clock=clock)
+        with OSCQueryClient(service_info(server.http_port), cache=cache) as client:
+            first = client.query_node("/test/2")
+            clock.now = 2.0
+            responses = []
+            get = client._get
+            client._get = lambda url, headers=None: (
+                responses.append(get(url, headers)) or responses[-1]
+            )
+            # Act
+            second = client.query_node("/test/2")
+        # Assert
+        assert second is first
+        assert responses[0].status_code == 304
+        assert responses[0].content == b""
+        assert cache.is_fresh(cache.get(client._get_query_root(), "/test/2"))
+
+    def test_changed_node_is_queried_again(self, service_info, server):
+        # Arrange
+        clock = FakeClock()
+        cache = OSCQueryCache(ttl=1.0, clock=clock)
+        node = server._address_space.find_node("/test/3")
+        with OSCQueryClient(service_info(server.http_port), cache=cache) as client:
+            first = client.query_node("/test/3")
+            clock.now = 2.0
+            node.set_value([33])
+            # Act
+            second = client.query_node("/test/3")
+            node.set_value([3])
+        # Assert
+        assert second is not first
+        assert second.value == [33]
+
+    def test_missing_node_is_removed_from_cache(self, service_info, server):
+        # Arrange
+        clock = FakeClock()
+        cache = OSCQueryCache(ttl=1.0, clock=clock)
+        query_root = f"http://127.0.0.1:{server.http_port}"
+        cache.put(query_root, "/bogus", OSCPathNode("/bogus"), {}, '"stale"')
+        clock.now = 2.0
+        with OSCQueryClient(service_info(server.http_port), cache=cache) as client:
+            # Act
+            node = client.query_node("/bogus")
+        # Assert
+        assert node is None
+        assert cache.get(query_root, "/bogus") is None
+
+
+class TestOSCQueryDiff:
+    def test_diff_queries_only_changed_branches(self, service_info, digest_server):
+        # Arrange
+        with OSCQueryClient(service_info(digest_server.http_port)) as client:
+            local_root = client.query_node("/")
+            local_root.find_subnode("/c2/c3/value").set_value([100])
+            queried = []
+            get_json = client._get_json
+
+            def recording_get_json(path):
+                queried.append(path)
+                return get_json(path)
+
+            client._get_json = recording_get_json
+            # Act
+            changes = client.diff(local_root)
+        # Assert
+        assert changes == [(OSCNodeChange.CHANGED, "/c2/c3/value")]
+        assert queried == [
+            "/?DIGEST",
+            "/c2?DIGEST",
+            "/c2/c3?DIGEST",
+            "/c2/c3/value?DIGEST",
+        ]
+
+    def test_diff_without_digest_extension(self, service_info, digest_server):
+        # Arrange
+        with OSCQueryClient(service_info(digest_server.http_port)) as client:
+            local_root = client.query_node("/")
+            local_root.find_subnode("/c2/c3/value").set_value([100])
+            client._extensions = {}
+            # Act
+            changes = client.diff(local_root)
+        # Assert
+        assert changes == [(OSCNodeChange.CHANGED, "/c2/c3/value")]
+
+    def test_diff_with_unresponsive_service_returns_none(
+        self, service_info, unresponsive_port
+    ):
+        # Arrange
+        local_root = OSCAddressSpace().root_node
+        with OSCQueryClient(
+            service_info(unresponsive_port), timeout=0.2, retries=0
+        ) as client:
+            client._extensions = {"DIGEST": True}
+            # Act
+            changes = client.diff(local_root)
+        # Assert
+        assert changes is None
@@ -0,0 +1,157 @@
+import socket
+import time
+
+import pytest
+
+from pythonoscquery.osc_query_mirror import OSCMirrorChange, OSCQueryMirror
+from pythonoscquery.shared.osc_access import OSCAccess
+from pythonoscquery.shared.osc_address_space import OSCAddressSpace
+from pythonoscquery.shared.osc_path_node import OSCPathNode
+
+
+@pytest.fixture(scope="module")
+def served_address_space():
+    return OSCAddressSpace()
+
+
+@pytest.fixture
+def mirror(service_info, server):
+    mirror = OSCQueryMirror(service_info(server.http_port), interval=0.05)
+    changes = []
+    mirror.add_listener(lambda change, node: changes.append((change, node.full_path)))
+    mirror.changes = changes
+    yield mirror
+    mirror.close()
+
+
+def add(address_space, path, value=1):
+    address_space.add_node(
+        OSCPathNode(path, value=value, access=OSCAccess.READWRITE_VALUE)
+    )
+
+
+class TestOSCQueryMirror:
+    def test_changes_are_applied(self, mirror, served_address_space):
+        # Arrange
+        add(served_address_space, "/changes/a")
+        add(served_address_space, "/changes/b/c")
+        mirror.refresh()
+        local_a = mirror.find_node("/changes/a")
+        mirror.changes.clear()
+        # Act
+        served_address_space.find_node("/changes/a").set_value([2])
+        served_address_space.remove_node("/changes/b")
+        add(served_address_space, "/changes/d", "text")
+        mirror.refresh()
+        # Assert
+        assert mirror.find_node("/changes/a") is local_a
+        assert local_a.value == [2]
+        assert mirror.find_node("/changes/b") is None
+        assert mirror.find_node("/changes/b/c") is None
+        assert mirror.find_node("/changes/d").value == ["text"]
+        assert mirror.changes == [
+            (OSCMirrorChange.ADDED, "/changes/d"),
+            (OSCMirrorChange.REMOVED, "/changes/b"),
+            (OSCMirrorChange.VALUE, "/changes/a"),
+        ]
+
+    def test_only_changed_nodes_are_queried(self, mirror, served_address_space, mocker):
+        # Arrange
+        add(served_address_space, "/queried/a")
+        add(served_address_space, "/queried/b")
+        mirror.refresh()
+        query_node = mocker.spy(mirror._client, "query_node")
+        # Act
+        served_address_space.find_node("/queried/b").set_value([2])
+        mirror.refresh()
+        # Assert
+        assert [call.args for call in query_node.call_args_list] == [("/queried/b",)]
+        assert mirror.find_node("/queried/b").value == [2]
+        assert mirror.address_space.root_node.digest == (
+            served_address_space.root_node.digest
+        )
+
+    def test_changes_are_applied_without_digests(
+        self, mirror, served_address_space, monkeypatch
+    ):
+        # Arrange
+        monkeypatch.setattr(mirror._client, "supports_extension", lambda _: False)
+        add(served_address_space, "/full/a")
+        mirror.refresh()
+        mirror.changes.clear()
+        # Act
+        served_address_space.find_node("/full/a").set_value([2])
+        add(served_address_space, "/full/b")
+        mirror.refresh()
+        # Assert
+        assert mirror.find_node("/full/a").value == [2]
+        assert mirror.changes == [
+            (OSCMirrorChange.VALUE, "/full/a"),
+            (OSCMirrorChange.ADDED, "/full/b"),
+        ]
+
+    def test_changed_definition_replaces_node(self, mirror, served_address_space):
+        # Arrange
+        add(served_address_space, "/definition/a")
+        mirror.refresh()
+        old_node = mirror.find_node("/definition/a")
+        # Act
+        served_address_space.remove_node("/definition/a")
+        add(served_address_space, "/definition/a", 1.5)
+        mirror.refresh()
+        # Assert
+        new_node = mirror.find_node("/definition/a")
+        assert new_node is not old_node
+        assert new_node.type == [float]
+
+    def test_unchanged_address_space_is_not_reapplied(
+        self, mirror, served_address_space
+    ):
+        # Arrange
+        mirror.refresh()
+        remote_root = mirror._remote_root
+        mirror.changes.clear()
+        # Act
+        refreshed = mirror.refresh()
+        # Assert
+        assert refreshed
+        assert mirror._remote_root is remote_root
+        assert mirror.changes == []
+        assert mirror.staleness < 1.0
+
+    def test_background_refresh(self, mirror, served_address_space):
+        # Arrange
+        mirror.start()
+        # Act
+        add(served_address_space, "/background/a")
+        deadline = time.monotonic() + 5.0
+        while mirror.find_node("/background/a") is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        mirror.stop()
+        # Assert
+        assert mirror.find_node("/background/a") is not None
+
+    def test_bounded_staleness_refreshes(self, mirror, served_address_space):
+        # Arrange
+        mirror.refresh()
+        add(served_address_space, "/stale/a")
+        # Act
+        stale = mirror.find_node("/stale/a", max_staleness=60.0)
+        time.sleep(0.02)
+        fresh = mirror.find_node("/stale/a", max_staleness=0.01)
+        # Assert
+        assert stale is None
+        assert fresh is not None
+
+    def test_unreachable_service(self, service_info):
+        # Arrange
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.bind(("127.0.0.1", 0))
+        port = listener.getsockname()[1]
+        listener.close()
+        # Act
+        with OSCQueryMirror(service_info(port), timeout=0.5) as mirror:
+            refreshed = mirror.refresh()
+        # Assert
+        assert not refreshed
+        assert mirror.staleness == float("inf")
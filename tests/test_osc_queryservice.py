@@ -1,12 +1,21 @@
+import socket
+import threading
 from ipaddress import IPv4Address
 
 import pytest
 import urllib3
 
-from pythonoscquery.osc_query_service import OSCQueryService
+from pythonoscquery.osc_query_service import (
+    OSCQueryHTTPHandler,
+    OSCQueryHTTPServer,
+    OSCQueryService,
+)
 from pythonoscquery.shared.osc_access import OSCAccess
 from pythonoscquery.shared.osc_address_space import OSCAddressSpace
+from pythonoscquery.shared.osc_host_info import OSCHostInfo
+from pythonoscquery.shared.osc_metrics import OSCMetrics
 from pythonoscquery.shared.osc_path_node import OSCPathNode
+from pythonoscquery.shared.osc_range import OSCClipMode, OSCRange
 
 
 @pytest.fixture
@@ -144,3 +153,117 @@ class TestOSCQueryService:
         status = response.status
         # Assert 7
         assert status == 204
+
+        # Act 8 - Metrics are not served when not configured
+        response = urllib3.request("GET", "http://127.0.0.1:8080/?METRICS")
+        status = response.status
+        # Assert 8
+        assert status == 400
+
+        # Arrange 9 - RANGE and CLIPMODE are served
+        address_space.add_node(
+            OSCPathNode(
+                "/ranged",
+                value=[0.5, "a"],
+                access=OSCAccess.READWRITE_VALUE,
+                value_range=[OSCRange(0.0, 1.0), OSCRange(vals=["a", "b"])],
+                clipmode=[OSCClipMode.BOTH, OSCClipMode.NONE],
+            )
+        )
+        # Act 9
+        response = urllib3.request("GET", "http://127.0.0.1:8080/ranged?RANGE")
+        range_json = response.json()
+        response = urllib3.request("GET", "http://127.0.0.1:8080/ranged?CLIPMODE")
+        clipmode_json = response.json()
+        response = urllib3.request("GET", "http://127.0.0.1:8080/?HOST_INFO")
+        extensions = response.json()["EXTENSIONS"]
+        # Assert 9
+        assert range_json == {"RANGE": [{"MIN": 0.0, "MAX": 1.0}, {"VALS": ["a", "b"]}]}
+        assert clipmode_json == {"CLIPMODE": ["both", "none"]}
+        assert extensions["RANGE"] is True
+        assert extensions["CLIPMODE"] is True
+
+        # Act 10 - DEPTH limits the levels of child nodes
+        response = urllib3.request("GET", "http://127.0.0.1:8080/?DEPTH=0")
+        depth_json = response.json()
+        response = urllib3.request("GET", "http://127.0.0.1:8080/?DEPTH=-1")
+        invalid_depth_status = response.status
+        # Assert 10
+        assert "CONTENTS" not in depth_json
+        assert invalid_depth_status == 400
+        assert extensions["DEPTH"] is True
+
+        # Act 11 - DIGEST serves the digests of the node and its child nodes
+        response = urllib3.request("GET", "http://127.0.0.1:8080/?DIGEST")
+        digest_json = response.json()
+        response = urllib3.request("GET", "http://127.0.0.1:8080/")
+        etag = response.headers["ETag"]
+        response = urllib3.request(
+            "GET", "http://127.0.0.1:8080/", headers={"If-None-Match": etag}
+        )
+        not_modified_status = response.status
+        address_space.find_node("/ranged").value[0] = 0.25
+        response = urllib3.request(
+            "GET", "http://127.0.0.1:8080/", headers={"If-None-Match": etag}
+        )
+        changed_in_place_status = response.status
+        # Assert 11
+        assert digest_json["DIGEST"] == address_space.root_node.digest
+        assert digest_json["CONTENTS"]["ranged"] == (
+            address_space.find_node("/ranged").digest
+        )
+        assert not_modified_status == 304
+        assert changed_in_place_status == 200
+        assert extensions["DIGEST"] is True
+
+    def test_idle_connection_is_closed(self, address_space, monkeypatch):
+        # Arrange
+        monkeypatch.setattr(OSCQueryHTTPHandler, "timeout", 0.2)
+        host_info = OSCHostInfo("Unit test idle server", {}, "127.0.0.1", 0, "UDP")
+        http_server = OSCQueryHTTPServer(
+            address_space, host_info, ("127.0.0.1", 0), OSCQueryHTTPHandler
+        )
+        threading.Thread(target=http_server.serve_forever, daemon=True).start()
+        connection = socket.create_connection(http_server.server_address, timeout=5.0)
+        connection.sendall(b"GET /?HOST_INFO HTTP/1.1\r\nHost: 127.0.0.1\r\n\r\n")
+        # Act
+        received = b""
+        while chunk := connection.recv(4096):
+            received += chunk
+        connection.close()
+        http_server.shutdown()
+        http_server.server_close()
+        # Assert
+        assert received.startswith(b"HTTP/1.1 200")
+
+    def test_query_metrics(self, address_space, simple_node):
+        # Arrange
+        metrics = OSCMetrics()
+        OSCQueryService(
+            address_space,
+            "Unit test metrics server",
+            8081,
+            8081,
+            IPv4Address("127.0.0.1"),
+            metrics=metrics,
+        )
+        address_space.add_node(simple_node)
+        metrics.for_node("/test").record_accepted()
+
+        # Act 1
+        response = urllib3.request("GET", "http://127.0.0.1:8081/?HOST_INFO")
+        # Assert 1
+        assert response.json()["EXTENSIONS"]["METRICS"] is True
+
+        # Act 2
+        response = urllib3.request("GET", "http://127.0.0.1:8081/test?METRICS")
+        json = response.json()
+        # Assert 2
+        assert response.status == 200
+        assert json["METRICS"]["/test"]["accepted"] == 1
+        assert json["METRICS"]["/test"]["rejected"] == 0
+
+        # Act 3
+        response = urllib3.request("GET", "http://127.0.0.1:8081/bogus?METRICS")
+        # Assert 3
+        assert response.status == 404
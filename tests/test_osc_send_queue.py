@@ -0,0 +1,213 @@
+import threading
+
+import pytest
+
+from pythonoscquery.shared.osc_send_queue import (
+    OSCClientSendQueue,
+    OSCPushFanout,
+    OverflowPolicy,
+)
+
+
+class BlockingSink:
+    """Send function that blocks until released, to simulate a stalled client."""
+
+    def __init__(self):
+        self.received = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self, path, payload):
+        self.started.set()
+        self.release.wait(5)
+        self.received.append((path, payload))
+
+
+@pytest.fixture
+def sink():
+    sink = BlockingSink()
+    yield sink
+    sink.release.set()
+
+
+def stall(queue, sink):
+    """Push one message that is taken by the writer thread and blocks it."""
+    queue.push("/stall", 0)
+    assert sink.started.wait(5)
+
+
+class TestOSCClientSendQueue:
+    def test_messages_are_sent_in_order(self):
+        # Arrange
+        received = []
+        done = threading.Event()
+
+        def send(path, payload):
+            received.append((path, payload))
+            if len(received) == 3:
+                done.set()
+
+        queue = OSCClientSendQueue(send)
+        # Act
+        for i in range(3):
+            queue.push(f"/test/{i}", i)
+        # Assert
+        assert done.wait(5)
+        assert received == [("/test/0", 0), ("/test/1", 1), ("/test/2", 2)]
+        queue.close()
+
+    def test_drop_oldest_keeps_queue_bounded(self, sink):
+        # Arrange
+        queue = OSCClientSendQueue(sink, max_size=2)
+        stall(queue, sink)
+        # Act
+        for i in range(5):
+            assert queue.push("/test", i)
+        # Assert
+        assert queue.depth == 2
+        assert queue.dropped == 3
+        sink.release.set()
+        queue.close()
+
+    def test_coalesce_by_path_keeps_latest_payload(self, sink):
+        # Arrange
+        queue = OSCClientSendQueue(
+            sink, max_size=2, policy=OverflowPolicy.COALESCE_BY_PATH
+        )
+        stall(queue, sink)
+        # Act
+        for i in range(5):
+            queue.push("/a", i)
+        queue.push("/b", "b")
+        # Assert
+        assert queue.depth == 2
+        assert queue.coalesced == 4
+        assert queue.dropped == 0
+        assert list(queue._queue) == [["/a", 4], ["/b", "b"]]
+        sink.release.set()
+        queue.close()
+
+    def test_disconnect_policy_closes_queue_on_overflow(self, sink):
+        # Arrange
+        disconnected = []
+        queue = OSCClientSendQueue(
+            sink,
+            max_size=1,
+            policy=OverflowPolicy.DISCONNECT,
+            on_disconnect=disconnected.append,
+        )
+        stall(queue, sink)
+        # Act
+        assert queue.push("/test", 1)
+        result = queue.push("/test", 2)
+        # Assert
+        assert result is False
+        assert not queue.is_connected
+        assert disconnected == [queue]
+        assert queue.push("/test", 3) is False
+
+    @pytest.mark.parametrize("cause", ["overflow", "close"], indirect=False)
+    def test_disconnect_callback_runs_without_queue_lock(self, sink, cause):
+        # Arrange
+        pushed = []
+
+        def on_disconnect(queue):
+            # Another thread that uses the queue must not wait for the lock
+            thread = threading.Thread(target=lambda: pushed.append(queue.push("/x", 0)))
+            thread.start()
+            thread.join(5)
+
+        queue = OSCClientSendQueue(
+            sink,
+            max_size=1,
+            policy=OverflowPolicy.DISCONNECT,
+            on_disconnect=on_disconnect,
+        )
+        stall(queue, sink)
+        queue.push("/test", 1)
+        # Act
+        if cause == "overflow":
+            queue.push("/test", 2)
+        else:
+            queue.close()
+        # Assert
+        assert pushed == [False]
+
+    def test_failing_send_disconnects(self):
+        # Arrange
+        def send(path, payload):
+            raise ConnectionError("broken pipe")
+
+        queue = OSCClientSendQueue(send)
+        # Act
+        queue.push("/test", 1)
+        queue.join(5)
+        # Assert
+        assert not queue.is_connected
+
+    def test_invalid_max_size_raises(self):
+        with pytest.raises(ValueError):
+            OSCClientSendQueue(lambda path, payload: None, max_size=0)
+
+
+class TestOSCPushFanout:
+    def test_stalled_client_does_not_block_others(self, sink):
+        # Arrange
+        fanout = OSCPushFanout(max_queue_size=4)
+        received = []
+        done = threading.Event()
+
+        def fast_send(path, payload):
+            received.append(payload)
+            if len(received) == 10:
+                done.set()
+
+        fanout.add_client("slow", sink)
+        fanout.add_client("fast", fast_send, max_queue_size=16)
+        fanout.publish("/stall", 0)
+        assert sink.started.wait(5)
+        # Act
+        for i in range(1, 10):
+            fanout.publish("/test", i)
+        # Assert
+        assert done.wait(5)
+        assert received == list(range(10))
+        stats = fanout.stats()
+        assert stats["slow"]["depth"] == 4
+        assert stats["slow"]["dropped"] == 5
+        assert stats["fast"]["dropped"] == 0
+        fanout.close()
+
+    def test_disconnected_client_is_removed(self, sink):
+        # Arrange
+        fanout = OSCPushFanout(max_queue_size=1, policy=OverflowPolicy.DISCONNECT)
+        fanout.add_client("slow", sink)
+        fanout.publish("/stall", 0)
+        assert sink.started.wait(5)
+        # Act
+        fanout.publish("/test", 1)
+        fanout.publish("/test", 2)
+        # Assert
+        assert len(fanout) == 0
+
+    def test_invalid_max_queue_size_raises(self):
+        # Arrange
+        fanout = OSCPushFanout()
+        # Act
+        # Assert
+        with pytest.raises(ValueError):
+            OSCPushFanout(max_queue_size=0)
+        with pytest.raises(ValueError):
+            fanout.add_client("client", lambda path, payload: None, max_queue_size=0)
+        assert len(fanout) == 0
+
+    def test_remove_client(self):
+        # Arrange
+        fanout = OSCPushFanout()
+        queue = fanout.add_client("client", lambda path, payload: None)
+        # Act
+        fanout.remove_client("client")
+        fanout.remove_client("unknown")
+        # Assert
+        assert len(fanout) == 0
+        assert not queue.is_connected
@@ -0,0 +1,164 @@
+from array import array
+
+import pytest
+
+from pythonoscquery.shared.osc_access import OSCAccess
+from pythonoscquery.shared.osc_path_node import OSCPathNode
+from pythonoscquery.shared.osc_value_store import OSCValueStore
+
+
+@pytest.fixture(params=[False, True], ids=["array", "numpy"])
+def use_numpy(request):
+    return request.param
+
+
+@pytest.fixture
+def store(use_numpy):
+    return OSCValueStore("d", use_numpy=use_numpy)
+
+
+def level_nodes(count):
+    return [
+        OSCPathNode(f"/levels/{i}", value=float(i), access=OSCAccess.READWRITE_VALUE)
+        for i in range(count)
+    ]
+
+
+class TestOSCValueStore:
+    def test_node_values_are_read_from_store(self, store):
+        # Arrange
+        node = OSCPathNode("/test", value=[1.0, 2.0], access=OSCAccess.READWRITE_VALUE)
+        # Act
+        slot = store.add_node(node)
+        store.set_values(slot, [3.0, 4.0])
+        # Assert
+        assert slot == slice(0, 2)
+        assert node.value == [3.0, 4.0]
+        assert node in store
+        assert len(store) == 2
+
+    def test_serialization_reads_from_store(self, store):
+        # Arrange
+        node = OSCPathNode("/test", value=1.0, access=OSCAccess.READWRITE_VALUE)
+        store.add_node(node)
+        # Act
+        store.set_node_values("/test", [5.5])
+        # Assert
+        assert (
+            node.to_json()
+            == '{"FULL_PATH": "/test", "VALUE": [5.5], "TYPE": "f", "ACCESS": 3}'
+        )
+
+    def test_bulk_update_with_slice(self, store):
+        # Arrange
+        nodes = level_nodes(10)
+        for node in nodes:
+            store.add_node(node)
+        # Act
+        store.set_values(slice(0, 10), array("d", range(10, 20)))
+        # Assert
+        assert [node.value[0] for node in nodes] == list(range(10, 20))
+
+    def test_bulk_update_with_indices(self, store):
+        # Arrange
+        nodes = level_nodes(5)
+        for node in nodes:
+            store.add_node(node)
+        # Act
+        store.set_values([4, 0], [40.0, 0.5])
+        # Assert
+        assert nodes[4].value == [40.0]
+        assert nodes[0].value == [0.5]
+        assert nodes[1].value == [1.0]
+
+    def test_update_of_single_position(self, store):
+        # Arrange
+        nodes = level_nodes(3)
+        for node in nodes:
+            store.add_node(node)
+        # Act
+        store.set_values(1, [5.0])
+        # Assert
+        assert store.get_values(1) == [5.0]
+        assert nodes[1].value == [5.0]
+        assert nodes[0].value == [0.0]
+        with pytest.raises(ValueError):
+            store.set_values(1, [5.0, 6.0])
+
+    def test_bulk_update_with_wrong_length_raises(self, store):
+        # Arrange
+        for node in level_nodes(3):
+            store.add_node(node)
+        # Act
+        # Assert
+        with pytest.raises(ValueError):
+            store.set_values(slice(0, 3), [1.0])
+
+    @pytest.mark.parametrize(
+        "node",
+        [
+            OSCPathNode("/container"),
+            OSCPathNode("/int", value=1, access=OSCAccess.READWRITE_VALUE),
+            OSCPathNode("/mixed", value=[1.0, "a"], access=OSCAccess.READWRITE_VALUE),
+        ],
+    )
+    def test_adding_node_with_wrong_types_raises(self, store, node):
+        with pytest.raises(ValueError):
+            store.add_node(node)
+
+    def test_adding_node_twice_raises(self, store):
+        # Arrange
+        node = OSCPathNode("/test", value=1.0, access=OSCAccess.READWRITE_VALUE)
+        store.add_node(node)
+        # Act
+        # Assert
+        with pytest.raises(ValueError):
+            store.add_node(node)
+
+    def test_int_store_rejects_bool_nodes(self):
+        # Arrange
+        store = OSCValueStore("i")
+        # Act
+        store.add_node(OSCPathNode("/int", value=1, access=OSCAccess.READWRITE_VALUE))
+        # Assert
+        with pytest.raises(ValueError):
+            store.add_node(
+                OSCPathNode("/bool", value=True, access=OSCAccess.READWRITE_VALUE)
+            )
+
+    @pytest.mark.parametrize(
+        "index, values",
+        [(slice(0, 2), [1, 2**40]), (1, [2**40]), ([1, 0], [2**40, 5])],
+        indirect=False,
+    )
+    def test_values_out_of_typecode_range_raise(self, use_numpy, index, values):
+        # Arrange
+        store = OSCValueStore("i", use_numpy=use_numpy)
+        for i in range(2):
+            store.add_node(
+                OSCPathNode(f"/int/{i}", value=i, access=OSCAccess.READWRITE_VALUE)
+            )
+        # Act
+        # Assert
+        with pytest.raises(ValueError):
+            store.set_values(index, values)
+        with pytest.raises(ValueError):
+            store.add_node(
+                OSCPathNode("/big", value=[1, 2**40], access=OSCAccess.READWRITE_VALUE)
+            )
+        assert store.get_values(slice(0, 2)) == [0, 1]
+        assert len(store) == 2
+
+    def test_invalid_typecode_raises(self):
+        with pytest.raises(ValueError):
+            OSCValueStore("u")
+
+    def test_set_value_of_stored_node_writes_store(self, store):
+        # Arrange
+        node = OSCPathNode("/test", value=1.0, access=OSCAccess.READWRITE_VALUE)
+        slot = store.add_node(node)
+        # Act
+        node.set_value([2.5])
+        # Assert
+        assert store.get_values(slot) == [2.5]
+        assert node.version == 1